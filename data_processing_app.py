@@ -1,11 +1,10 @@
 import streamlit as st
 import pandas as pd
 import os
-import io
 import sys
 from datetime import datetime
 
-import zipfile
+from concurrent.futures import ThreadPoolExecutor
 from process_file_app_india_LinkedIn import *
 from process_file_app_india_Naukri import *
 from process_file_app_india_Calendy import *
@@ -16,6 +15,17 @@ from process_file_app_US_LinkedIn import *
 from process_file_app_US_Indeed import *
 from process_file_app_US_merge_calendly_linkedin_indeed import *
 from update_candidate_records import *
+from utils.candidate_schema import conform_frame
+from utils.change_log import get_change_log, write_snapshot
+from utils.data_cache import list_csv_files, load_snapshot_cached, snapshot_version
+from utils.dtypes import apply_schema, set_fields
+from utils.export import (EXPORT_FORMATS, download_archive_section, download_section,
+                          get_export)
+from utils.identity_index import IdentityIndex
+from utils.paged_table import show_table
+from utils.search_index import (SEARCH_COLUMNS, describe_candidates, get_page,
+                                get_search_index, page_count)
+from utils.upsert import upsert_records
 
 final_dataframe_india = pd.DataFrame()
 final_dataframe_us = pd.DataFrame()
@@ -31,24 +41,6 @@ def save_uploaded_file(uploaded_file, source_type):
     return file_path
 
 
-def load_or_create_data():
-    """Load existing data or create new DataFrame"""
-    current_file = 'merged_all_data.csv'
-
-    if os.path.exists(current_file):
-        return pd.read_csv(current_file)
-    return pd.DataFrame(columns=[
-        'Stage', 'name', 'email', 'phone', 'location', 'experience',
-        'position', 'status', 'profile', 'salary', 'declaration', 'source',
-        'file_source', 'date', 'Meeting Notes'
-    ])
-
-
-def save_data(df):
-    """Save DataFrame to CSV"""
-    df.to_csv('merged_all_data.csv', index=False)
-
-
 def main():
     st.set_page_config(page_title="Data Processing Pipeline", layout="wide")
 
@@ -111,24 +103,15 @@ def main():
                                             f"Error deleting files: {str(e)}")
                             with col2:
                                 try:
-                                    # Create a zip archive in memory
-                                    zip_buffer = io.BytesIO()
-                                    with zipfile.ZipFile(
-                                            zip_buffer, "w",
-                                            zipfile.ZIP_DEFLATED) as zip_file:
-                                        for file in selected_files:
-                                            file_path = os.path.join(
-                                                dir_path, file)
-                                            zip_file.write(file_path,
-                                                           arcname=file)
-                                    zip_buffer.seek(0)
-                                    st.download_button(
-                                        label=
-                                        f"Download Selected Files from {directory}",
-                                        data=zip_buffer,
+                                    # Archive the files only when asked to
+                                    download_archive_section(
+                                        dir_path,
+                                        selected_files,
                                         file_name=f"{directory}_files.zip",
-                                        mime="application/zip",
-                                        key=f"download_{directory}")
+                                        key=f"download_{directory}",
+                                        label=
+                                        f"Download Selected Files from {directory}"
+                                    )
                                 except Exception as e:
                                     st.error(
                                         f"Error preparing download: {str(e)}")
@@ -233,22 +216,40 @@ def main():
                                     f'Skipping {file.name} - no India identifier in filename'
                                 )
 
-                    if len(naukri_files) > 0:
-                        india_dfs_naukri = process_Naukri_india(naukri_files)
-                    if len(linkedin_files) > 0:
-                        india_dfs_linkedin = process_Linkedin_india(
-                            linkedin_files)
-                    if len(calendly_files) > 0:
-                        india_dfs_calendly = process_calendly_india(
-                            calendly_files)
-                    if len(indeed_files_US) > 0:
-                        US_dfs_indeed = process_Indeed_US(indeed_files_US)
-                    if len(linkedin_files_US) > 0:
-                        US_dfs_linkedin = process_Linkedin_US(
-                            linkedin_files_US)
-                    if len(calendly_files_US) > 0:
-                        US_dfs_calendly = process_calendly_US(
-                            calendly_files_US)
+                    # Run the sources side by side; their files are all read in
+                    # the shared process pool of utils.parallel_ingest
+                    with ThreadPoolExecutor(max_workers=6) as pool:
+                        jobs = {}
+                        if len(naukri_files) > 0:
+                            jobs['naukri'] = pool.submit(
+                                process_Naukri_india, naukri_files)
+                        if len(linkedin_files) > 0:
+                            jobs['linkedin'] = pool.submit(
+                                process_Linkedin_india, linkedin_files)
+                        if len(calendly_files) > 0:
+                            jobs['calendly'] = pool.submit(
+                                process_calendly_india, calendly_files)
+                        if len(indeed_files_US) > 0:
+                            jobs['indeed_US'] = pool.submit(
+                                process_Indeed_US, indeed_files_US)
+                        if len(linkedin_files_US) > 0:
+                            jobs['linkedin_US'] = pool.submit(
+                                process_Linkedin_US, linkedin_files_US)
+                        if len(calendly_files_US) > 0:
+                            jobs['calendly_US'] = pool.submit(
+                                process_calendly_US, calendly_files_US)
+                    if 'naukri' in jobs:
+                        india_dfs_naukri = jobs['naukri'].result()
+                    if 'linkedin' in jobs:
+                        india_dfs_linkedin = jobs['linkedin'].result()
+                    if 'calendly' in jobs:
+                        india_dfs_calendly = jobs['calendly'].result()
+                    if 'indeed_US' in jobs:
+                        US_dfs_indeed = jobs['indeed_US'].result()
+                    if 'linkedin_US' in jobs:
+                        US_dfs_linkedin = jobs['linkedin_US'].result()
+                    if 'calendly_US' in jobs:
+                        US_dfs_calendly = jobs['calendly_US'].result()
                     print('data processing completed')
                     print(
                         'len(india_dfs_naukri) > 0 or len(india_dfs_linkedin) > 0 or len(india_dfs_calendly): ',
@@ -268,38 +269,23 @@ def main():
                             india_dfs_naukri, india_dfs_linkedin)
                         india_dfs = process_L_N_C(india_dfs_calendly,
                                                   india_dfs_L_N)
+                        # Only this batch's keys are looked up in the identity
+                        # index, so the merge scales with the upload size
+                        identity_index = IdentityIndex(
+                            os.path.join(database_dir,
+                                         'identity_index_india.db'))
                         merge_duplicates_dfs_india = merge_duplicates(
-                            india_dfs)
+                            india_dfs, identity_index=identity_index)
+                        identity_index.close()
                         final_dataframe_india = pd.concat(
                             [merge_duplicates_dfs_india], ignore_index=True)
                         print(
                             'final_dataframe_india = pd.concat(merge_duplicates_dfs, ignore_index=True) Completed'
                         )
-                        final_dataframe_india = merge_duplicates(
-                            final_dataframe_india)
-                        # Define separate column sets for India data
-                        india_columns = [
-                            'Stage', 'name', 'email', 'phone', 'location',
-                            'total_experience', 'annual_salary',
-                            'notice_period', 'position', 'status', 'source',
-                            'meeting_notes', 'Date'
-                        ]
-
-                        # Keep only India-specific columns
-                        final_dataframe_india = final_dataframe_india.reindex(
-                            columns=india_columns)
+                        # Keep only the India schema columns, in schema order
+                        final_dataframe_india = conform_frame(
+                            final_dataframe_india, 'India', 'final merge')
                         final_dataframe_india.index += 1
-                        # Only insert Stage column if it doesn't already exist
-                        if 'Stage' not in final_dataframe_india.columns:
-                            final_dataframe_india.insert(0, "Stage", pd.NA)
-                        else:
-                            # If Stage exists but not at first position, reorder columns
-                            cols = final_dataframe_india.columns.tolist()
-                            if cols[0] != 'Stage':
-                                cols.remove('Stage')
-                                cols = ['Stage'] + cols
-                                final_dataframe_india = final_dataframe_india[
-                                    cols]
                         final_dataframe_india['name'] = final_dataframe_india[
                             "name"].str.title()
                         final_dataframe_india["phone"] = final_dataframe_india[
@@ -359,7 +345,13 @@ def main():
                                 os.path.join(final_india_dir, india_files[1]))
                             merged_df = pd.concat([file1, file2],
                                                   ignore_index=True)
-                            merged_df = merge_duplicates(merged_df)
+                            # Cluster by the stable candidate IDs, which both files
+                            # carry and which the identity index reproduces
+                            identity_index = IdentityIndex(
+                                os.path.join(database_dir, 'identity_index_india.db'))
+                            merged_df = merge_duplicates(
+                                merged_df, identity_index=identity_index)
+                            identity_index.close()
                             # Save merged result
                             merged_file_path = os.path.join(
                                 merge_dir,
@@ -385,8 +377,7 @@ def main():
                         status_text = st.empty()
                         st.success("Files processed successfully")
                         st.header("Processed India Data")
-                        st.dataframe(final_dataframe_india,
-                                     use_container_width=True)
+                        show_table(final_dataframe_india, key="processed_india")
                         st.text(f"Total records: {len(final_dataframe_india)}")
 
                     elif len(US_dfs_indeed) > 0 or len(
@@ -395,35 +386,20 @@ def main():
                         print(region)
                         US_dfs = final_merge_US(US_dfs_indeed, US_dfs_linkedin,
                                                 US_dfs_calendly)
-                        merge_duplicates_dfs_US = merge_duplicates(US_dfs)
+                        identity_index = IdentityIndex(
+                            os.path.join(database_dir, 'identity_index_us.db'))
+                        merge_duplicates_dfs_US = merge_duplicates(
+                            US_dfs, identity_index=identity_index)
+                        identity_index.close()
                         final_dataframe_US = pd.concat(
                             [merge_duplicates_dfs_US], ignore_index=True)
                         print(
                             'final_dataframe_US = pd.concat([merge_duplicates_dfs_US], ignore_index=True) Completed'
                         )
-                        final_dataframe_US = merge_duplicates(
-                            final_dataframe_US)
-                        # Define separate column sets for US data
-                        us_columns = [
-                            'Stage', 'name', 'email', 'phone', 'location',
-                            'job title', 'US Person', 'salary', 'status',
-                            'source', 'Meeting Notes', 'Date'
-                        ]
-
-                        # Keep only US-specific columns
-                        final_dataframe_US = final_dataframe_US.reindex(
-                            columns=us_columns)
+                        # Keep only the US schema columns, in schema order
+                        final_dataframe_US = conform_frame(
+                            final_dataframe_US, 'US', 'final merge')
                         final_dataframe_US.index += 1
-                        # Only insert Stage column if it doesn't already exist
-                        if 'Stage' not in final_dataframe_US.columns:
-                            final_dataframe_US.insert(0, "Stage", pd.NA)
-                        else:
-                            # If Stage exists but not at first position, reorder columns
-                            cols = final_dataframe_US.columns.tolist()
-                            if cols[0] != 'Stage':
-                                cols.remove('Stage')
-                                cols = ['Stage'] + cols
-                                final_dataframe_US = final_dataframe_US[cols]
                         final_dataframe_US['name'] = final_dataframe_US[
                             "name"].str.title()
                         final_dataframe_US["phone"] = final_dataframe_US[
@@ -478,7 +454,13 @@ def main():
                                 os.path.join(final_US_dir, US_files[1]))
                             merged_df = pd.concat([file1, file2],
                                                   ignore_index=True)
-                            merged_df = merge_duplicates(merged_df)
+                            # Cluster by the stable candidate IDs, which both files
+                            # carry and which the identity index reproduces
+                            identity_index = IdentityIndex(
+                                os.path.join(database_dir, 'identity_index_us.db'))
+                            merged_df = merge_duplicates(
+                                merged_df, identity_index=identity_index)
+                            identity_index.close()
                             # Save merged result
                             merged_file_path = os.path.join(
                                 merge_dir, f'merged_US_data_{timestamp}.csv')
@@ -506,8 +488,7 @@ def main():
                         status_text = st.empty()
                         st.success("Files processed successfully")
                         st.header("Processed US Data")
-                        st.dataframe(final_dataframe_US,
-                                     use_container_width=True)
+                        show_table(final_dataframe_US, key="processed_us")
                         st.text(f"Total records: {len(final_dataframe_US)}")
                     else:
                         print(
@@ -528,21 +509,23 @@ def main():
             modified_dir = os.path.join('database', 'Modified Data US')
             final_dir = os.path.join('database', 'Final US Data')
             merge_dir = os.path.join('database', 'Merge Final US')
+            # Snapshots are read with the Update Tool edits logged against them applied,
+            # so the combined snapshot written below keeps them
+            change_log = get_change_log()
+            dataset = 'us'
 
             dfs_to_concat = []
             latest_timestamps = {}
 
             # Check Modified Data US directory
             if os.path.exists(modified_dir):
-                modified_files = sorted([
-                    f for f in os.listdir(modified_dir) if f.endswith('.csv')
-                ],
-                                        reverse=True)
+                modified_files = list_csv_files(modified_dir)
                 if modified_files:
                     latest_modified = os.path.join(modified_dir,
                                                    modified_files[0])
                     try:
-                        df_modified = pd.read_csv(latest_modified)
+                        df_modified = load_snapshot_cached(
+                            change_log, dataset, latest_modified)
                         dfs_to_concat.append(df_modified)
                         timestamp = modified_files[0].split('_')[-1].replace(
                             '.csv', '')
@@ -554,13 +537,12 @@ def main():
 
             # Check Final US Data directory
             if os.path.exists(final_dir):
-                final_files = sorted(
-                    [f for f in os.listdir(final_dir) if f.endswith('.csv')],
-                    reverse=True)
+                final_files = list_csv_files(final_dir)
                 if final_files:
                     latest_final = os.path.join(final_dir, final_files[0])
                     try:
-                        df_final = pd.read_csv(latest_final)
+                        df_final = load_snapshot_cached(
+                            change_log, dataset, latest_final)
                         timestamp = final_files[0].split('_')[-1].replace(
                             '.csv', '')
                         if 'Modified' not in latest_timestamps or timestamp > latest_timestamps[
@@ -573,13 +555,12 @@ def main():
 
             # Check Merge Final US directory
             if os.path.exists(merge_dir):
-                merge_files = sorted(
-                    [f for f in os.listdir(merge_dir) if f.endswith('.csv')],
-                    reverse=True)
+                merge_files = list_csv_files(merge_dir)
                 if merge_files:
                     latest_merge = os.path.join(merge_dir, merge_files[0])
                     try:
-                        df_merge = pd.read_csv(latest_merge)
+                        df_merge = load_snapshot_cached(
+                            change_log, dataset, latest_merge)
                         timestamp = merge_files[0].split('_')[-1].replace(
                             '.csv', '')
                         if all(timestamp > latest_timestamps.get(key, '')
@@ -594,15 +575,11 @@ def main():
             if dfs_to_concat:
                 us_df = pd.concat(dfs_to_concat, ignore_index=True)
                 us_df = merge_duplicates(us_df)
-                us_df = us_df.reset_index(drop=True)
+                us_df = apply_schema(us_df.reset_index(drop=True))
 
                 # Save the combined data to Modified Data US with new timestamp
-                if not os.path.exists(modified_dir):
-                    os.makedirs(modified_dir)
-                timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-                new_modified_file = os.path.join(
-                    modified_dir, f'modified_us_data_{timestamp}.csv')
-                us_df.to_csv(new_modified_file, index=False)
+                new_modified_file = write_snapshot(change_log, dataset, us_df,
+                                                   modified_dir)
                 st.success(
                     f"Combined data saved to: {os.path.basename(new_modified_file)}"
                 )
@@ -613,21 +590,13 @@ def main():
             # Display data overview
 
             st.subheader("Current Data Overview")
-            st.dataframe(us_df, use_container_width=True)
+            show_table(us_df, key="us_overview")
             st.text(f"Total records: {len(us_df)}")
 
             # Add download button for current data
-            buffer = io.BytesIO()
-            with pd.ExcelWriter(buffer, engine='openpyxl') as writer:
-                us_df.to_excel(writer, index=False)
-
-            st.download_button(
-                label="Download Current Data as Excel",
-                data=buffer.getvalue(),
-                file_name="current_us_data.xlsx",
-                mime=
-                "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-            )
+            download_section(us_df,
+                             file_name="current_us_data",
+                             key="us_current_data")
 
             # Add upload functionality for the downloaded file
             st.subheader("Upload Modified Data")
@@ -648,10 +617,8 @@ def main():
                             os.makedirs(modified_dir)
 
                         # Save with timestamp
-                        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-                        modified_file = os.path.join(
-                            modified_dir, f'modified_us_data_{timestamp}.csv')
-                        us_df.to_csv(modified_file, index=False)
+                        modified_file = write_snapshot(change_log, dataset, us_df,
+                                                       modified_dir)
 
                         # Keep only the latest 5 modified files
                         modified_files = sorted([
@@ -669,7 +636,7 @@ def main():
 
                         # Refresh the data overview
                         st.subheader("Updated Data Overview")
-                        st.dataframe(us_df, use_container_width=True)
+                        show_table(us_df, key="us_updated")
                         st.text(f"Total records: {len(us_df)}")
                     else:
                         st.error(
@@ -683,16 +650,18 @@ def main():
 
             # Add download button for empty template
             st.subheader("1. Download Empty Template")
-            buffer = io.BytesIO()
-            with pd.ExcelWriter(buffer, engine='openpyxl') as writer:
-                template_df.to_excel(writer, index=False)
-            st.download_button(
-                label="Download Empty Template Excel",
-                data=buffer.getvalue(),
-                file_name="us_candidate_template.xlsx",
-                mime=
-                "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-            )
+            # The template only depends on the columns, so it is written once per
+            # column set
+            template_path = get_export(
+                template_df, 'xlsx',
+                version=('template', tuple(map(str, template_df.columns))))
+            with open(template_path, 'rb') as f:
+                st.download_button(
+                    label="Download Empty Template Excel",
+                    data=f,
+                    file_name="us_candidate_template.xlsx",
+                    mime=EXPORT_FORMATS['xlsx']['mime']
+                )
 
             # File upload section for template
             st.subheader("2. Upload Filled Template")
@@ -712,47 +681,10 @@ def main():
                         )
                         return
 
-                    # Process each row
-                    updates = 0
-                    additions = 0
-                    for _, row in new_df.iterrows():
-                        # Check if record exists (by email or phone)
-                        existing_record = us_df[
-                            (us_df['email'] == row['email']) |
-                            (us_df['phone'] == row['phone'])]
-
-                        if len(existing_record) > 0:
-                            # Update existing record
-                            idx = existing_record.index[0]
-                            # Preserve existing meeting notes
-                            existing_notes = str(us_df.loc[idx, 'Meeting Notes'])
-                            if pd.isna(existing_notes) or existing_notes.lower() == 'nan':
-                                existing_notes = ''
-
-                            # Update all columns except meeting notes
-                            for col in us_df.columns:
-                                if col != 'Meeting Notes' and pd.notna(row[col]):
-                                    us_df.loc[idx, col] = row[col]
-
-                            # Handle meeting notes separately - append new notes if present
-                            new_notes = str(row.get('Meeting Notes', ''))
-                            if pd.notna(new_notes) and new_notes.strip() and new_notes.lower() != 'nan':
-                                current_time = datetime.now().strftime('%Y-%m-%d %H:%M')
-                                if existing_notes.strip():
-                                    combined_notes = f"{existing_notes}\n[{current_time}]: {new_notes}"
-                                else:
-                                    combined_notes = f"[{current_time}]: {new_notes}"
-                                us_df.loc[idx, 'Meeting Notes'] = combined_notes
-                            else:
-                                us_df.loc[idx, 'Meeting Notes'] = existing_notes
-                            updates += 1
-                        else:
-                            # Add new record
-                            if pd.notna(row.get('Meeting Notes')):
-                                current_time = datetime.now().strftime('%Y-%m-%d %H:%M')
-                                row['Meeting Notes'] = f"[{current_time}]: {row['Meeting Notes']}"
-                            us_df.loc[len(us_df)] = row
-                            additions += 1
+                    # Classify rows as updates or inserts in one batch and
+                    # append new meeting notes instead of overwriting them
+                    us_df, updates, additions = upsert_records(
+                        us_df, new_df, notes_col='Meeting Notes')
 
                     # Create base directories
                     database_dir = 'database'
@@ -776,9 +708,8 @@ def main():
                     us_df.to_csv(final_file_path, index=False)
 
                     # Also save to Modified Data directory
-                    modified_file = os.path.join(
-                        modified_dir, f'modified_us_data_{timestamp}.csv')
-                    us_df.to_csv(modified_file, index=False)
+                    modified_file = write_snapshot(change_log, dataset, us_df,
+                                                   modified_dir)
 
                     # Keep only the 5 most recent files in each directory
                     for directory in [final_us_dir, modified_dir]:
@@ -823,32 +754,13 @@ def main():
 
                     # Display updated data
                     st.subheader("All Records")
-                    st.dataframe(us_df, use_container_width=True)
+                    show_table(us_df, key="us_all_records")
 
                 except Exception as e:
                     st.error(f"Error processing file: {str(e)}")
 
-                    # Process each row
-                    updates = 0
-                    additions = 0
-                    for _, row in new_df.iterrows():
-                        # Check if record exists (by email or phone)
-                        existing_record = us_df[
-                            (us_df['email'] == row['email']) |
-                            (us_df['phone'] == row['phone'])]
-
-                        if len(existing_record) > 0:
-                            # Update existing record
-                            idx = existing_record.index[0]
-                            for col in us_df.columns:
-                                if pd.notna(row[col]
-                                            ):  # Only update non-null values
-                                    us_df.loc[idx, col] = row[col]
-                            updates += 1
-                        else:
-                            # Add new record
-                            us_df.loc[len(us_df)] = row
-                            additions += 1
+                    # Process all rows in one batch
+                    us_df, updates, additions = upsert_records(us_df, new_df)
 
                     # Save updated data
                     us_df.to_csv('merged_us_data.csv', index=False)
@@ -872,21 +784,23 @@ def main():
             modified_dir = os.path.join('database', 'Modified Data')
             final_dir = os.path.join('database', 'Final India Data')
             merge_dir = os.path.join('database', 'Merge Final India')
+            # Snapshots are read with the Update Tool edits logged against them applied,
+            # so the combined snapshot written below keeps them
+            change_log = get_change_log()
+            dataset = 'india'
 
             dfs_to_concat = []
             latest_timestamps = {}
 
             # Check Modified Data directory
             if os.path.exists(modified_dir):
-                modified_files = sorted([
-                    f for f in os.listdir(modified_dir) if f.endswith('.csv')
-                ],
-                                        reverse=True)
+                modified_files = list_csv_files(modified_dir)
                 if modified_files:
                     latest_modified = os.path.join(modified_dir,
                                                    modified_files[0])
                     try:
-                        df_modified = pd.read_csv(latest_modified)
+                        df_modified = load_snapshot_cached(
+                            change_log, dataset, latest_modified)
                         dfs_to_concat.append(df_modified)
                         timestamp = modified_files[0].split('_')[-1].replace(
                             '.csv', '')
@@ -898,13 +812,12 @@ def main():
 
             # Check Final India Data directory
             if os.path.exists(final_dir):
-                final_files = sorted(
-                    [f for f in os.listdir(final_dir) if f.endswith('.csv')],
-                    reverse=True)
+                final_files = list_csv_files(final_dir)
                 if final_files:
                     latest_final = os.path.join(final_dir, final_files[0])
                     try:
-                        df_final = pd.read_csv(latest_final)
+                        df_final = load_snapshot_cached(
+                            change_log, dataset, latest_final)
                         timestamp = final_files[0].split('_')[-1].replace(
                             '.csv', '')
                         if 'Modified' not in latest_timestamps or timestamp > latest_timestamps[
@@ -917,13 +830,12 @@ def main():
 
             # Check Merge Final India directory
             if os.path.exists(merge_dir):
-                merge_files = sorted(
-                    [f for f in os.listdir(merge_dir) if f.endswith('.csv')],
-                    reverse=True)
+                merge_files = list_csv_files(merge_dir)
                 if merge_files:
                     latest_merge = os.path.join(merge_dir, merge_files[0])
                     try:
-                        df_merge = pd.read_csv(latest_merge)
+                        df_merge = load_snapshot_cached(
+                            change_log, dataset, latest_merge)
                         timestamp = merge_files[0].split('_')[-1].replace(
                             '.csv', '')
                         if all(timestamp > latest_timestamps.get(key, '')
@@ -938,15 +850,11 @@ def main():
             if dfs_to_concat:
                 india_df = pd.concat(dfs_to_concat, ignore_index=True)
                 india_df = merge_duplicates(india_df)
-                india_df = india_df.reset_index(drop=True)
+                india_df = apply_schema(india_df.reset_index(drop=True))
 
                 # Save the combined data to Modified Data with new timestamp
-                if not os.path.exists(modified_dir):
-                    os.makedirs(modified_dir)
-                timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-                new_modified_file = os.path.join(
-                    modified_dir, f'modified_india_data_{timestamp}.csv')
-                india_df.to_csv(new_modified_file, index=False)
+                new_modified_file = write_snapshot(change_log, dataset, india_df,
+                                                   modified_dir)
                 st.success(
                     f"Combined data saved to: {os.path.basename(new_modified_file)}"
                 )
@@ -955,21 +863,13 @@ def main():
                 st.warning("No data files found in any directory")
             # Display data overview
             st.subheader("Current Data Overview")
-            st.dataframe(india_df, use_container_width=True)
+            show_table(india_df, key="india_overview")
             st.text(f"Total records: {len(india_df)}")
 
             # Add download button for current data
-            buffer = io.BytesIO()
-            with pd.ExcelWriter(buffer, engine='openpyxl') as writer:
-                india_df.to_excel(writer, index=False)
-
-            st.download_button(
-                label="Download Current Data as Excel",
-                data=buffer.getvalue(),
-                file_name="current_india_data.xlsx",
-                mime=
-                "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-            )
+            download_section(india_df,
+                             file_name="current_india_data",
+                             key="india_current_data")
 
             # Add upload functionality for the downloaded file
             st.subheader("Upload Modified Data")
@@ -990,11 +890,8 @@ def main():
                             os.makedirs(modified_dir)
 
                         # Save with timestamp
-                        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-                        modified_file = os.path.join(
-                            modified_dir,
-                            f'modified_india_data_{timestamp}.csv')
-                        india_df.to_csv(modified_file, index=False)
+                        modified_file = write_snapshot(change_log, dataset,
+                                                       india_df, modified_dir)
 
                         # Keep only the latest 5 modified files
                         modified_files = sorted([
@@ -1012,7 +909,7 @@ def main():
 
                         # Refresh the data overview
                         st.subheader("Updated Data Overview")
-                        st.dataframe(india_df, use_container_width=True)
+                        show_table(india_df, key="india_updated")
                         st.text(f"Total records: {len(india_df)}")
                     else:
                         st.error(
@@ -1026,16 +923,18 @@ def main():
 
             # Add download button for empty template
             st.subheader("1. Download Empty Template")
-            buffer = io.BytesIO()
-            with pd.ExcelWriter(buffer, engine='openpyxl') as writer:
-                template_df.to_excel(writer, index=False)
-            st.download_button(
-                label="Download Empty Template Excel",
-                data=buffer.getvalue(),
-                file_name="india_candidate_template.xlsx",
-                mime=
-                "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-            )
+            # The template only depends on the columns, so it is written once per
+            # column set
+            template_path = get_export(
+                template_df, 'xlsx',
+                version=('template', tuple(map(str, template_df.columns))))
+            with open(template_path, 'rb') as f:
+                st.download_button(
+                    label="Download Empty Template Excel",
+                    data=f,
+                    file_name="india_candidate_template.xlsx",
+                    mime=EXPORT_FORMATS['xlsx']['mime']
+                )
 
             # File upload section for template
             st.subheader("2. Upload Filled Template")
@@ -1056,47 +955,10 @@ def main():
                         )
                         return
 
-                    # Process each row
-                    updates = 0
-                    additions = 0
-                    for _, row in new_df.iterrows():
-                        # Check if record exists (by email or phone)
-                        existing_record = india_df[
-                            (india_df['email'] == row['email']) |
-                            (india_df['phone'] == row['phone'])]
-
-                        if len(existing_record) > 0:
-                            # Update existing record
-                            idx = existing_record.index[0]
-                            # Preserve existing meeting notes
-                            existing_notes = str(india_df.loc[idx, 'meeting_notes'])
-                            if pd.isna(existing_notes) or existing_notes.lower() == 'nan':
-                                existing_notes = ''
-
-                            # Update all columns except meeting notes
-                            for col in india_df.columns:
-                                if col != 'meeting_notes' and pd.notna(row[col]):
-                                    india_df.loc[idx, col] = row[col]
-
-                            # Handle meeting notes separately - append new notes if present
-                            new_notes = str(row.get('meeting_notes', ''))
-                            if pd.notna(new_notes) and new_notes.strip() and new_notes.lower() != 'nan':
-                                current_time = datetime.now().strftime('%Y-%m-%d %H:%M')
-                                if existing_notes.strip():
-                                    combined_notes = f"{existing_notes}\n[{current_time}]: {new_notes}"
-                                else:
-                                    combined_notes = f"[{current_time}]: {new_notes}"
-                                india_df.loc[idx, 'meeting_notes'] = combined_notes
-                            else:
-                                india_df.loc[idx, 'meeting_notes'] = existing_notes
-                            updates += 1
-                        else:
-                            # Add new record
-                            if pd.notna(row.get('meeting_notes')):
-                                current_time = datetime.now().strftime('%Y-%m-%d %H:%M')
-                                row['meeting_notes'] = f"[{current_time}]: {row['meeting_notes']}"
-                            india_df.loc[len(india_df)] = row
-                            additions += 1
+                    # Classify rows as updates or inserts in one batch and
+                    # append new meeting notes instead of overwriting them
+                    india_df, updates, additions = upsert_records(
+                        india_df, new_df, notes_col='meeting_notes')
 
                     # Create base directories
                     database_dir = 'database'
@@ -1120,9 +982,8 @@ def main():
                     india_df.to_csv(final_file_path, index=False)
 
                     # Also save to Modified Data directory
-                    modified_file = os.path.join(
-                        modified_dir, f'modified_india_data_{timestamp}.csv')
-                    india_df.to_csv(modified_file, index=False)
+                    modified_file = write_snapshot(change_log, dataset, india_df,
+                                                   modified_dir)
 
                     # Keep only the 5 most recent files in each directory
                     for directory in [final_india_dir, modified_dir]:
@@ -1177,32 +1038,13 @@ def main():
 
                     # Display updated data
                     st.subheader("All Records")
-                    st.dataframe(india_df, use_container_width=True)
+                    show_table(india_df, key="india_all_records")
 
                 except Exception as e:
                     st.error(f"Error processing file: {str(e)}")
 
-                    # Process each row
-                    updates = 0
-                    additions = 0
-                    for _, row in new_df.iterrows():
-                        # Check if record exists (by email or phone)
-                        existing_record = india_df[
-                            (india_df['email'] == row['email']) |
-                            (india_df['phone'] == row['phone'])]
-
-                        if len(existing_record) > 0:
-                            # Update existing record
-                            idx = existing_record.index[0]
-                            for col in india_df.columns:
-                                if pd.notna(row[col]
-                                            ):  # Only update non-null values
-                                    india_df.loc[idx, col] = row[col]
-                            updates += 1
-                        else:
-                            # Add new record
-                            india_df.loc[len(india_df)] = row
-                            additions += 1
+                    # Process all rows in one batch
+                    india_df, updates, additions = upsert_records(india_df, new_df)
 
                     # Save updated data
                     india_df.to_csv('merged_india_data.csv', index=False)
@@ -1226,8 +1068,11 @@ def main():
         # Show data overview based on region
         st.write(f"### {region} Data Overview")
 
-        # Load data based on region
+        # Load the latest snapshot with the changes logged since then applied
         df = None
+        snapshot_file = None
+        dataset = region.lower()
+        change_log = get_change_log()
         if region == "India":
             database_dir = 'database'
             modified_dir = os.path.join(database_dir, 'Modified Data')
@@ -1235,37 +1080,32 @@ def main():
 
             # Try Modified Data first
             if os.path.exists(modified_dir):
-                modified_files = sorted([
-                    f for f in os.listdir(modified_dir) if f.endswith('.csv')
-                ],
-                                        reverse=True)
+                modified_files = list_csv_files(modified_dir)
                 if modified_files:
                     latest_file = os.path.join(modified_dir, modified_files[0])
-                    df = pd.read_csv(latest_file)
+                    snapshot_file = latest_file
+                    df = load_snapshot_cached(change_log, dataset, snapshot_file)
                     st.info(
                         f"Loaded latest data from Modified Data: {modified_files[0]}"
                     )
                     st.subheader("Current Data Overview")
-                    st.dataframe(df, use_container_width=True)
+                    show_table(df, key="update_overview")
                     st.text(f"Total records: {len(df)}")
 
                 else:
                     # If Modified Data not available, try Merge Final India
                     if os.path.exists(merge_dir):
-                        merged_files = sorted([
-                            f for f in os.listdir(merge_dir)
-                            if f.endswith('.csv')
-                        ],
-                                              reverse=True)
+                        merged_files = list_csv_files(merge_dir)
                         if merged_files:
                             latest_file = os.path.join(merge_dir,
                                                        merged_files[0])
-                            df = pd.read_csv(latest_file)
+                            snapshot_file = latest_file
+                            df = load_snapshot_cached(change_log, dataset, snapshot_file)
                             st.info(
                                 f"Loaded latest data from Merge Final India: {merged_files[0]}"
                             )
                             st.subheader("Current Data Overview")
-                            st.dataframe(df, use_container_width=True)
+                            show_table(df, key="update_overview")
                             st.text(f"Total records: {len(df)}")
 
                         else:
@@ -1286,18 +1126,16 @@ def main():
             else:
                 # If Modified Data not available, try Merge Final India
                 if os.path.exists(merge_dir):
-                    merged_files = sorted([
-                        f for f in os.listdir(merge_dir) if f.endswith('.csv')
-                    ],
-                                          reverse=True)
+                    merged_files = list_csv_files(merge_dir)
                     if merged_files:
                         latest_file = os.path.join(merge_dir, merged_files[0])
-                        df = pd.read_csv(latest_file)
+                        snapshot_file = latest_file
+                        df = load_snapshot_cached(change_log, dataset, snapshot_file)
                         st.info(
                             f"Loaded latest data from Merge Final India: {merged_files[0]}"
                         )
                         st.subheader("Current Data Overview")
-                        st.dataframe(df, use_container_width=True)
+                        show_table(df, key="update_overview")
                         st.text(f"Total records: {len(df)}")
 
                     else:
@@ -1321,37 +1159,32 @@ def main():
 
             # Try Modified Data US first
             if os.path.exists(modified_dir):
-                modified_files = sorted([
-                    f for f in os.listdir(modified_dir) if f.endswith('.csv')
-                ],
-                                        reverse=True)
+                modified_files = list_csv_files(modified_dir)
                 if modified_files:
                     latest_file = os.path.join(modified_dir, modified_files[0])
-                    df = pd.read_csv(latest_file)
+                    snapshot_file = latest_file
+                    df = load_snapshot_cached(change_log, dataset, snapshot_file)
                     st.info(
                         f"Loaded latest data from Modified Data US: {modified_files[0]}"
                     )
                     st.subheader("Current Data Overview")
-                    st.dataframe(df, use_container_width=True)
+                    show_table(df, key="update_overview")
                     st.text(f"Total records: {len(df)}")
 
                 else:
                     # If Modified Data not available, try Merge Final US
                     if os.path.exists(merge_dir):
-                        merged_files = sorted([
-                            f for f in os.listdir(merge_dir)
-                            if f.endswith('.csv')
-                        ],
-                                              reverse=True)
+                        merged_files = list_csv_files(merge_dir)
                         if merged_files:
                             latest_file = os.path.join(merge_dir,
                                                        merged_files[0])
-                            df = pd.read_csv(latest_file)
+                            snapshot_file = latest_file
+                            df = load_snapshot_cached(change_log, dataset, snapshot_file)
                             st.info(
                                 f"Loaded latest data from Merge Final US: {merged_files[0]}"
                             )
                             st.subheader("Current Data Overview")
-                            st.dataframe(df, use_container_width=True)
+                            show_table(df, key="update_overview")
                             st.text(f"Total records: {len(df)}")
 
                         else:
@@ -1372,13 +1205,11 @@ def main():
             else:
                 # If Modified Data not available, try Merge Final US
                 if os.path.exists(merge_dir):
-                    merged_files = sorted([
-                        f for f in os.listdir(merge_dir) if f.endswith('.csv')
-                    ],
-                                          reverse=True)
+                    merged_files = list_csv_files(merge_dir)
                     if merged_files:
                         latest_file = os.path.join(merge_dir, merged_files[0])
-                        df = pd.read_csv(latest_file)
+                        snapshot_file = latest_file
+                        df = load_snapshot_cached(change_log, dataset, snapshot_file)
                         df = df.drop([
                             'position', 'total_experience', 'notice_period',
                             'annual_salary'
@@ -1387,7 +1218,7 @@ def main():
                             f"Loaded latest data from Merge Final US: {merged_files[0]}"
                         )
                         st.subheader("Current Data Overview")
-                        st.dataframe(df, use_container_width=True)
+                        show_table(df, key="update_overview")
                         st.text(f"Total records: {len(df)}")
 
                     else:
@@ -1416,44 +1247,33 @@ def main():
             f"Enter {search_method.lower()} to search")
 
         if search_term:
-            if search_method == "Name":
-                filtered_df = df[df['name'].str.contains(search_term,
-                                                         case=False,
-                                                         na=False)]
-            elif search_method == "Email":
-                filtered_df = df[df['email'].str.contains(search_term,
-                                                          case=False,
-                                                          na=False)]
-            else:  # Phone
-                filtered_df = df[df['phone'].astype(str).str.contains(
-                    search_term, na=False)]
-
-            if len(filtered_df) == 0:
+            search_index = get_search_index(
+                df, snapshot_version(change_log, dataset, snapshot_file))
+            matches = search_index.search(SEARCH_COLUMNS[search_method],
+                                          search_term)
+
+            if len(matches) == 0:
                 st.warning(
                     f"No candidates found with {search_method.lower()} containing '{search_term}'"
                 )
             else:
-                st.success(f"Found {len(filtered_df)} candidate(s)")
+                st.success(f"Found {len(matches)} candidate(s)")
 
-                # Display candidates as selectable options
-                candidate_options = []
-                for i, row in filtered_df.iterrows():
-                    candidate = f"{row['name']} - {row.get('email', 'No email')} - {row.get('phone', 'No phone')}"
-                    candidate_options.append((candidate, i))
+                # Display one page of candidates as selectable options
+                pages = page_count(len(matches))
+                page = st.sidebar.number_input(
+                    f"Results page (of {pages})", min_value=1,
+                    max_value=pages, value=1) if pages > 1 else 1
+                candidate_options = describe_candidates(
+                    df, get_page(matches, page))
 
                 if candidate_options:
-                    selected_option = st.selectbox(
+                    selected_index = st.selectbox(
                         "Select a candidate to update",
-                        options=[c[0] for c in candidate_options],
+                        options=list(candidate_options),
+                        format_func=candidate_options.get,
                         key="candidate_selector")
 
-                    # Get the index of the selected candidate
-                    selected_index = None
-                    for option, idx in candidate_options:
-                        if option == selected_option:
-                            selected_index = idx
-                            break
-
                     if selected_index is not None:
                         selected_candidate = df.loc[selected_index]
                         st.subheader(f"Update {selected_candidate['name']}")
@@ -1608,59 +1428,38 @@ def main():
                         with col1:
                             if st.button("Save Changes"):
                                 try:
-                                    # Create backup before changes
-                                    timestamp = datetime.now().strftime(
-                                        '%Y%m%d_%H%M%S')
-                                    backup_dir = os.path.join(
-                                        'database', 'backups')
-                                    if not os.path.exists(backup_dir):
-                                        os.makedirs(backup_dir)
-                                    backup_file = os.path.join(
-                                        backup_dir,
-                                        f'backup_before_changes_{timestamp}.csv'
-                                    )
-                                    df.to_csv(backup_file, index=False)
+                                    old_row = df.loc[selected_index].copy()
 
                                     if region == "US":
-                                        df.loc[selected_index, 'name'] = name
-                                        df.loc[selected_index, 'email'] = email
-                                        df.loc[selected_index, 'phone'] = phone
-                                        df.loc[selected_index, 'Date'] = date
-                                        df.loc[selected_index,
-                                               'location'] = location
-                                        df.loc[selected_index,
-                                               'job title'] = job_title
-                                        df.loc[selected_index,
-                                               'salary'] = salary
-                                        df.loc[selected_index,
-                                               'US Person'] = us_person
-                                        df.loc[selected_index,
-                                               'status'] = status
-                                        df.loc[selected_index, 'Stage'] = stage
-                                        df.loc[selected_index,
-                                               'source'] = source
-                                        df.loc[selected_index,
-                                               'Meeting Notes'] = notes
+                                        set_fields(df, selected_index, {
+                                            'name': name,
+                                            'email': email,
+                                            'phone': phone,
+                                            'Date': date,
+                                            'location': location,
+                                            'job title': job_title,
+                                            'salary': salary,
+                                            'US Person': us_person,
+                                            'status': status,
+                                            'Stage': stage,
+                                            'source': source,
+                                            'Meeting Notes': notes
+                                        })
 
                                     else:  # India
-                                        df.loc[selected_index, 'name'] = name
-                                        df.loc[selected_index, 'email'] = email
-                                        df.loc[selected_index, 'phone'] = phone
-                                        df.loc[selected_index, 'Date'] = date
-                                        df.loc[selected_index,
-                                               'location'] = location
-                                        df.loc[
-                                            selected_index,
-                                            'total_experience'] = total_experience
-                                        df.loc[selected_index,
-                                               'annual_salary'] = annual_salary
-                                        df.loc[selected_index,
-                                               'notice_period'] = notice_period
-                                        df.loc[selected_index,
-                                               'position'] = position
-                                        df.loc[selected_index, 'Stage'] = stage
-                                        df.loc[selected_index,
-                                               'source'] = source
+                                        set_fields(df, selected_index, {
+                                            'name': name,
+                                            'email': email,
+                                            'phone': phone,
+                                            'Date': date,
+                                            'location': location,
+                                            'total_experience': total_experience,
+                                            'annual_salary': annual_salary,
+                                            'notice_period': notice_period,
+                                            'position': position,
+                                            'Stage': stage,
+                                            'source': source
+                                        })
                                         # Preserve existing notes and append new ones
                                         existing_notes = str(
                                             df.loc[selected_index, 'meeting_notes'])
@@ -1676,20 +1475,23 @@ def main():
                                                 new_notes = f"[{current_time}]: {notes}"
                                             df.loc[selected_index,
                                                    'meeting_notes'] = new_notes
-                                        df.loc[selected_index,
-                                               'status'] = status
-
-                                    # Save to Modified Data directory
-                                    modified_dir = os.path.join(
-                                        'database',
-                                        f'Modified Data{" US" if region == "US" else ""}'
-                                    )
-                                    os.makedirs(modified_dir, exist_ok=True)
-                                    modified_file = os.path.join(
-                                        modified_dir,
-                                        f'modified_{region.lower()}_data_{timestamp}.csv'
-                                    )
-                                    df.to_csv(modified_file, index=False)
+                                        set_fields(df, selected_index,
+                                                   {'status': status})
+
+                                    # Log the changed fields, then save the Modified
+                                    # Data snapshot with them applied
+                                    change_log.record_edit(
+                                        dataset,
+                                        os.path.basename(snapshot_file),
+                                        selected_index, old_row,
+                                        df.loc[selected_index],
+                                        source='Candidate Data Update Tool')
+                                    write_snapshot(
+                                        change_log, dataset, df,
+                                        os.path.join(
+                                            'database',
+                                            f'Modified Data{" US" if region == "US" else ""}'
+                                        ))
 
                                     st.success(
                                         f"Successfully saved changes for {name}"
@@ -1702,34 +1504,20 @@ def main():
                         with col2:
                             if st.button("Delete Record"):
                                 try:
-                                    # Create backup before deletion
-                                    timestamp = datetime.now().strftime(
-                                        '%Y%m%d_%H%M%S')
-                                    backup_dir = os.path.join(
-                                        'database', 'backups')
-                                    if not os.path.exists(backup_dir):
-                                        os.makedirs(backup_dir)
-                                    backup_file = os.path.join(
-                                        backup_dir,
-                                        f'backup_before_deletion_{timestamp}.csv'
-                                    )
-                                    df.to_csv(backup_file, index=False)
-
-                                    # Remove the record
-                                    df = df.drop(selected_index).reset_index(
-                                        drop=True)
-
-                                    # Save to Modified Data directory
-                                    modified_dir = os.path.join(
-                                        'database',
-                                        f'Modified Data{" US" if region == "US" else ""}'
-                                    )
-                                    os.makedirs(modified_dir, exist_ok=True)
-                                    modified_file = os.path.join(
-                                        modified_dir,
-                                        f'modified_{region.lower()}_data_{timestamp}.csv'
-                                    )
-                                    df.to_csv(modified_file, index=False)
+                                    # Remove the record, log the deletion and save
+                                    # the Modified Data snapshot without it
+                                    df = df.drop(selected_index)
+                                    change_log.record_delete(
+                                        dataset,
+                                        os.path.basename(snapshot_file),
+                                        [selected_index],
+                                        source='Candidate Data Update Tool')
+                                    write_snapshot(
+                                        change_log, dataset, df,
+                                        os.path.join(
+                                            'database',
+                                            f'Modified Data{" US" if region == "US" else ""}'
+                                        ))
 
                                     st.success(
                                         f"Successfully deleted record for {name}"
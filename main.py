@@ -4,8 +4,34 @@ import sys
 import shutil
 from datetime import datetime
 
-def read_file(file_path, keep_first_row=False, is_naukri=False, is_linkedin=False):
-    """Read Excel or CSV file and return a pandas DataFrame."""
+from utils.active_project import split_active_project
+from utils.candidate_store import get_store, import_csv
+from utils.column_mapping import get_projection_plan
+
+# Column positions kept by the fixed-layout source preprocessors; read_file can
+# project files onto them so the other columns are never loaded
+CALENDLY_INDIA_COLUMNS = [2, 5, 10, 18, 20, 22, 26, 28, 30, 41, 42]
+CALENDLY_US_COLUMNS = [2, 5, 8, 13, 18, 20, 22, 26, 37, 38]
+INDEED_US_COLUMNS = [0, 1, 2, 3, 4, 5, 7]
+SOURCE_COLUMNS = {
+    'Calendly_India': CALENDLY_INDIA_COLUMNS,
+    'Calendly_US': CALENDLY_US_COLUMNS,
+    'Indeed_US': INDEED_US_COLUMNS,
+}
+# Calendly exports are free text (answers, phone numbers); parse them as strings
+SOURCE_DTYPES = {
+    'Calendly_India': str,
+    'Calendly_US': str,
+}
+
+def read_file(file_path, keep_first_row=False, is_naukri=False, is_linkedin=False,
+              usecols=None, dtype=None):
+    """Read Excel or CSV file and return a pandas DataFrame.
+
+    usecols (e.g. SOURCE_COLUMNS[source]) limits both formats to the columns the
+    source preprocessor keeps, and dtype (e.g. SOURCE_DTYPES[source]) is passed to
+    the CSV parser.
+    """
     if not os.path.exists(file_path):
         print(f"Error: File {file_path} does not exist.")
         return None
@@ -16,16 +42,28 @@ def read_file(file_path, keep_first_row=False, is_naukri=False, is_linkedin=Fals
 
     try:
         if file_extension == '.csv':
-            # Read CSV file
-            df = pd.read_csv(file_path)
+            # Read CSV file, letting the parser skip the unused columns
+            if usecols is not None:
+                n_columns = len(pd.read_csv(file_path, nrows=0).columns)
+                usecols = [i for i in usecols if i < n_columns]
+                df = pd.read_csv(file_path, usecols=usecols, dtype=dtype)
+                df.attrs['usecols'] = usecols
+            else:
+                df = pd.read_csv(file_path, dtype=dtype)
             print(f"Successfully read CSV file: {file_path}")
         elif file_extension in ['.xlsx', '.xls']:
             # Read Excel file - for LinkedIn files, always skip the first row
+            header = 1 if is_linkedin else 0
+            try:
+                df = pd.read_excel(file_path, skiprows=header, usecols=usecols)
+                df.attrs['usecols'] = usecols
+            except pd.errors.ParserError:
+                # A sheet narrower than usecols is read whole; its columns are then
+                # dropped by position as for unprojected reads
+                df = pd.read_excel(file_path, skiprows=header)
             if is_linkedin:
-                df = pd.read_excel(file_path, skiprows=1)
                 print(f"Successfully read Excel file: {file_path} (skipped first row for LinkedIn)")
             else:
-                df = pd.read_excel(file_path)
                 print(f"Successfully read Excel file: {file_path}")
         else:
             print(f"Error: Unsupported file format. Please provide a CSV, XLS, or XLSX file.")
@@ -147,29 +185,68 @@ def define_column_tags():
         'Calendly_US': Calendly_US
     }
 
+# Column tags and their keyword -> {source: weight} inverted index, built once at import.
+# A keyword listed under several categories of a source counts once per category.
+COLUMN_TAGS = define_column_tags()
+SOURCE_KEYWORD_INDEX = {}
+for _source_name, _source_dict in COLUMN_TAGS.items():
+    for _keywords in _source_dict.values():
+        for _keyword in _keywords:
+            _weights = SOURCE_KEYWORD_INDEX.setdefault(_keyword.lower(), {})
+            _weights[_source_name] = _weights.get(_source_name, 0) + 1
+
+# Files whose best and runner-up match scores are at most this far apart are flagged
+# as ambiguous (0: only ties, which are otherwise decided by COLUMN_TAGS order)
+AMBIGUITY_MARGIN = 0
+
+
+def score_source_types(columns):
+    """Score a header row against every source in a single pass over the keyword index.
+
+    A keyword matches when it is a substring of any (lowercased) column name.
+
+    Parameters:
+        columns (iterable): Column names of the file
+
+    Returns:
+        dict: Match score per source type, in COLUMN_TAGS order
+    """
+    # Newlines never occur in keywords, so a keyword found in the joined header is a
+    # substring of one column
+    header = '\n'.join(str(col).lower() for col in columns)
+    scores = dict.fromkeys(COLUMN_TAGS, 0)
+    for keyword, weights in SOURCE_KEYWORD_INDEX.items():
+        if keyword in header:
+            for source_name, weight in weights.items():
+                scores[source_name] += weight
+    return scores
+
+
+def classify_source_type(columns):
+    """Classify a header row and report how confident the classification is.
+
+    Returns:
+        tuple: (best source type, {source type: confidence in [0, 1]}, ambiguous flag)
+            where confidence is the source's share of all match scores and ambiguous is
+            True when the runner-up is within AMBIGUITY_MARGIN of the best score
+    """
+    scores = score_source_types(columns)
+    best_match = max(scores, key=scores.get)
+    total = sum(scores.values())
+    confidences = {source: (score / total if total else 0.0) for source, score in scores.items()}
+    runner_up = max(score for source, score in scores.items() if source != best_match)
+    ambiguous = scores[best_match] - runner_up <= AMBIGUITY_MARGIN
+    return best_match, confidences, ambiguous
+
+
 def identify_source_type(df):
     """Identify which source dictionary best matches the dataframe columns"""
-    tags = define_column_tags()
-
-    # Convert all column names to lowercase for matching
-    df_columns = [col.lower() for col in df.columns]
-
-    # Score each source type based on column matches
-    scores = {}
-    for source_name, source_dict in tags.items():
-        score = 0
-        for category, keywords in source_dict.items():
-            for keyword in keywords:
-                for col in df_columns:
-                    if keyword.lower() in col:
-                        score += 1
-                        break
-        scores[source_name] = score
-
-    # Return the source type with the highest score
-    best_match = max(scores, key=scores.get)
-    print(f"Detected source type: {best_match} (match score: {scores[best_match]})")
-    return best_match, tags[best_match]
+    best_match, confidences, ambiguous = classify_source_type(df.columns)
+    print(f"Detected source type: {best_match} (confidence: {confidences[best_match]:.2f})")
+    if ambiguous:
+        print(f"  Warning: ambiguous source type, scores: "
+              f"{ {source: round(c, 2) for source, c in confidences.items()} }")
+    return best_match, COLUMN_TAGS[best_match]
 
 def preprocess_linkedin_india(df):
     """Special preprocessing for LinkedIn India format"""
@@ -239,29 +316,10 @@ def preprocess_linkedin_india(df):
 
     # Split active_project column to extract content in parentheses
     if 'active_project' in processed_df.columns:
-        # Create a function to extract text inside parentheses
-        def extract_parentheses(text):
-            if pd.isna(text):
-                return ('', '')
-
-            import re
-            # Find content inside parentheses
-            match = re.search(r'\((.*?)\)', str(text))
-            if match:
-                # Get text before parentheses
-                main_text = str(text).split('(')[0].strip()
-                # Get text inside parentheses
-                parentheses_text = match.group(1).strip()
-                return (main_text, parentheses_text)
-            else:
-                return (str(text), '')
-
-        # Apply the function to split the active_project column
-        split_results = processed_df['active_project'].apply(extract_parentheses)
-
-        # Create new columns with the split results
-        processed_df['active_project'] = split_results.str[0]  # Text before parentheses
-        processed_df['status'] = split_results.str[1]  # Text inside parentheses is renamed to status directly
+        # Split the whole column at once into the text before and inside parentheses
+        split_results = split_active_project(processed_df['active_project'])
+        processed_df['active_project'] = split_results['position']  # Text before parentheses
+        processed_df['status'] = split_results['status']  # Text inside parentheses is renamed to status directly
 
         # Map active_project to position
         processed_df['position'] = processed_df['active_project']
@@ -323,10 +381,14 @@ def preprocess_calendly_india(df):
 
     # Columns to keep (3, 6, 11, 19, 21, 23, 27, 29, 31, 42, 43)
     # Convert to zero-based indexing
-    columns_to_keep = [2, 5, 10, 18, 20, 22, 26, 28, 30, 41, 42]  # -1 from each
+    columns_to_keep = CALENDLY_INDIA_COLUMNS  # -1 from each
 
-    # Get columns to drop (all except those to keep)
-    columns_to_drop = [i for i in all_columns if i not in columns_to_keep]
+    # Get columns to drop (all except those to keep); frames read with
+    # usecols=columns_to_keep already hold only the kept columns
+    if processed_df.attrs.get('usecols') is not None:
+        columns_to_drop = []
+    else:
+        columns_to_drop = [i for i in all_columns if i not in columns_to_keep]
 
     # Drop the columns by position
     if columns_to_drop:
@@ -371,10 +433,14 @@ def preprocess_indeed_us(df):
 
     # Columns to keep (1, 2, 3, 4, 5, 6, 8)
     # Convert to zero-based indexing
-    columns_to_keep = [0, 1, 2, 3, 4, 5, 7]  # -1 from each
+    columns_to_keep = INDEED_US_COLUMNS  # -1 from each
 
-    # Get columns to drop (all except those to keep)
-    columns_to_drop = [i for i in all_columns if i not in columns_to_keep]
+    # Get columns to drop (all except those to keep); frames read with
+    # usecols=columns_to_keep already hold only the kept columns
+    if processed_df.attrs.get('usecols') is not None:
+        columns_to_drop = []
+    else:
+        columns_to_drop = [i for i in all_columns if i not in columns_to_keep]
 
     # Drop the columns by position
     if columns_to_drop:
@@ -415,10 +481,14 @@ def preprocess_calendly_us(df):
 
     # Columns to keep (3, 6, 9, 14, 19, 21, 23, 27, 38, 39)
     # Convert to zero-based indexing
-    columns_to_keep = [2, 5, 8, 13, 18, 20, 22, 26, 37, 38]  # -1 from each
+    columns_to_keep = CALENDLY_US_COLUMNS  # -1 from each
 
-    # Get columns to drop (all except those to keep)
-    columns_to_drop = [i for i in all_columns if i not in columns_to_keep]
+    # Get columns to drop (all except those to keep); frames read with
+    # usecols=columns_to_keep already hold only the kept columns
+    if processed_df.attrs.get('usecols') is not None:
+        columns_to_drop = []
+    else:
+        columns_to_drop = [i for i in all_columns if i not in columns_to_keep]
 
     # Drop the columns by position
     if columns_to_drop:
@@ -472,19 +542,14 @@ def process_columns(df, source_type, source_tags):
     # Convert all dataframe columns to lowercase for matching
     df.columns = [col.lower() for col in df.columns]
 
-    # Map columns based on source tags
-    for category, keywords in source_tags.items():
-        matched = False
-        for keyword in keywords:
-            matching_cols = [col for col in df.columns if keyword in col]
-            if matching_cols:
-                # Use the first matching column
-                processed_df[category] = df[matching_cols[0]]
-                print(f"  Mapped '{matching_cols[0]}' to '{category}'")
-                matched = True
-                break
-
-        if not matched:
+    # Map columns based on source tags; the plan is built once per header layout
+    projection = get_projection_plan(df.columns, source_tags)['plan']
+    for category, column in projection.items():
+        if column is not None:
+            # Use the first matching column
+            processed_df[category] = df[column]
+            print(f"  Mapped '{column}' to '{category}'")
+        else:
             # Add empty column if no match found
             processed_df[category] = None
             print(f"  No match found for '{category}'")
@@ -561,29 +626,10 @@ def preprocess_linkedin_us(df):
 
     # Split active_project column to extract content in parentheses
     if 'active_project' in processed_df.columns:
-        # Create a function to extract text inside parentheses
-        def extract_parentheses(text):
-            if pd.isna(text):
-                return ('', '')
-
-            import re
-            # Find content inside parentheses
-            match = re.search(r'\((.*?)\)', str(text))
-            if match:
-                # Get text before parentheses
-                main_text = str(text).split('(')[0].strip()
-                # Get text inside parentheses
-                parentheses_text = match.group(1).strip()
-                return (main_text, parentheses_text)
-            else:
-                return (str(text), '')
-
-        # Apply the function to split the active_project column
-        split_results = processed_df['active_project'].apply(extract_parentheses)
-
-        # Create new columns with the split results
-        processed_df['active_project'] = split_results.str[0]  # Text before parentheses
-        processed_df['status'] = split_results.str[1]  # Text inside parentheses is renamed to status directly
+        # Split the whole column at once into the text before and inside parentheses
+        split_results = split_active_project(processed_df['active_project'])
+        processed_df['active_project'] = split_results['position']  # Text before parentheses
+        processed_df['status'] = split_results['status']  # Text inside parentheses is renamed to status directly
         print("  Extracted content in parentheses to 'status' column (instead of project_details)")
 
     # Merge first and last name into a single 'name' column
@@ -1058,7 +1104,8 @@ def run_add_stage_column():
 
 
 def store_database(timestamp=None):
-    """Store a copy of the database in a database directory with timestamp"""
+    """Load the merged files into the candidate store ('us', 'india' and 'all'
+    datasets) and keep a timestamped CSV copy of them as an export snapshot"""
     if timestamp is None:
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
 
@@ -1075,9 +1122,13 @@ def store_database(timestamp=None):
     ]
 
     stored_files = []
+    store = get_store()
 
     for file in db_files:
         if os.path.exists(file):
+            # merged_us_data.csv -> 'us'
+            import_csv(store, file[len('merged_'):-len('_data.csv')], file)
+
             # Copy the file to the database directory
             dest_path = os.path.join(db_dir, file)
             shutil.copy2(file, dest_path)
@@ -1,23 +1,8 @@
 
 import pandas as pd
 import os
-
-def standardize_name(name):
-    """Standardize name format to First Last with proper capitalization"""
-    if pd.isna(name) or name == '':
-        return name
-    
-    # Convert to string if not already
-    name = str(name).strip()
-    
-    # Split the name into words
-    words = name.split()
-    
-    # Capitalize each word
-    capitalized_words = [word.capitalize() for word in words]
-    
-    # Join words back together
-    return ' '.join(capitalized_words)
+from utils.date_parsing import parse_dates
+from utils.standardization import standardize_names
 
 def merge_records(main_record, calendly_record):
     """Merge a Calendly record with a main record"""
@@ -65,7 +50,7 @@ def merge_calendly_data(file_path):
     print(f"Created backup at {backup_path}")
     
     # Standardize names for better matching
-    df['name'] = df['name'].apply(standardize_name)
+    df['name'] = standardize_names(df['name'])
     
     # Identify Calendly records
     calendly_mask = df['source'].str.contains('Calendly', case=False, na=False)
@@ -78,6 +63,13 @@ def merge_calendly_data(file_path):
     if not other_mask.any():
         print(f"No non-Calendly records found in {file_path}. Skipping.")
         return
+
+    # Normalize the mixed-format Calendly dates so merged records share one format
+    if 'date' in df.columns:
+        dates = parse_dates(df.loc[calendly_mask, 'date'])
+        parsed = dates.notna()
+        df['date'] = df['date'].astype(object)
+        df.loc[parsed[parsed].index, 'date'] = dates[parsed].dt.strftime('%Y-%m-%d %H:%M:%S')
     
     calendly_records = df[calendly_mask].copy()
     other_records = df[other_mask].copy()
@@ -1,7 +1,8 @@
 import pandas as pd
-import networkx as nx
+from utils.clustering import MATCH_KEYS, add_match_keys, cluster_by_keys, collapse_clusters
 
-def merge_duplicates(df: pd.DataFrame) -> pd.DataFrame:
+def merge_duplicates(df: pd.DataFrame, policies: dict = None,
+                     identity_index=None) -> pd.DataFrame:
     print('Merging duplicates started')
     """
     Merge duplicate rows in the DataFrame based on matching on any two of the three keys:
@@ -11,64 +12,47 @@ def merge_duplicates(df: pd.DataFrame) -> pd.DataFrame:
     - key2: name + phone
     - key3: email + phone
 
-    For rows that match on at least one key, the function clusters them using a graph-based approach,
-    and merges them into a single row. The 'source' column is updated to include all unique sources
-    from the duplicate rows, concatenated with commas.
+    For rows that match on at least one key, the function clusters them using a union-find
+    (disjoint-set) approach, and merges them into a single row. The 'source' column is updated to include all unique sources
+    from the duplicate rows, concatenated with commas. Other columns are taken from the
+    first row of the cluster unless a merge policy is given for them.
 
     Parameters:
         df (pd.DataFrame): The input DataFrame with columns 'name', 'email', 'phone', and 'source'
+        policies (dict): Optional column -> merge policy ('first', 'first_non_null', 'latest'
+            by 'Date', or 'concat'), see utils.clustering.collapse_clusters
+        identity_index (IdentityIndex): Optional persistent index; when given, rows are
+            clustered by their stable candidate ID and the 'candidate_id' column is kept
 
     Returns:
         pd.DataFrame: A new DataFrame with duplicates merged.
     """
 
-    # Normalize phone numbers (remove non-digit characters)
-    df['phone_norm'] = df['phone'].astype(str).str.replace(r'\D', '', regex=True)
-
-    # Normalize name and email (lowercase and strip extra spaces)
-    df['name_norm'] = df['name'].str.lower().str.strip()
-    df['email_norm'] = df['email'].str.lower().str.strip()
-
-    # Create matching keys for grouping
-    df['key1'] = df['name_norm'] + '_' + df['email_norm']
-    df['key2'] = df['name_norm'] + '_' + df['phone_norm']
-    df['key3'] = df['email_norm'] + '_' + df['phone_norm']
-
-    # Build a graph where each row (index) is a node.
-    # If two rows share the same key (key1, key2, or key3), we add an edge between them.
-    G = nx.Graph()
-    G.add_nodes_from(df.index)
-
-    for key in ['key1', 'key2', 'key3']:
-        for group_val, group in df.groupby(key):
-            indices = list(group.index)
-            if len(indices) > 1:
-                # Add edges between all nodes that share this key
-                for i in range(len(indices)):
-                    for j in range(i + 1, len(indices)):
-                        G.add_edge(indices[i], indices[j])
-
-    # Find connected components in the graph;
-    # each component represents a cluster of duplicate rows.
-    components = list(nx.connected_components(G))
-
-    merged_rows = []
-    for comp in components:
-        comp_data = df.loc[list(comp)]
-        # Select the first row as the base row (can be customized)
-        base_row = comp_data.iloc[0].copy()
-        # Combine the unique source values from all rows in the component
-        sources = comp_data['source'].unique()
-        # base_row['source'] = ','.join(sources)
-        base_row['source'] = ','.join(str(s) for s in sources if pd.notna(s))
-        # You can merge other columns as needed here.
-        merged_rows.append(base_row)
-
-    # Create a DataFrame from the merged rows
-    merged_df = pd.DataFrame(merged_rows)
+    # Normalize name, email and phone and build the key1/key2/key3 matching keys.
+    # Empty or placeholder keys (e.g. 'name_nan') are masked so they cannot chain
+    # unrelated people into one cluster.
+    excluded = add_match_keys(df)
+    print(f'Rows excluded from matching per key: {excluded}')
+
+    if identity_index is not None:
+        # The index clusters the batch and links it to previously seen candidates,
+        # so only this frame's keys are looked up and inserted.
+        df['candidate_id'] = identity_index.assign_ids(df).to_numpy()
+        cluster_col = 'candidate_id'
+    else:
+        # Cluster rows that share a key (key1, key2, or key3) with a union-find.
+        # Each row is linked only to the first row of its key group, so the cost
+        # stays linear even when a key group holds thousands of rows.
+        df['cluster_id'] = cluster_by_keys(df, MATCH_KEYS)
+        cluster_col = 'cluster_id'
+
+    # Collapse every cluster into its first row in one pass, joining the
+    # unique sources and applying any per-column merge policies.
+    merged_df = collapse_clusters(df, cluster_col, policies=policies)
 
     # Optionally, drop helper columns used for matching
-    columns_to_drop = ['phone_norm', 'name_norm', 'email_norm', 'key1', 'key2', 'key3']
+    columns_to_drop = ['phone_norm', 'name_norm', 'email_norm', 'key1', 'key2', 'key3',
+                       'cluster_id']
     merged_df.drop(columns=columns_to_drop, inplace=True, errors='ignore')
     print('Merging duplicates completed')
 
@@ -1,7 +1,7 @@
 
 import os
 import pandas as pd
-from main import read_file, identify_source_type, process_columns, define_column_tags
+from main import read_file, identify_source_type, process_columns, define_column_tags, SOURCE_COLUMNS, SOURCE_DTYPES
 
 def ensure_uploads_directory():
     """Ensure the uploads directory exists"""
@@ -52,7 +52,8 @@ def preprocess_file(file_path, source_type, is_naukri=False, is_linkedin=False):
     
     # Read the file with appropriate settings
     keep_first_row = is_naukri
-    df = read_file(file_path, keep_first_row=keep_first_row, is_naukri=is_naukri, is_linkedin=is_linkedin)
+    df = read_file(file_path, keep_first_row=keep_first_row, is_naukri=is_naukri, is_linkedin=is_linkedin,
+                   usecols=SOURCE_COLUMNS.get(source_type), dtype=SOURCE_DTYPES.get(source_type))
     
     if df is None:
         print(f"Error: Failed to read {source_type} file")
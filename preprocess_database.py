@@ -1,62 +1,7 @@
 
 import pandas as pd
 import os
-import re
-
-def standardize_name(name):
-    """Standardize name format to First Last with proper capitalization"""
-    if pd.isna(name) or name == '':
-        return name
-    
-    # Convert to string and remove extra whitespace
-    name = str(name).strip()
-    
-    # Handle multiple spaces between words
-    name = ' '.join(name.split())
-    
-    # Split the name into words
-    words = name.split()
-    
-    # Capitalize first letter of each word, rest lowercase
-    standardized_words = []
-    for word in words:
-        if word:
-            # First lowercase the entire word
-            word = word.lower()
-            # Then capitalize just the first letter
-            word = word[0].upper() + word[1:]
-            standardized_words.append(word)
-    
-    # Join words back together with single space
-    return ' '.join(standardized_words)
-
-def standardize_phone(phone):
-    """Standardize phone numbers to be 10, 11, or 12 digits"""
-    if pd.isna(phone) or phone == '':
-        return phone
-    
-    # Convert to string if not already
-    phone = str(phone)
-    
-    # Remove all non-numeric characters
-    digits = re.sub(r'\D', '', phone)
-    
-    # Check if the number has 10, 11 or 12 digits
-    if len(digits) == 10:
-        # 10 digits (no country code)
-        return digits
-    elif len(digits) == 11 and digits.startswith('1'):
-        # 11 digits with US country code
-        return digits
-    elif len(digits) == 12 and digits.startswith('91'):
-        # 12 digits with India country code
-        return digits
-    elif len(digits) > 10:
-        # If more digits, try to extract last 10 digits as the main number
-        return digits[-10:]
-    else:
-        # Return whatever we have if less than 10 digits
-        return digits
+from utils.standardization import standardize_contacts
 
 def preprocess_files():
     """Preprocess database files to standardize names and phone numbers"""
@@ -75,24 +20,12 @@ def preprocess_files():
         # Read the file
         df = pd.read_csv(file_path)
         
-        # Keep track of changes
-        name_changes = 0
-        phone_changes = 0
-        
-        # Standardize names
-        if 'name' in df.columns:
-            original_names = df['name'].copy()
-            #df['name'] = df['name'].apply(standardize_name)
-            df['name']=df['name'].str.title()
-            name_changes = (original_names != df['name']).sum()
-            print(f"Standardized {name_changes} names")
-        
-        # Standardize phone numbers
-        if 'phone' in df.columns:
-            original_phones = df['phone'].copy()
-            df['phone'] = df['phone'].apply(standardize_phone)
-            phone_changes = (original_phones != df['phone']).sum()
-            print(f"Standardized {phone_changes} phone numbers")
+        # Standardize names and phone numbers column-wise, keeping track of changes
+        changes = standardize_contacts(df)
+        if 'name' in changes:
+            print(f"Standardized {changes['name']} names")
+        if 'phone' in changes:
+            print(f"Standardized {changes['phone']} phone numbers")
         
         # Save the changes
         df.to_csv(file_path, index=False)
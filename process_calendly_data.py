@@ -2,6 +2,7 @@
 import pandas as pd
 import os
 from datetime import datetime
+from utils.date_parsing import parse_date_column
 
 def preprocess_calendly(file_path, is_us=True):
     """Process Calendly data from US or India"""
@@ -91,16 +92,8 @@ def preprocess_calendly(file_path, is_us=True):
         # Convert date strings to datetime objects and sort by date
         if 'date' in df.columns:
             try:
-                # Try multiple date formats
-                date_formats = ['%Y-%m-%d', '%m/%d/%Y', '%d/%m/%Y', '%B %d, %Y']
-                
-                for date_format in date_formats:
-                    try:
-                        df['date'] = pd.to_datetime(df['date'], format=date_format)
-                        print(f"  Successfully parsed dates using format: {date_format}")
-                        break
-                    except:
-                        continue
+                # Each row's format is detected once and parsed with its format group
+                parse_date_column(df, 'date')
                 
                 # Sort by date (most recent first)
                 df = df.sort_values('date', ascending=False)
@@ -118,6 +111,58 @@ def preprocess_calendly(file_path, is_us=True):
         print(f"Error processing Calendly {country_name} file: {e}")
         return None
 
+def match_calendly_pairs(calendly_df, main_df):
+    """Return every (calendly_pos, main_pos) pair matching on name+email or name+phone,
+    ordered by Calendly row and then main row"""
+    calendly_keys = pd.DataFrame({
+        'calendly_pos': range(len(calendly_df)),
+        'name_email_key': calendly_df['name_email_key'].to_numpy(),
+        'name_phone_key': calendly_df['name_phone_key'].to_numpy()
+    })
+    main_keys = pd.DataFrame({
+        'main_pos': range(len(main_df)),
+        'name_email_key': main_df['name_email_key'].to_numpy(),
+        'name_phone_key': main_df['name_phone_key'].to_numpy()
+    })
+    pairs = pd.concat([
+        calendly_keys.merge(main_keys, on=key)[['calendly_pos', 'main_pos']]
+        for key in ['name_email_key', 'name_phone_key']
+    ])
+    return pairs.drop_duplicates().sort_values(['calendly_pos', 'main_pos'],
+                                               ignore_index=True)
+
+def apply_calendly_updates(pairs, calendly_df, main_df):
+    """Apply status, phone and email updates from matched Calendly rows to main_df.
+
+    Calendly rows are applied in order: the last non-empty status wins, and a missing
+    phone or email is filled from the first matching Calendly row that has one.
+    Returns the number of (Calendly row, main row) matches that changed something,
+    counted the same way as the original row-by-row update.
+    """
+    main_index = main_df.index[pairs['main_pos'].to_numpy()]
+    updated = pd.Series(False, index=pairs.index)
+
+    if 'status' in calendly_df.columns:
+        status = calendly_df['status'].to_numpy()[pairs['calendly_pos'].to_numpy()]
+        has_status = pd.notna(status)
+        updated |= has_status
+        latest = pairs[has_status].drop_duplicates('main_pos', keep='last')
+        if len(latest):
+            main_df.loc[main_df.index[latest['main_pos'].to_numpy()], 'status'] = (
+                status[latest.index.to_numpy()])
+
+    for col in ['phone', 'email']:
+        # Only the first Calendly value fills a gap; later matches see it filled
+        values = calendly_df[col].to_numpy()[pairs['calendly_pos'].to_numpy()]
+        fills = pd.notna(values) & main_df[col].isna().to_numpy()[pairs['main_pos'].to_numpy()]
+        first_fill = pairs[fills].drop_duplicates('main_pos', keep='first')
+        updated.loc[first_fill.index] = True
+        if len(first_fill):
+            main_df.loc[main_index[first_fill.index.to_numpy()], col] = (
+                values[first_fill.index.to_numpy()])
+
+    return int(updated.sum())
+
 def merge_calendly_with_main_data(calendly_df, main_file_path):
     """Merge Calendly data with main dataset (US or India), handling duplicates"""
     print(f"\nMerging Calendly data with {main_file_path}...")
@@ -208,41 +253,13 @@ def merge_calendly_with_main_data(calendly_df, main_file_path):
         
         print(f"Processing {len(matching_calendly)} matching records and {len(non_matching_calendly)} new records")
         
-        # For matching records, we'll update specific fields in main_df
+        # For matching records, we'll update specific fields in main_df.
+        # All (Calendly row, main row) matches are resolved with one hash join on
+        # each key and the field updates are applied as column assignments.
         updated_count = 0
         if len(matching_calendly) > 0:
-            # Update main dataset with information from matching Calendly records
-            for idx, calendly_row in matching_calendly.iterrows():
-                # Find matching rows in main_df
-                email_match_mask = main_df['name_email_key'] == calendly_row['name_email_key']
-                phone_match_mask = main_df['name_phone_key'] == calendly_row['name_phone_key']
-                match_mask = email_match_mask | phone_match_mask
-                
-                if match_mask.any():
-                    # Get the indices of matching rows
-                    match_indices = main_df.index[match_mask].tolist()
-                    
-                    # For each matching row in main_df
-                    for main_idx in match_indices:
-                        updated = False
-                        
-                        # Update status if available
-                        if 'status' in calendly_row and not pd.isna(calendly_row['status']):
-                            main_df.at[main_idx, 'status'] = calendly_row['status']
-                            updated = True
-                        
-                        # Update other relevant fields as needed
-                        # For example, you might want to update phone or email if one is missing
-                        if pd.isna(main_df.at[main_idx, 'phone']) and not pd.isna(calendly_row['phone']):
-                            main_df.at[main_idx, 'phone'] = calendly_row['phone']
-                            updated = True
-                            
-                        if pd.isna(main_df.at[main_idx, 'email']) and not pd.isna(calendly_row['email']):
-                            main_df.at[main_idx, 'email'] = calendly_row['email']
-                            updated = True
-                        
-                        if updated:
-                            updated_count += 1
+            pairs = match_calendly_pairs(matching_calendly, main_df)
+            updated_count = apply_calendly_updates(pairs, matching_calendly, main_df)
         
         print(f"Updated {updated_count} records in the main dataset")
         
@@ -1,6 +1,9 @@
 import pandas as pd
 import os
 from datetime import datetime
+from utils.date_parsing import parse_date_column
+from utils.candidate_schema import conform_frame
+from utils.parallel_ingest import ingest_files
 
 # Define the column mapping:
 # Keys are the original column names in the Calendly files;
@@ -28,10 +31,10 @@ def preprocess_calendly_US(filepath, country_name="US"):
         "Meeting Notes": "Meeting Notes"
     }
     try:
-        # Load the file
-        df = pd.read_csv(filepath)
+        # Load only the columns present in our mapping, as strings
+        df = pd.read_csv(filepath, usecols=lambda col: col in column_mapping, dtype=str)
 
-        # Keep only the columns present in our mapping
+        # Keep them in mapping order
         cols_to_keep = [col for col in column_mapping.keys() if col in df.columns]
         df = df[cols_to_keep].copy()
 
@@ -47,15 +50,8 @@ def preprocess_calendly_US(filepath, country_name="US"):
         # Convert date strings in 'Start Date & Time' to datetime and sort by date
         if 'Start Date & Time' in df.columns:
             try:
-                # Define potential date formats; added a format for "YYYY-MM-DD hh:mm am/pm"
-                date_formats = ['%Y-%m-%d %I:%M %p', '%Y-%m-%d', '%m/%d/%Y', '%d/%m/%Y', '%B %d, %Y']
-                for date_format in date_formats:
-                    try:
-                        df['Start Date & Time'] = pd.to_datetime(df['Start Date & Time'], format=date_format)
-                        print(f"  Successfully parsed dates using format: {date_format}")
-                        break
-                    except Exception as e:
-                        continue
+                # Each row's format is detected once and parsed with its format group
+                parse_date_column(df, 'Start Date & Time')
                 df = df.sort_values('Start Date & Time', ascending=False)
                 print("  Sorted records by date (most recent first)")
             except Exception as e:
@@ -74,17 +70,18 @@ def preprocess_calendly_US(filepath, country_name="US"):
         print(f"Error processing Calendly {country_name} file ({filepath}): {e}")
         return None
 
+def load_calendly_US_file(file):
+    """Preprocess and tag one Calendly US file (runs in a worker process)"""
+    df = preprocess_calendly_US(file)
+    # Optionally add a source column for later identification
+    df['source'] = 'Calendly_US'
+    # Keep the columns the merge stages use; others are reported as schema drift
+    return conform_frame(df, 'US', 'Calendly ingest', final=False)
+
+
 def process_calendly_US(calendly_files_US):
     print('process_calendly_US Started')
-    calendly_dfs = []
-    for file in calendly_files_US:
-            df = preprocess_calendly_US(file)
-            # df.head()
-            # Optionally add a source column for later identification
-            df['source'] = 'Calendly_US'
-            calendly_dfs.append(df)
-
-    # Merge all processed DataFrames into one
-    merged_df_calendly_US = pd.concat(calendly_dfs, ignore_index=True)
+    # Read the files and merge the processed DataFrames into one
+    merged_df_calendly_US = ingest_files(calendly_files_US, load_calendly_US_file)
     print('process_calendly_US Completed')
     return merged_df_calendly_US
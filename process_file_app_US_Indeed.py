@@ -1,20 +1,33 @@
 import pandas as pd
 import numpy as np
+from utils.candidate_schema import conform_frame
+from utils.parallel_ingest import ingest_files
+from utils.parse_cache import cached_parse
 
-def read_file(file_path):
+def read_file(file_path, usecols=None):
   """
   Reads a file from the given file path.
   Supports both Excel (.xlsx) and CSV (.csv) formats.
   The skiprows parameter is used for files that require skipping header rows (e.g., LinkedIn data).
+  Excel files keep only the usecols columns if given.
   """
   if file_path.lower().endswith('.xlsx'):
-      df = pd.read_excel(file_path, engine='openpyxl',header=1)
+      df = pd.read_excel(file_path, engine='openpyxl', header=1, usecols=usecols)
   elif file_path.lower().endswith('.csv'):
       df = pd.read_csv(file_path)
   else:
       raise ValueError(f"Unsupported file format for file: {file_path}")
   return df
 
+# Header names (after strip/lower) of the columns preprocess_indeed_US keeps
+INDEED_US_COLUMNS = ['name', 'email', 'phone', 'status', 'candidate location', 'location',
+                     'job title']
+
+
+def is_indeed_US_column(col):
+  return str(col).strip().lower() in INDEED_US_COLUMNS
+
+
 def preprocess_indeed_US(df):
   """
   Processes Indeed US DataFrames provided in a dictionary mapping file labels to DataFrames.
@@ -54,21 +67,23 @@ def preprocess_indeed_US(df):
   return df_filtered
 
 
-# Process LinkedIn files
-def process_Indeed_US(indeed_files_US):
-    print('process_Indeed_US Started')
-    indeed_dfs = []
-    for file in indeed_files_US:
-        df = read_file(file)
+def load_indeed_US_file(file):
+    """Read, preprocess and tag one Indeed US file (runs in a worker process)"""
+    # Parsing and preprocessing are skipped when the same file was seen before
+    df = cached_parse(file, {'source': 'Indeed_US', 'header': 1},
+                      lambda path: preprocess_indeed_US(read_file(path, is_indeed_US_column)))
     print('read file_US is completed')
-      
-    df = preprocess_indeed_US(df)
-    print('df = preprocess_indeed_US(df) is completed')
     # Optionally add a source column for later identification
     df['source'] = 'Indeed_US'
-    indeed_dfs.append(df)
-    # Merge all processed DataFrames into one
-    merged_df_indeed_US = pd.concat(indeed_dfs, ignore_index=True)
+    # Keep the columns the merge stages use; others are reported as schema drift
+    return conform_frame(df, 'US', 'Indeed ingest', final=False)
+
+
+# Process LinkedIn files
+def process_Indeed_US(indeed_files_US):
+    print('process_Indeed_US Started')
+    # Read the files and merge the processed DataFrames into one
+    merged_df_indeed_US = ingest_files(indeed_files_US, load_indeed_US_file)
     print('Indeed merged Completed. ', merged_df_indeed_US.dtypes)
     print('process_Indeed_india Completed')
     return merged_df_indeed_US
\ No newline at end of file
@@ -1,6 +1,9 @@
 import pandas as pd
 import os
-import re
+from utils.active_project import split_active_project
+from utils.candidate_schema import conform_frame
+from utils.parallel_ingest import ingest_files
+from utils.parse_cache import cached_parse
 
 
 def read_file(file_path):
@@ -17,22 +20,6 @@ def read_file(file_path):
   return df
 
 
-def extract_parentheses(text):
-  print('extract_parentheses for US Started')
-  if pd.isna(text):
-    return ('', '')
-
-  match = re.search(r'\((.*?)\)', str(text))
-  if match:
-    main_text = str(text).split('(')[0].strip()
-    parentheses_text = match.group(1).strip()
-    print('extract_parentheses for US Completed')
-    return (main_text, parentheses_text)
-  else:
-    print('extract_parentheses for US Completed')
-    return (str(text), '')
-
-
 def preprocess_linkedin_US(df):
   """Special preprocessing for LinkedIn India format"""
   print("preprocess_linkedin_US Started")
@@ -100,11 +87,9 @@ def preprocess_linkedin_US(df):
 
   # Split active_project column to extract content in parentheses
   if 'active_project' in processed_df.columns:
-    split_results = processed_df['active_project'].apply(extract_parentheses)
-    processed_df['active_project'] = split_results.str[
-        0]  # Text before parentheses
-    processed_df['status'] = split_results.str[
-        1]  # Text inside parentheses as status
+    split_results = split_active_project(processed_df['active_project'])
+    processed_df['active_project'] = split_results['position']  # Text before parentheses
+    processed_df['status'] = split_results['status']  # Text inside parentheses as status
     processed_df['position'] = processed_df['active_project']
     print("  Split active_project column - extracted content in parentheses to 'status' column")
     print("  Mapped 'active_project' to 'position'")
@@ -146,21 +131,23 @@ def preprocess_linkedin_US(df):
   return processed_df
 
 
+def load_linkedin_US_file(file):
+  """Read, preprocess and tag one LinkedIn US file (runs in a worker process)"""
+  # Parsing and preprocessing are skipped when the same file was seen before
+  df = cached_parse(file, {'source': 'linkedin_US', 'header': 1},
+                    lambda path: preprocess_linkedin_US(read_file(path)))
+  print('read file_US is completed')
+  # Optionally add a source column for later identification
+  df['source'] = 'linkedin_US'
+  # Keep the columns the merge stages use; others are reported as schema drift
+  return conform_frame(df, 'US', 'LinkedIn ingest', final=False)
+
+
 # Process LinkedIn files
 def process_Linkedin_US(linkedin_files_US):
   print('process_Linkedin_US Started')
-  linkedin_dfs = []
-  for file in linkedin_files_US:
-    df = read_file(file)
-    print('read file_US is completed')
-    # df.head()
-    df = preprocess_linkedin_US(df)
-    # Optionally add a source column for later identification
-    df['source'] = 'linkedin_US'
-    linkedin_dfs.append(df)
-
-  # Merge all processed DataFrames into one
-  merged_df_linkedin_US = pd.concat(linkedin_dfs, ignore_index=True)
+  # Read the files and merge the processed DataFrames into one
+  merged_df_linkedin_US = ingest_files(linkedin_files_US, load_linkedin_US_file)
   print('Linkedin merged Completed. ', merged_df_linkedin_US.dtypes)
   print('process_Linkedin_india Completed')
   return merged_df_linkedin_US
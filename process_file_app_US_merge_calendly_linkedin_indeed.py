@@ -1,6 +1,7 @@
 import numpy as np
 import networkx as nx
 import pandas as pd
+from utils.column_mapping import standardize_columns as standardize_with_plan
 
 # --- Mapping dictionaries for standardizing columns ---
 indeed_us_mapping = {
@@ -49,15 +50,8 @@ def standardize_columns(df, mapping_dict):
     Returns:
         pd.DataFrame: DataFrame with standardized column names.
     """
-    rename_map = {}
-    for std_col, synonyms in mapping_dict.items():
-        for col in df.columns:
-            col_norm = col.strip().lower()
-            synonyms_norm = [s.strip().lower() for s in synonyms]
-            if col_norm in synonyms_norm:
-                rename_map[col] = std_col
-                break
-    return df.rename(columns=rename_map)
+    # The rename plan is built once per header layout
+    return standardize_with_plan(df, mapping_dict)
 
 def final_merge_US(US_dfs_indeed, US_dfs_linkedin, US_dfs_calendly):
     US_dfs_indeed = standardize_columns(US_dfs_indeed, indeed_us_mapping)
@@ -1,6 +1,10 @@
 import pandas as pd
 import os
 from datetime import datetime
+from utils.date_parsing import parse_date_column
+from utils.column_mapping import standardize_columns as standardize_with_plan
+from utils.candidate_schema import conform_frame
+from utils.parallel_ingest import ingest_files
 
 # Define the column mapping:
 # Keys are the original column names in the Calendly files;
@@ -28,12 +32,19 @@ def preprocess_calendly(filepath, country_name="India"):
         "Marked as No-Show": "Marked as No-Show",
         "Meeting Notes": "meeting_notes"
     }
+    # Only the mapped columns and those process_L_N_C recognises are ever used
+    recognised = {s.strip().lower() for synonyms in calendly_mapping.values()
+                  for s in synonyms}
+
+    def is_used(col):
+        return col in column_mapping or str(col).strip().lower() in recognised
+
     try:
-        # Load the file based on extension
+        # Load the file based on extension, skipping unused columns in the parser
         if filepath.endswith('.xlsx'):
-            df = pd.read_excel(filepath,header=1)
+            df = pd.read_excel(filepath, header=1, usecols=is_used)
         else:
-            df = pd.read_csv(filepath)
+            df = pd.read_csv(filepath, usecols=is_used, dtype=str)
 
         # Convert relevant columns to string type
         string_columns = ['name', 'email', 'phone', 'location', 'position', 'source']
@@ -53,15 +64,8 @@ def preprocess_calendly(filepath, country_name="India"):
         # Convert date strings in 'Start Date & Time' to datetime and sort by date
         if 'Start Date & Time' in df.columns:
             try:
-                # Define potential date formats; added a format for "YYYY-MM-DD hh:mm am/pm"
-                date_formats = ['%Y-%m-%d %I:%M %p', '%Y-%m-%d', '%m/%d/%Y', '%d/%m/%Y', '%B %d, %Y']
-                for date_format in date_formats:
-                    try:
-                        df['Start Date & Time'] = pd.to_datetime(df['Start Date & Time'], format=date_format)
-                        print(f"  Successfully parsed dates using format: {date_format}")
-                        break
-                    except Exception as e:
-                        continue
+                # Each row's format is detected once and parsed with its format group
+                parse_date_column(df, 'Start Date & Time')
                 df = df.sort_values('Start Date & Time', ascending=False)
                 print("  Sorted records by date (most recent first)")
             except Exception as e:
@@ -80,18 +84,19 @@ def preprocess_calendly(filepath, country_name="India"):
         print(f"Error processing Calendly {country_name} file ({filepath}): {e}")
         return None
 
+def load_calendly_india_file(file):
+    """Preprocess and tag one Calendly India file (runs in a worker process)"""
+    df = preprocess_calendly(file)
+    # Optionally add a source column for later identification
+    df['source'] = 'Calendly_India'
+    # Keep the columns the merge stages use; others are reported as schema drift
+    return conform_frame(df, 'India', 'Calendly ingest', final=False)
+
+
 def process_calendly_india(calendly_files):
     print('process_calendly_india Started')
-    calendly_dfs = []
-    for file in calendly_files:
-            df = preprocess_calendly(file)
-            # df.head()
-            # Optionally add a source column for later identification
-            df['source'] = 'Calendly_India'
-            calendly_dfs.append(df)
-
-    # Merge all processed DataFrames into one
-    merged_df_calendly = pd.concat(calendly_dfs, ignore_index=True)
+    # Read the files and merge the processed DataFrames into one
+    merged_df_calendly = ingest_files(calendly_files, load_calendly_india_file)
     print('process_calendly_india Completed')
     return merged_df_calendly
 
@@ -107,16 +112,10 @@ def standardize_columns(df, mapping):
     Standardizes the DataFrame's columns based on the provided mapping.
     """
     print('standardize_columns for Calendly Started')
-    rename_dict = {}
-    for col in df.columns:
-        col_norm = col.strip().lower()
-        for std_col, synonyms in mapping.items():
-            synonyms_norm = [s.strip().lower() for s in synonyms]
-            if col_norm in synonyms_norm:
-                rename_dict[col] = std_col
-                break
+    # The rename plan is built once per header layout
+    df = standardize_with_plan(df, mapping, first_match='column')
     print('standardize_columns for Calendly Completed')
-    return df.rename(columns=rename_dict)
+    return df
 
 
 
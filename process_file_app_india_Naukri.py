@@ -1,5 +1,8 @@
 import pandas as pd
 import os
+from utils.candidate_schema import conform_frame
+from utils.parallel_ingest import ingest_files
+from utils.parse_cache import cached_parse
 
 # naukri_files = ["INDIA DATA/naukri.xlsx"]
 
@@ -18,11 +21,6 @@ def preprocess_naukri_data(df):
     """Preprocess Naukri data with standard column mappings"""
     print('preprocess_naukri_data Started')
 
-    # Define all possible columns for final dataframe
-    final_columns = ['Stage', 'name', 'email', 'phone', 'location', 'total_experience', 
-                    'annual_salary', 'notice_period', 'position', 'status', 'source',
-                    'meeting_notes', 'Date']
-
     # Remove existing source column if present
     if 'source' in df.columns:
         df = df.drop(columns=['source'])
@@ -50,31 +48,28 @@ def preprocess_naukri_data(df):
             if old_col != new_col:  # Only drop if different name
                 df = df.drop(columns=[old_col])
 
-    # Ensure all final columns exist
-    for col in final_columns:
-        if col not in df.columns:
-            df[col] = pd.NA
-
-    # Reorder columns to match final format
-    df = df[final_columns]
+    # Project onto the India schema (adds missing columns, fixes the order)
+    df = conform_frame(df, 'India', 'Naukri ingest')
 
     print('preprocess_naukri_data Completed')
     return df
 
 
+def load_naukri_file(file):
+    """Read, preprocess and tag one Naukri file (runs in a worker process)"""
+    # Parsing and preprocessing are skipped when the same file was seen before
+    df = cached_parse(file, {'source': 'Naukri_India', 'header': 0},
+                      lambda path: preprocess_naukri_data(read_file(path)))
+    # Optionally add a source column for later identification
+    df['source'] = 'Naukri_India'
+    return df
+
+
 # Process LinkedIn files
 def process_Naukri_india(naukri_files):
     print('process_Naukri_india Started')
-    naukri_dfs = []
-    for file in naukri_files:
-        df = read_file(file)
-        df = preprocess_naukri_data(df)
-        # Optionally add a source column for later identification
-        df['source'] = 'Naukri_India'
-        naukri_dfs.append(df)
-
-    # Merge all processed DataFrames into one
-    merged_df_naukri = pd.concat(naukri_dfs, ignore_index=True)
+    # Read the files and merge the processed DataFrames into one
+    merged_df_naukri = ingest_files(naukri_files, load_naukri_file)
     print('process_Naukri_india Completed')
     return merged_df_naukri
 
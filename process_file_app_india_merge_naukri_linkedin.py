@@ -2,6 +2,7 @@ import pandas as pd
 import os
 from process_file_app_india_LinkedIn import process_Linkedin_india
 from process_file_app_india_Naukri import process_Naukri_india
+from utils.column_mapping import standardize_columns as standardize_with_plan
 
 # Mapping dictionaries for standardizing columns
 Naukri_India = {
@@ -54,19 +55,8 @@ def standardize_columns(df, mapping_dict):
     Returns:
       The DataFrame with standardized column names.
     """
-    # Create a mapping for renaming
-    rename_map = {}
-    for std_col, synonyms in mapping_dict.items():
-        for col in df.columns:
-            # Normalize both column names and synonyms to lowercase and strip spaces
-            col_norm = col.strip().lower()
-            synonyms_norm = [s.strip().lower() for s in synonyms]
-            if col_norm in synonyms_norm:
-                rename_map[col] = std_col
-                break  # Once found, no need to check more synonyms for this std_col
-
-    # Apply the renaming
-    df.rename(columns=rename_map, inplace=True)
+    # Apply the renaming; the plan is built once per header layout
+    standardize_with_plan(df, mapping_dict, inplace=True)
     print('standardize_columns for merge_L_N Completed')
     return df
 
@@ -16,11 +16,9 @@ def remove_duplicates_from_excel(file_path, output_dir='uploads/deduped'):
 
     try:
         # Read Excel file
-        if 'linkedin' in file_path.lower():
-            # LinkedIn files often have header info in first row
-            df = pd.read_excel(file_path, skiprows=1)
-        else:
-            df = pd.read_excel(file_path)
+        # LinkedIn files often have header info in first row
+        header = 1 if 'linkedin' in file_path.lower() else 0
+        df = pd.read_excel(file_path, skiprows=header)
 
         original_count = len(df)
         print(f"Original record count: {original_count}")
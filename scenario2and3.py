@@ -2,19 +2,29 @@ import streamlit as st
 import pandas as pd
 import os
 from datetime import datetime
-import io
 from openpyxl import Workbook
 
+from utils.candidate_store import get_store
+from utils.change_log import get_change_log
+from utils.data_cache import load_synced_dataset, snapshot_source
+from utils.export import EXPORT_FORMATS, download_section, get_export
+from utils.paged_table import show_table
+
 
 def load_or_create_data():
-    """Load existing data or create new DataFrame"""
+    """Load existing data from the candidate store or create new DataFrame.
+
+    merged_all_data.csv (or the backup) is imported into the store first whenever it
+    changed since the store last held it.
+    """
     current_file = 'merged_all_data.csv'
     backup_file = 'database/20250307_235609/merged_all_data.csv'
-    
-    if os.path.exists(current_file):
-        return pd.read_csv(current_file)
-    elif os.path.exists(backup_file):
-        return pd.read_csv(backup_file)
+
+    for file_path in [current_file, backup_file]:
+        if os.path.exists(file_path):
+            df, _ = load_synced_dataset('all', file_path)
+            # Row numbers and untyped columns, as the row-by-row update below expects
+            return df.reset_index(drop=True).astype(object)
     return pd.DataFrame(columns=[
         'stage', 'name', 'email', 'phone', 'location', 'experience',
         'position', 'status', 'date', 'profile', 'salary', 'declaration',
@@ -23,8 +33,10 @@ def load_or_create_data():
 
 
 def save_data(df):
-    """Save DataFrame to CSV"""
+    """Save DataFrame to CSV and to the candidate store"""
     df.to_csv('merged_all_data.csv', index=False)
+    get_store().save('all', df, source=snapshot_source(get_change_log(), 'all',
+                                                       'merged_all_data.csv'))
 
 
 def main():
@@ -36,20 +48,11 @@ def main():
 
     # Display data overview
     st.subheader("Current Data Overview")
-    st.dataframe(existing_df, use_container_width=True)
+    show_table(existing_df, key="overview")
     st.text(f"Total records: {len(existing_df)}")
 
     # Add download button
-    buffer = io.BytesIO()
-    with pd.ExcelWriter(buffer, engine='openpyxl') as writer:
-        existing_df.to_excel(writer, index=False)
-    
-    st.download_button(
-        label="Download Current Data as Excel",
-        data=buffer.getvalue(),
-        file_name="current_data.xlsx",
-        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-    )
+    download_section(existing_df, file_name="current_data", key="current_data")
 
     # Add upload functionality for the downloaded file
     st.subheader("Upload Modified Data")
@@ -65,7 +68,7 @@ def main():
                 
                 # Refresh the data overview
                 st.subheader("Updated Data Overview")
-                st.dataframe(existing_df, use_container_width=True)
+                show_table(existing_df, key="updated")
                 st.text(f"Total records: {len(existing_df)}")
             else:
                 st.error("Column mismatch. Please ensure the file structure matches the original.")
@@ -77,15 +80,16 @@ def main():
 
     # Add download button for empty template
     st.subheader("1. Download Empty Template")
-    buffer = io.BytesIO()
-    with pd.ExcelWriter(buffer, engine='openpyxl') as writer:
-        template_df.to_excel(writer, index=False)
-    st.download_button(
-        label="Download Empty Template Excel",
-        data=buffer.getvalue(),
-        file_name="candidate_template.xlsx",
-        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-    )
+    # The template only depends on the columns, so it is written once per column set
+    template_path = get_export(template_df, 'xlsx',
+                               version=('template', tuple(map(str, template_df.columns))))
+    with open(template_path, 'rb') as f:
+        st.download_button(
+            label="Download Empty Template Excel",
+            data=f,
+            file_name="candidate_template.xlsx",
+            mime=EXPORT_FORMATS['xlsx']['mime']
+        )
 
     # File upload section
     st.subheader("2. Upload Filled Template")
@@ -125,7 +129,7 @@ def main():
                     additions += 1
 
             # Save updated data to current directory
-            existing_df.to_csv('merged_all_data.csv', index=False)
+            save_data(existing_df)
 
             # Save to latest database folder
             timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
@@ -158,7 +162,7 @@ def main():
 
             # Display full data
             st.subheader("All Records")
-            st.dataframe(existing_df, use_container_width=True)
+            show_table(existing_df, key="all_records")
 
         except Exception as e:
             st.error(f"Error processing file: {str(e)}")
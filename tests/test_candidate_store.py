@@ -0,0 +1,19 @@
+import pandas as pd
+
+from utils.candidate_store import CandidateStore
+
+
+def test_save_records_the_snapshot_the_dataset_holds(tmp_path):
+    store = CandidateStore(str(tmp_path / 'candidates.db'))
+    df = pd.DataFrame({'name': ['Jon Smith'], 'email': ['jon@example.com']})
+
+    store.save('india', df, source='snapshot-1')
+    assert store.source('india') == 'snapshot-1'
+
+    # Records written without a snapshot leave the dataset's snapshot unknown
+    store.save('india', df)
+    assert store.source('india') is None
+
+    store.set_source('india', 'snapshot-2')
+    assert store.source('india') == 'snapshot-2'
+    store.close()
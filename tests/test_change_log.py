@@ -0,0 +1,34 @@
+import os
+
+import pandas as pd
+
+from utils.change_log import ChangeLog, load_snapshot, write_snapshot
+from utils.dtypes import set_fields
+
+
+def test_edits_survive_a_new_snapshot(tmp_path):
+    change_log = ChangeLog(str(tmp_path / 'change_log.db'))
+    snapshot_dir = str(tmp_path / 'Modified Data')
+    first = write_snapshot(change_log, 'india', pd.DataFrame({
+        'name': ['Jon Smith', 'Priya Sharma', 'Ravi Kumar'],
+        'status': ['Applied', 'Applied', 'Applied'],
+    }), snapshot_dir)
+
+    # Delete a record, then save the snapshot the next screen will read
+    df = load_snapshot(change_log, 'india', first)
+    df = df.drop(0)
+    change_log.record_delete('india', os.path.basename(first), [0])
+    second = write_snapshot(change_log, 'india', df, snapshot_dir)
+
+    # An edit made on the new snapshot refers to that snapshot's row numbers
+    df = load_snapshot(change_log, 'india', second)
+    old_row = df.loc[1].copy()
+    set_fields(df, 1, {'status': 'Hired'})
+    change_log.record_edit('india', os.path.basename(second), 1, old_row, df.loc[1])
+
+    current = load_snapshot(change_log, 'india', second)
+    change_log.close()
+
+    assert second != first
+    assert current['name'].tolist() == ['Priya Sharma', 'Ravi Kumar']
+    assert current['status'].tolist() == ['Applied', 'Hired']
@@ -0,0 +1,41 @@
+import numpy as np
+import pandas as pd
+
+from utils.fuzzy_matching import find_fuzzy_duplicates
+
+
+def test_similar_names_with_same_phone_are_paired():
+    df = pd.DataFrame({
+        'name': ['Jon Smith', 'Priya Sharma', 'John Smith'],
+        'email': [np.nan, 'priya@example.com', np.nan],
+        'phone': ['+1 (555) 123-4567', '9876543210', '555-123-4567'],
+    })
+
+    pairs = find_fuzzy_duplicates(df)
+
+    assert len(pairs) == 1
+    pair = pairs.iloc[0]
+    assert {pair['index_a'], pair['index_b']} == {0, 2}
+    assert {pair['name_a'], pair['name_b']} == {'jon smith', 'john smith'}
+    assert 'phone' in pair['matched_on'].split(',')
+    assert pair['score'] >= 0.85
+
+
+def test_unrelated_rows_are_not_paired():
+    df = pd.DataFrame({
+        'name': ['Jon Smith', 'Priya Sharma'],
+        'email': ['jon@example.com', 'priya@example.com'],
+        'phone': ['5551234567', '9876543210'],
+    })
+
+    assert find_fuzzy_duplicates(df).empty
+
+
+def test_phones_with_other_area_or_country_code_do_not_match():
+    df = pd.DataFrame({
+        'name': ['Jon Smith', 'John Smith', 'John Smyth'],
+        'email': [np.nan, np.nan, np.nan],
+        'phone': ['212-123-4567', '555-123-4567', '+44 555 123 4567'],
+    })
+
+    assert find_fuzzy_duplicates(df).empty
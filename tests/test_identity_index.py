@@ -0,0 +1,44 @@
+import numpy as np
+import pandas as pd
+
+from merged_duplicates_processing import merge_duplicates
+from utils.candidate_schema import conform_frame
+from utils.identity_index import IdentityIndex
+
+
+def _batch():
+    return pd.DataFrame({
+        'name': ['Jon Smith', 'Jon Smith', 'Priya Sharma', 'Walk-in', 'Walk-in'],
+        'email': ['jon@example.com', 'jon@example.com', np.nan, np.nan, np.nan],
+        'phone': ['5551234567', np.nan, '9876543210', np.nan, np.nan],
+        'source': ['Naukri_India', 'linkedin_India', 'Naukri_India', 'Calendly_India',
+                   'Calendly_India'],
+    })
+
+
+def _run_pipeline(path):
+    index = IdentityIndex(path)
+    try:
+        merged = merge_duplicates(_batch(), identity_index=index)
+    finally:
+        index.close()
+    return conform_frame(merged, 'India', 'final merge')
+
+
+def test_rerunning_the_pipeline_keeps_candidate_ids(tmp_path):
+    path = str(tmp_path / 'identity_index_india.db')
+
+    first = _run_pipeline(path)
+    second = _run_pipeline(path)
+
+    assert list(first.columns)[0] == 'candidate_id'
+    assert first['candidate_id'].notna().all()
+    assert first['candidate_id'].tolist() == second['candidate_id'].tolist()
+
+
+def test_rows_without_keys_keep_separate_ids(tmp_path):
+    merged = _run_pipeline(str(tmp_path / 'identity_index_india.db'))
+
+    walk_ins = merged[merged['name'] == 'Walk-in']
+    assert len(walk_ins) == 2
+    assert walk_ins['candidate_id'].nunique() == 2
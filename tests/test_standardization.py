@@ -0,0 +1,29 @@
+import numpy as np
+import pandas as pd
+
+from utils.standardization import standardize_contacts, standardize_names, title_names
+
+
+def test_title_names_matches_str_title():
+    names = pd.Series(["o'neil", 'MARY-JANE smith', 'jon  smith', np.nan, ''])
+
+    assert title_names(names).tolist()[:3] == ["O'Neil", 'Mary-Jane Smith', 'Jon  Smith']
+    assert pd.isna(title_names(names)[3])
+    assert title_names(names)[4] == ''
+
+
+def test_standardize_names_capitalizes_each_word():
+    names = pd.Series(["o'neil", 'MARY-JANE  smith'])
+
+    assert standardize_names(names).tolist() == ["O'neil", 'Mary-jane Smith']
+
+
+def test_standardize_contacts_title_cases_names_and_cleans_phones():
+    df = pd.DataFrame({'name': ["o'neil", "O'Neil"],
+                       'phone': ['+1 (555) 123-4567', '5551234567']})
+
+    changes = standardize_contacts(df)
+
+    assert df['name'].tolist() == ["O'Neil", "O'Neil"]
+    assert df['phone'].tolist() == ['15551234567', '5551234567']
+    assert changes == {'name': 1, 'phone': 1}
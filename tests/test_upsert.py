@@ -0,0 +1,39 @@
+import numpy as np
+import pandas as pd
+
+from utils.upsert import upsert_records
+
+
+def test_update_adds_new_category_to_categorical_column():
+    df = pd.DataFrame({
+        'name': ['Jon Smith', 'Priya Sharma'],
+        'email': ['jon@example.com', 'priya@example.com'],
+        'phone': ['5551234567', '9876543210'],
+        'status': pd.Categorical(['Applied', 'Applied']),
+    })
+    template = pd.DataFrame({
+        'name': [np.nan],
+        'email': ['priya@example.com'],
+        'phone': [np.nan],
+        'status': ['Interviewed'],
+    })
+
+    combined, updates, additions = upsert_records(df, template)
+
+    assert (updates, additions) == (1, 0)
+    assert combined['status'].tolist() == ['Applied', 'Interviewed']
+    assert combined['name'].tolist() == ['Jon Smith', 'Priya Sharma']
+
+
+def test_row_matching_a_key_changed_earlier_in_the_batch_is_inserted():
+    df = pd.DataFrame({'name': ['a'], 'email': ['e3'], 'phone': ['p1']})
+    template = pd.DataFrame({
+        'name': ['b', 'c'],
+        'email': ['e3', np.nan],
+        'phone': ['p3', 'p1'],
+    })
+
+    combined, updates, additions = upsert_records(df, template)
+
+    assert (updates, additions) == (1, 1)
+    assert combined['phone'].tolist() == ['p3', 'p1']
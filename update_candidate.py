@@ -2,105 +2,134 @@ import streamlit as st
 import pandas as pd
 import os
 from datetime import datetime
-import shutil
 
+from utils.candidate_store import get_store
+from utils.change_log import get_change_log, write_snapshot
+from utils.data_cache import (list_csv_files, load_dataset_cached, load_synced_dataset,
+                              snapshot_source)
 from utils.deduplication import find_duplicates_by_criteria, merge_records
+from utils.dtypes import set_fields
+from utils.fuzzy_matching import find_fuzzy_duplicates
+from utils.paged_table import show_table
+from utils.search_index import (SEARCH_COLUMNS, describe_candidates, get_page,
+                                get_search_index, page_count)
 
 
-def find_duplicates(df, name, email=None, phone=None, position=None):
-    """Find potential duplicate records based on name, email, phone or position"""
-    return find_duplicates_by_criteria(df, name, email, phone, position)
+def search_candidates(df, region):
+    """Return the search index of the region's records, rebuilt once they are saved"""
+    store = get_store()
+    dataset = region.lower()
+    return get_search_index(df, (store.path, dataset, store.version(dataset)))
 
 
-def load_data(region):
-    """Load candidate data for the specified region"""
-    if region == "India":
-        modified_dir = os.path.join('database', 'Modified Data')
-        if os.path.exists(modified_dir):
-            modified_files = sorted([f for f in os.listdir(modified_dir) if f.endswith('.csv')], reverse=True)
-            if modified_files:
-                latest_file = os.path.join(modified_dir, modified_files[0])
-                df = pd.read_csv(latest_file)
-                st.info(f"Using latest modified data from: {modified_files[0]}")
-                return df
-            else:
-                st.warning("No data files found in Modified Data directory")
-                return None
-        else:
-            st.error("Modified Data directory not found in database folder")
-            return None
-    else:
-        # For US region, keep existing logic
-        file_path = f'merged_{region.lower()}_data.csv'
-        if os.path.exists(file_path):
-            return pd.read_csv(file_path)
+def find_duplicates(df, region, name, email=None, phone=None, position=None):
+    """Find potential duplicate records based on name, email, phone or position"""
+    return find_duplicates_by_criteria(df, name, email, phone, position,
+                                       search_index=search_candidates(df, region))
 
-        # If not found, look in the database folder (newest first)
-        database_dir = 'database'
-        if os.path.exists(database_dir):
-            timestamp_dirs = [
-                d for d in os.listdir(database_dir)
-                if os.path.isdir(os.path.join(database_dir, d))
-            ]
-            timestamp_dirs.sort(reverse=True)  # Sort newest first
 
-            for timestamp in timestamp_dirs:
-                db_file_path = os.path.join(database_dir, timestamp,
-                                            f'merged_{region.lower()}_data.csv')
-                if os.path.exists(db_file_path):
-                    st.info(f"Using database file from {timestamp}")
-                    return pd.read_csv(db_file_path)
+# Snapshot directories of each region, in the order the other screens read them
+SNAPSHOT_DIRS = {
+    'India': [os.path.join('database', 'Modified Data'),
+              os.path.join('database', 'Merge Final India')],
+    'US': [os.path.join('database', 'Modified Data US'),
+           os.path.join('database', 'Merge Final US')],
+}
 
-    return None
 
+def latest_snapshot_file(region):
+    """Return the latest CSV snapshot of the specified region, or None"""
+    for directory in SNAPSHOT_DIRS[region]:
+        files = list_csv_files(directory)
+        if files:
+            st.info(f"Using latest data from: {files[0]}")
+            return os.path.join(directory, files[0])
+
+    # Otherwise use a merged file, from the root or the database folder (newest first)
+    file_path = f'merged_{region.lower()}_data.csv'
+    if os.path.exists(file_path):
+        return file_path
 
-def save_data(df, region):
-    """Save updated data and create a backup"""
-    # Create backup directory if it doesn't exist
-    backup_dir = os.path.join('database', 'backups')
-    if not os.path.exists(backup_dir):
-        os.makedirs(backup_dir)
+    database_dir = 'database'
+    if os.path.exists(database_dir):
+        timestamp_dirs = [
+            d for d in os.listdir(database_dir)
+            if os.path.isdir(os.path.join(database_dir, d))
+        ]
+        timestamp_dirs.sort(reverse=True)  # Sort newest first
+
+        for timestamp in timestamp_dirs:
+            db_file_path = os.path.join(database_dir, timestamp,
+                                        f'merged_{region.lower()}_data.csv')
+            if os.path.exists(db_file_path):
+                st.info(f"Using database file from {timestamp}")
+                return db_file_path
 
-    # Create timestamp for this update
-    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    return None
 
-    # Save to root directory
-    file_path = f'merged_{region.lower()}_data.csv'
-    df.to_csv(file_path, index=False)
 
-    # Create a backup
-    backup_file = os.path.join(
-        backup_dir, f'merged_{region.lower()}_data_{timestamp}.csv')
-    shutil.copy2(file_path, backup_file)
+def load_data(region):
+    """Load candidate data for the specified region from the candidate store.
+
+    The latest CSV snapshot (with the changes logged against it) is imported whenever
+    another screen has written one since the store was last synced, after which the
+    returned frame is indexed by store record id.
+    """
+    store = get_store()
+    snapshot_file = latest_snapshot_file(region)
+    if snapshot_file is None:
+        return load_dataset_cached(region.lower(), store)
+
+    df, imported = load_synced_dataset(region.lower(), snapshot_file, store)
+    if imported:
+        st.info(f"Imported {len(df)} {region} records into the candidate database")
+    return df
+
+
+def save_data(df, region, record_ids=None, deleted_ids=None):
+    """Save updated data to the candidate store and as a new Modified Data snapshot.
+
+    When record_ids and/or deleted_ids are given only those records are written to or
+    removed from the store, and each changed field is added to the change log;
+    otherwise the whole region is replaced and a CSV backup is created. The snapshot
+    is what the processing app reads, so both hold the same records.
+    """
+    store = get_store()
+    dataset = region.lower()
+    change_log = get_change_log()
+    if record_ids is not None or deleted_ids is not None:
+        # Log the changed fields, then write only the touched records
+        snapshot = os.path.basename(store.path)
+        if record_ids:
+            old_rows = store.get_records(dataset, record_ids)
+            for record_id in record_ids:
+                old_row = old_rows.loc[record_id] if record_id in old_rows.index else None
+                change_log.record_edit(dataset, snapshot, record_id, old_row,
+                                       df.loc[record_id], source='Update Candidate')
+            store.update_records(dataset, df.loc[list(record_ids)])
+        if deleted_ids:
+            change_log.record_delete(dataset, snapshot, deleted_ids,
+                                     source='Update Candidate')
+            store.delete_records(dataset, deleted_ids)
+    else:
+        # Create backup directory if it doesn't exist
+        backup_dir = os.path.join('database', 'backups')
+        if not os.path.exists(backup_dir):
+            os.makedirs(backup_dir)
 
-    # Also save to the database directory with latest timestamp
-    database_dir = 'database'
-    timestamp_dirs = [
-        d for d in os.listdir(database_dir)
-        if os.path.isdir(os.path.join(database_dir, d))
-    ]
-    timestamp_dirs.sort(reverse=True)  # Sort newest first
-
-    if timestamp_dirs:
-        latest_dir = os.path.join(database_dir, timestamp_dirs[0])
-        db_file_path = os.path.join(latest_dir,
-                                    f'merged_{region.lower()}_data.csv')
-        df.to_csv(db_file_path, index=False)
-        st.success(f"Updated database file in {latest_dir}")
-
-    # Save to Modified Data directory in database
-    database_dir = 'database'
-    modified_dir = os.path.join(database_dir, 'Modified Data')
-    if not os.path.exists(modified_dir):
-        os.makedirs(modified_dir)
+        # Create timestamp for this update
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
 
-    # Create timestamp for this update
-    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        store.save(dataset, df)
 
-    # Save to Modified Data directory in database
-    file_path = os.path.join(modified_dir, f'modified_india_data_{timestamp}.csv')
-    df.to_csv(file_path, index=False)
+        # Create a backup
+        backup_file = os.path.join(
+            backup_dir, f'merged_{dataset}_data_{timestamp}.csv')
+        df.to_csv(backup_file, index=False)
 
+    # Save the snapshot and record that the store holds it
+    snapshot_file = write_snapshot(change_log, dataset, df, SNAPSHOT_DIRS[region][0])
+    store.set_source(dataset, snapshot_source(change_log, dataset, snapshot_file))
     return True
 
 
@@ -162,50 +191,31 @@ def main():
         f"Enter {search_method.lower()} to search")
 
     if search_term:
-        if search_method == "Name":
-            filtered_df = df[df['name'].str.contains(search_term,
-                                                     case=False,
-                                                     na=False)]
-        elif search_method == "Email":
-            filtered_df = df[df['email'].str.contains(search_term,
-                                                      case=False,
-                                                      na=False)]
-        else:  # Phone
-            filtered_df = df[df['phone'].astype(str).str.contains(search_term,
-                                                                  na=False)]
-
-        if len(filtered_df) == 0:
+        matches = search_candidates(df, region).search(
+            SEARCH_COLUMNS[search_method], search_term)
+
+        if len(matches) == 0:
             st.warning(
                 f"No candidates found with {search_method.lower()} containing '{search_term}'"
             )
         else:
-            st.success(f"Found {len(filtered_df)} candidate(s)")
-
-            # Display candidates as selectable options
-            candidate_options = []
-            for i, row in filtered_df.iterrows():
-                candidate = f"{row['name']} - {row.get('email', 'No email')} - {row.get('phone', 'No phone')}"
-                # Store the actual row index from the original dataframe
-                candidate_options.append((candidate, i))
-
-            # If no candidates found, don't show the selectbox
-            if not candidate_options:
-                st.warning(
-                    "No candidates found matching your search criteria.")
-                return
-
-            selected_option = st.selectbox(
+            st.success(f"Found {len(matches)} candidate(s)")
+
+            # Display one page of candidates as selectable options, keyed by the
+            # row index in the original dataframe
+            pages = page_count(len(matches))
+            page = st.sidebar.number_input(
+                f"Results page (of {pages})", min_value=1, max_value=pages,
+                value=1) if pages > 1 else 1
+            candidate_options = describe_candidates(df,
+                                                    get_page(matches, page))
+
+            selected_index = st.selectbox(
                 "Select a candidate to update",
-                options=[c[0] for c in candidate_options],
+                options=list(candidate_options),
+                format_func=candidate_options.get,
                 key="candidate_selector")
 
-            # Get the index of the selected candidate in the original dataframe
-            selected_index = None
-            for option, idx in candidate_options:
-                if option == selected_option:
-                    selected_index = idx
-                    break
-
             if selected_index is not None:
                 try:
                     # Get the candidate from the full dataframe using the stored index
@@ -317,34 +327,30 @@ def main():
                     # Save changes button
                     if st.button("Save Changes"):
                         # Update the dataframe with new values
-                        df.loc[selected_index, 'name'] = name
-                        df.loc[selected_index, 'email'] = email
-                        df.loc[selected_index, 'phone'] = phone
-                        df.loc[selected_index, 'location'] = location
-                        df.loc[selected_index, 'position'] = position
-                        df.loc[selected_index, 'stage'] = stage
-                        df.loc[selected_index, 'source'] = source
-                        df.loc[selected_index, 'date'] = date
+                        set_fields(df, selected_index, {
+                            'name': name, 'email': email, 'phone': phone,
+                            'location': location, 'position': position,
+                            'stage': stage, 'source': source, 'date': date
+                        })
 
                         if 'notes' not in df.columns:
                             df['notes'] = ''
                         df.loc[selected_index, 'notes'] = notes
 
                         if region == "US":
-                            df.loc[selected_index, 'experience'] = experience
-                            df.loc[selected_index, 'status'] = status
+                            set_fields(df, selected_index, {
+                                'experience': experience, 'status': status
+                            })
                         else:  # India
-                            df.loc[selected_index,
-                                   'total_experience'] = total_experience
-                            df.loc[selected_index,
-                                   'annual_salary'] = annual_salary
-                            df.loc[selected_index,
-                                   'notice_period'] = notice_period
-                            df.loc[selected_index,
-                                   'current_company'] = current_company
+                            set_fields(df, selected_index, {
+                                'total_experience': total_experience,
+                                'annual_salary': annual_salary,
+                                'notice_period': notice_period,
+                                'current_company': current_company
+                            })
 
                         # Save updated data
-                        if save_data(df, region):
+                        if save_data(df, region, record_ids=[selected_index]):
                             st.success(f"Successfully updated data for {name}")
                             # Create a "View All Changes" expander to show the updated record
                             with st.expander("View Updated Record"):
@@ -364,33 +370,20 @@ def main():
         4. Update the candidate information
         5. Click 'Save Changes' to save your updates
 
-        A backup of the data will be created each time you save changes.
+        Edits are saved to the candidate database record by record, and every
+        changed field is kept in the change log.
         """)
 
     # Show data overview
     with st.expander("Data Overview"):
         if region == "India":
-            database_dir = 'database'
-            modified_dir = os.path.join(database_dir, 'Modified Data')
-            if os.path.exists(modified_dir):
-                modified_files = sorted([f for f in os.listdir(modified_dir) if f.endswith('.csv')], reverse=True)
-                if modified_files:
-                    latest_file = os.path.join(modified_dir, modified_files[0])
-                    india_df = pd.read_csv(latest_file)
-                    st.info(f"Loaded latest data from: {modified_files[0]}")
-                else:
-                    india_df = pd.DataFrame()
-                    st.warning("No modified data files found in Modified Data directory")
-            else:
-                india_df = pd.DataFrame()
-                st.error("Modified Data directory not found")
             st.subheader("Current Data Overview")
-            st.dataframe(india_df, use_container_width=True)
-            st.text(f"Total records: {len(india_df)}")
+            show_table(df, key="overview")
+            st.text(f"Total records: {len(df)}")
 
         else:
             display_df = st.session_state.get('df', df)
-            st.dataframe(display_df)
+            show_table(display_df, key="overview")
             st.text(f"Total records: {len(display_df)}")
 
 
@@ -410,8 +403,9 @@ def main():
 
     if submitted and duplicate_name:
         # Find potential duplicates
-        duplicates = find_duplicates(df, duplicate_name, duplicate_email,
-                                     duplicate_phone, duplicate_position)
+        duplicates = find_duplicates(df, region, duplicate_name,
+                                     duplicate_email, duplicate_phone,
+                                     duplicate_position)
 
         if len(duplicates) > 0:
             st.success(f"Found {len(duplicates)} potential duplicate records")
@@ -472,30 +466,15 @@ def main():
                         # Store the original length
                         original_len = len(df)
 
-                        # Create backup before modification
-                        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-                        backup_dir = os.path.join('database', 'backups')
-                        if not os.path.exists(backup_dir):
-                            os.makedirs(backup_dir)
-                        backup_file = os.path.join(backup_dir, f'backup_before_deletion_{timestamp}.csv')
-                        df.to_csv(backup_file, index=False)
-
-                        # Remove records and reset index
-                        df = df.drop(valid_indices).reset_index(drop=True)
-
-                        # Save to Modified Data directory
-                        modified_dir = os.path.join('database', 'Modified Data')
-                        os.makedirs(modified_dir, exist_ok=True)
-                        
-                        modified_file = os.path.join(modified_dir, f'modified_india_data_{timestamp}.csv')
-                        df.to_csv(modified_file, index=False)
-
-                        # Update session state and load from modified data
+                        # Remove records, keeping record ids as the index
+                        df = df.drop(valid_indices)
+                        save_data(df, region, deleted_ids=valid_indices)
+
+                        # Update session state
                         st.session_state.df = df
-                        st.success(f"Data saved to: {modified_file}")
-                        
+
                         if len(df) < original_len:
-                            st.success(f"Successfully deleted {len(selected_records)} records and saved to Modified Data directory")
+                            st.success(f"Successfully deleted {len(selected_records)} records")
                             # Clear form state but keep df
                             for key in list(st.session_state.keys()):
                                 if key != 'df':
@@ -526,14 +505,14 @@ def main():
                         merged_record = merge_records(df.loc[idx1],
                                                       df.loc[idx2])
                         # Update the first record with merged values
-                        for col in merged_record.index:
-                            df.loc[idx1, col] = merged_record[col]
+                        set_fields(df, idx1, merged_record.to_dict())
 
                         # Remove the second record
                         df = df.drop(idx2)
 
                         # Save the updated data using save_data function
-                        if save_data(df, region):
+                        if save_data(df, region, record_ids=[idx1],
+                                     deleted_ids=[idx2]):
                             st.success("Successfully merged and saved records")
                             with st.expander("View Merged Record"):
                                 st.dataframe(df.loc[[idx1]])
@@ -570,7 +549,8 @@ def main():
                             df = df.drop(selected_indices)
 
                             # Save the updated dataframe
-                            if save_data(df, region):
+                            if save_data(df, region,
+                                         deleted_ids=selected_indices):
                                 st.success(
                                     f"Successfully deleted {len(selected_indices)} records"
                                 )
@@ -600,21 +580,21 @@ def main():
                                 df.loc[idx1], df.loc[idx2])
 
                             # Update the first record with merged values
-                            for col in merged_record.index:
-                                df.loc[idx1, col] = merged_record[col]
+                            set_fields(df, idx1, merged_record.to_dict())
 
                             # Delete the second record
                             df = df.drop(idx2)
 
                             # Save the updated dataframe
-                            if save_data(df, region):
+                            if save_data(df, region, record_ids=[idx1],
+                                         deleted_ids=[idx2]):
                                 st.success("Successfully merged records")
                                 # Clear selection state without full page rerun
                                 st.session_state.selected_indices = set()
                                 for i in duplicates.index:
                                     st.session_state[f"checkbox_{i}"] = False
                                 duplicates = find_duplicates(
-                                    df, duplicate_name, duplicate_email,
+                                    df, region, duplicate_name, duplicate_email,
                                     duplicate_phone, duplicate_position)
                             else:
                                 st.error("Failed to save data")
@@ -627,6 +607,23 @@ def main():
         else:
             st.info("No duplicate records found")
 
+    # Likely duplicates that the exact name/email/phone search above misses
+    st.markdown("---")
+    st.subheader("Review Likely Duplicates")
+    st.write("Pairs of records with similar names, emails or phone numbers, "
+             "e.g. 'Jon Smith' and 'John Smith' with the same phone.")
+    if st.button("Find Likely Duplicates", key="find_fuzzy_duplicates"):
+        st.session_state.fuzzy_pairs = (region, find_fuzzy_duplicates(df))
+
+    fuzzy_region, fuzzy_pairs = st.session_state.get('fuzzy_pairs', (None, None))
+    if fuzzy_region == region:
+        if len(fuzzy_pairs) > 0:
+            st.success(f"Found {len(fuzzy_pairs)} likely duplicate pairs")
+            st.write("Use the duplicate search above to merge or delete them.")
+            show_table(fuzzy_pairs, key="fuzzy_pairs")
+        else:
+            st.info("No likely duplicates found")
+
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -4,6 +4,13 @@ import pandas as pd
 import os
 from datetime import datetime
 
+from utils.change_log import get_change_log, write_snapshot
+from utils.data_cache import load_snapshot_cached, snapshot_version
+from utils.dtypes import set_fields
+from utils.paged_table import show_table
+from utils.search_index import (SEARCH_COLUMNS, describe_candidates, get_page,
+                                get_search_index, page_count)
+
 def candidate_update_section(region):
     """Handle candidate data update functionality"""
     st.title("Candidate Data Update Tool")
@@ -12,8 +19,10 @@ def candidate_update_section(region):
     # Show data overview based on region
     st.write(f"### {region} Data Overview")
 
-    # Load data based on region
+    # Load the latest snapshot with the changes logged against it applied
     df = None
+    dataset = region.lower()
+    change_log = get_change_log()
     if region == "India":
         modified_dir = os.path.join('database', 'Modified Data')
         if os.path.exists(modified_dir):
@@ -21,9 +30,9 @@ def candidate_update_section(region):
             if modified_files:
                 latest_file = os.path.join(modified_dir, modified_files[0])
                 print(f"Using latest modified data from: {modified_files[0]}")
-                df = pd.read_csv(latest_file)
+                df = load_snapshot_cached(change_log, dataset, latest_file)
                 print(f"Loaded latest data from: {modified_files[0]}")
-                st.dataframe(df, use_container_width=True)
+                show_table(df, key="update_overview")
                 st.text(f"Total records: {len(df)}")
             else:
                 st.warning("No data files found for India region")
@@ -34,9 +43,9 @@ def candidate_update_section(region):
             if modified_files:
                 latest_file = os.path.join(modified_dir, modified_files[0])
                 print(f"Using latest modified data from: {modified_files[0]}")
-                df = pd.read_csv(latest_file)
+                df = load_snapshot_cached(change_log, dataset, latest_file)
                 print(f"Loaded latest data from: {modified_files[0]}")
-                st.dataframe(df, use_container_width=True)
+                show_table(df, key="update_overview")
                 st.text(f"Total records: {len(df)}")
             else:
                 st.warning("No data files found for US region")
@@ -51,37 +60,28 @@ def candidate_update_section(region):
     search_term = st.sidebar.text_input(f"Enter {search_method.lower()} to search")
 
     if search_term:
-        if search_method == "Name":
-            filtered_df = df[df['name'].str.contains(search_term, case=False, na=False)]
-        elif search_method == "Email":
-            filtered_df = df[df['email'].str.contains(search_term, case=False, na=False)]
-        else:  # Phone
-            filtered_df = df[df['phone'].astype(str).str.contains(search_term, na=False)]
-
-        if len(filtered_df) == 0:
+        search_index = get_search_index(
+            df, snapshot_version(change_log, dataset, latest_file))
+        matches = search_index.search(SEARCH_COLUMNS[search_method], search_term)
+
+        if len(matches) == 0:
             st.warning(f"No candidates found with {search_method.lower()} containing '{search_term}'")
         else:
-            st.success(f"Found {len(filtered_df)} candidate(s)")
+            st.success(f"Found {len(matches)} candidate(s)")
 
-            # Display candidates as selectable options
-            candidate_options = []
-            for i, row in filtered_df.iterrows():
-                candidate = f"{row['name']} - {row.get('email', 'No email')} - {row.get('phone', 'No phone')}"
-                candidate_options.append((candidate, i))
+            # Display one page of candidates as selectable options
+            pages = page_count(len(matches))
+            page = st.sidebar.number_input(f"Results page (of {pages})", min_value=1,
+                                           max_value=pages, value=1) if pages > 1 else 1
+            candidate_options = describe_candidates(df, get_page(matches, page))
 
             if candidate_options:
-                selected_option = st.selectbox(
+                selected_index = st.selectbox(
                     "Select a candidate to update",
-                    options=[c[0] for c in candidate_options],
+                    options=list(candidate_options),
+                    format_func=candidate_options.get,
                     key="candidate_selector")
 
-                # Get the index of the selected candidate
-                selected_index = None
-                for option, idx in candidate_options:
-                    if option == selected_option:
-                        selected_index = idx
-                        break
-
                 if selected_index is not None:
                     selected_candidate = df.loc[selected_index]
                     st.subheader(f"Update {selected_candidate['name']}")
@@ -149,32 +149,36 @@ def candidate_update_section(region):
                     with col1:
                         if st.button("Save Changes"):
                             try:
-                                # Update the dataframe with new values
-                                df.loc[selected_index, 'name'] = name
-                                df.loc[selected_index, 'email'] = email
-                                df.loc[selected_index, 'phone'] = phone
-                                df.loc[selected_index, 'location'] = location
-                                df.loc[selected_index, 'position'] = position
-                                df.loc[selected_index, 'stage'] = stage
-                                df.loc[selected_index, 'source'] = source
-                                df.loc[selected_index, 'date'] = date
-                                df.loc[selected_index, 'notes'] = notes
+                                # Update the dataframe with new values (typed columns
+                                # may be categorical, so new values are added first)
+                                set_fields(df, selected_index, {
+                                    'name': name,
+                                    'email': email,
+                                    'phone': phone,
+                                    'location': location,
+                                    'position': position,
+                                    'stage': stage,
+                                    'source': source,
+                                    'date': date,
+                                    'notes': notes
+                                })
 
                                 if region == "US":
-                                    df.loc[selected_index, 'experience'] = experience
-                                    df.loc[selected_index, 'status'] = status
+                                    set_fields(df, selected_index, {
+                                        'experience': experience,
+                                        'status': status
+                                    })
                                 else:  # India
-                                    df.loc[selected_index, 'total_experience'] = total_experience
-                                    df.loc[selected_index, 'annual_salary'] = annual_salary
-                                    df.loc[selected_index, 'notice_period'] = notice_period
-                                    df.loc[selected_index, 'current_company'] = current_company
+                                    set_fields(df, selected_index, {
+                                        'total_experience': total_experience,
+                                        'annual_salary': annual_salary,
+                                        'notice_period': notice_period,
+                                        'current_company': current_company
+                                    })
 
                                 # Save to Modified Data directory
-                                timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
                                 modified_dir = os.path.join('database', f'Modified Data{" US" if region == "US" else ""}')
-                                os.makedirs(modified_dir, exist_ok=True)
-                                modified_file = os.path.join(modified_dir, f'modified_{region.lower()}_data_{timestamp}.csv')
-                                df.to_csv(modified_file, index=False)
+                                write_snapshot(change_log, dataset, df, modified_dir)
                                 st.success("Changes saved successfully!")
                                 
                             except Exception as e:
@@ -196,9 +200,7 @@ def candidate_update_section(region):
 
                                 # Save to Modified Data directory
                                 modified_dir = os.path.join('database', f'Modified Data{" US" if region == "US" else ""}')
-                                os.makedirs(modified_dir, exist_ok=True)
-                                modified_file = os.path.join(modified_dir, f'modified_{region.lower()}_data_{timestamp}.csv')
-                                df.to_csv(modified_file, index=False)
+                                write_snapshot(change_log, dataset, df, modified_dir)
 
                                 st.success(f"Successfully deleted record for {name}")
                                 st.rerun()
@@ -0,0 +1,37 @@
+import re
+
+import pandas as pd
+
+# Group 1: text before the first '('; group 2 (optional): the contents of the first
+# "(...)" pair on one line, as found by re.search(r'\((.*?)\)', text)
+ACTIVE_PROJECT_PATTERN = re.compile(r'^([^(]*)(?:[\s\S]*?\((.*?)\))?')
+
+
+def split_active_project(values):
+    """Split LinkedIn 'active_project' values like "Data Engineer (Screening)" into the
+    project and the status in parentheses with one str.extract call over the distinct
+    values of the column.
+
+    Values without a "(...)" pair are kept as the project with an empty status, and
+    missing values give empty strings for both.
+
+    Parameters:
+        values (pd.Series): The active_project column
+
+    Returns:
+        pd.DataFrame: 'position' (text before the parentheses, stripped) and 'status'
+            (text inside them, stripped), aligned with values
+    """
+    missing = values.isna()
+    text = values.astype(str).where(~missing, '')
+
+    # Exports repeat a small set of project labels: extract each distinct value once
+    codes, uniques = pd.factorize(text)
+    uniques = pd.Series(uniques, dtype=object)
+    parts = uniques.str.extract(ACTIVE_PROJECT_PATTERN)
+    matched = parts[1].notna()
+    position = parts[0].str.strip().where(matched, uniques)
+    status = parts[1].str.strip().where(matched, '')
+
+    return pd.DataFrame({'position': position.to_numpy(dtype=object)[codes],
+                         'status': status.to_numpy(dtype=object)[codes]}, index=values.index)
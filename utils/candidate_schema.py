@@ -0,0 +1,95 @@
+# Column layout of the candidate frames of each region, in display order
+REGION_COLUMNS = {
+    'India': [
+        'Stage', 'name', 'email', 'phone', 'location', 'total_experience',
+        'annual_salary', 'notice_period', 'position', 'status', 'source',
+        'meeting_notes', 'Date'
+    ],
+    'US': [
+        'Stage', 'name', 'email', 'phone', 'location', 'job title', 'US Person',
+        'salary', 'status', 'source', 'Meeting Notes', 'Date'
+    ],
+    # Combined database (merged_all_data.csv)
+    'all': [
+        'Stage', 'name', 'email', 'phone', 'location', 'experience', 'position',
+        'status', 'profile', 'salary', 'declaration', 'source', 'file_source',
+        'date', 'Meeting Notes'
+    ],
+}
+
+# Columns the pipeline fills in itself rather than reading them from a source, e.g. the
+# stable ID assigned by utils.identity_index. conform_frame keeps them (first) whenever
+# a frame has them, and never adds them or reports them missing.
+PIPELINE_COLUMNS = ['candidate_id']
+
+# Source columns the merge stages still read after a source is ingested (they are mapped
+# onto schema columns by process_L_N_C and final_merge_US), kept by conform_frame on
+# intermediate frames
+STAGE_COLUMNS = {
+    'India': ['notes', 'Start Date & Time', 'Location', 'salary', 'Source'],
+    'US': ['position', 'Start Date & Time'],
+    'all': [],
+}
+
+# Other spellings of schema columns seen in exports and intermediate frames
+# (alias -> schema column); an alias is only used when the schema column is absent
+COLUMN_ALIASES = {
+    'India': {'stage': 'Stage', 'Meeting Notes': 'meeting_notes', 'date': 'Date'},
+    'US': {'stage': 'Stage', 'meeting_notes': 'Meeting Notes', 'date': 'Date'},
+    'all': {'stage': 'Stage', 'meeting_notes': 'Meeting Notes', 'Date': 'date'},
+}
+
+# Column dtypes, applied by utils.dtypes.apply_schema: repetitive columns are held as
+# categoricals and free-text identifiers as strings
+CATEGORY_COLUMNS = ['source', 'Stage', 'stage', 'status', 'position', 'location',
+                    'notice_period']
+IDENTIFIER_COLUMNS = ['name', 'email', 'phone']
+
+
+def resolve_aliases(columns, region):
+    """Return the {alias: schema column} renames that apply to the given columns"""
+    columns = set(columns)
+    return {alias: column for alias, column in COLUMN_ALIASES[region].items()
+            if alias in columns and column not in columns}
+
+
+def conform_frame(df, region, stage=None, final=True):
+    """Resolve aliases and project df onto the region's schema columns in one step.
+
+    A final frame gets exactly the schema columns in schema order: missing ones are
+    added empty (object dtype). An intermediate frame (final=False, e.g. the output of
+    a source before the merge stages) keeps the schema and STAGE_COLUMNS columns it
+    has, in its own order. In both cases PIPELINE_COLUMNS are kept and other columns
+    are dropped; missing and dropped columns are reported as schema drift.
+
+    Parameters:
+        df (pd.DataFrame): Frame produced by a pipeline stage
+        region (str): 'India', 'US' or 'all'
+        stage (str): Name of the pipeline stage, used in the drift report
+        final (bool): Whether df is a finished frame rather than an intermediate one
+
+    Returns:
+        pd.DataFrame: df projected onto the schema
+    """
+    schema = REGION_COLUMNS[region]
+    rename = resolve_aliases(df.columns, region)
+    renamed = [rename.get(col, col) for col in df.columns]
+    if final:
+        columns = list(schema)
+    else:
+        declared = set(schema) | set(STAGE_COLUMNS[region])
+        columns = [col for col in renamed if col in declared]
+    columns = [col for col in PIPELINE_COLUMNS if col in renamed] + columns
+    missing = [col for col in schema if col not in renamed]
+    dropped = [col for col, new in zip(df.columns, renamed) if new not in columns]
+    if missing or dropped:
+        where = f"{region} {stage}" if stage else region
+        print(f"Schema drift ({where}): missing {missing}, dropped {dropped}")
+
+    if rename:
+        df = df.rename(columns=rename)
+    df = df.reindex(columns=columns)
+    for col in missing:
+        if col in df.columns:
+            df[col] = df[col].astype(object)
+    return df
@@ -0,0 +1,279 @@
+import functools
+import json
+import os
+import re
+import sqlite3
+import threading
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_DB_PATH = 'candidate_database.db'
+
+
+def _normalize_value(value, digits=False):
+    """Normalize one lookup value (lowercase, or digits only); empty becomes None"""
+    if value is None or (not isinstance(value, str) and pd.isna(value)):
+        return None
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    value = str(value)
+    value = re.sub(r'\D', '', value) if digits else value.lower().strip()
+    return value or None
+
+
+def _normalize(df, column, digits=False):
+    """Return normalized lookup values of a column"""
+    if column not in df.columns:
+        return [None] * len(df)
+    return [_normalize_value(v, digits) for v in df[column].tolist()]
+
+
+def _to_sql_value(value):
+    """Convert a pandas/numpy scalar into a value SQLite can store"""
+    if value is None or (not isinstance(value, str) and pd.isna(value)):
+        return None
+    if hasattr(value, 'item'):
+        return value.item()
+    if isinstance(value, (pd.Timestamp, datetime)):
+        return value.isoformat()
+    return value
+
+
+def _synchronized(method):
+    """Run a method while holding its object's lock. Streamlit runs every session in
+    its own thread and they all share one connection, so each operation (and its
+    transaction) must finish before the next one starts."""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._lock:
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
+class CandidateStore:
+    """SQLite store for candidate datasets ('us', 'india', 'all', ...).
+
+    Every record is one row of the candidates table, indexed by normalized email,
+    phone and name. Column names are kept case-sensitive (e.g. 'Stage' and 'stage')
+    by mapping each one to a numbered SQLite column. Loaded frames are indexed by
+    record id, so single-record edits can be written back with update_records.
+
+    A dataset can record the CSV snapshot it holds (see source), so readers can tell
+    when a screen that writes snapshots has made the store out of date.
+    """
+
+    def __init__(self, path=DEFAULT_DB_PATH):
+        self.path = path
+        self._lock = threading.RLock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.executescript('''
+            CREATE TABLE IF NOT EXISTS candidates (
+                id INTEGER PRIMARY KEY,
+                dataset TEXT NOT NULL,
+                name_norm TEXT,
+                email_norm TEXT,
+                phone_norm TEXT
+            );
+            CREATE INDEX IF NOT EXISTS idx_candidates_email
+                ON candidates (dataset, email_norm);
+            CREATE INDEX IF NOT EXISTS idx_candidates_phone
+                ON candidates (dataset, phone_norm);
+            CREATE INDEX IF NOT EXISTS idx_candidates_name
+                ON candidates (dataset, name_norm);
+            CREATE TABLE IF NOT EXISTS fields (
+                field_id INTEGER PRIMARY KEY,
+                name TEXT NOT NULL UNIQUE
+            );
+            CREATE TABLE IF NOT EXISTS datasets (
+                dataset TEXT PRIMARY KEY,
+                columns TEXT NOT NULL,
+                updated_at TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS dataset_sources (
+                dataset TEXT PRIMARY KEY,
+                source TEXT NOT NULL
+            );
+        ''')
+        self._fields = dict(self.conn.execute('SELECT name, field_id FROM fields'))
+
+    @_synchronized
+    def close(self):
+        self.conn.close()
+
+    def _field_columns(self, columns):
+        """Return the SQLite column of every data column, adding new ones as needed"""
+        for name in columns:
+            if name not in self._fields:
+                cur = self.conn.execute('INSERT INTO fields (name) VALUES (?)', (name,))
+                self._fields[name] = cur.lastrowid
+                self.conn.execute(f'ALTER TABLE candidates ADD COLUMN f{cur.lastrowid}')
+        return [f'f{self._fields[name]}' for name in columns]
+
+    def _set_columns(self, dataset, columns):
+        self.conn.execute(
+            'INSERT OR REPLACE INTO datasets VALUES (?, ?, ?)',
+            (dataset, json.dumps(list(columns)), datetime.now().isoformat()))
+
+    def _rows(self, df, columns):
+        """Yield (name_norm, email_norm, phone_norm, *values) tuples for df"""
+        norms = zip(_normalize(df, 'name'), _normalize(df, 'email'),
+                    _normalize(df, 'phone', digits=True))
+        values = zip(*(df[col].astype(object).tolist() for col in columns)) \
+            if columns else ((),) * len(df)
+        for norm, row in zip(norms, values):
+            yield norm + tuple(_to_sql_value(v) for v in row)
+
+    @_synchronized
+    def datasets(self):
+        return [row[0] for row in self.conn.execute('SELECT dataset FROM datasets')]
+
+    @_synchronized
+    def has_dataset(self, dataset):
+        return self.columns(dataset) is not None
+
+    @_synchronized
+    def columns(self, dataset):
+        row = self.conn.execute('SELECT columns FROM datasets WHERE dataset = ?',
+                                (dataset,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    @_synchronized
+    def source(self, dataset):
+        """Return the key of the snapshot the dataset holds, or None if unknown"""
+        row = self.conn.execute('SELECT source FROM dataset_sources WHERE dataset = ?',
+                                (dataset,)).fetchone()
+        return row[0] if row else None
+
+    def _set_source(self, dataset, source):
+        if source is None:
+            self.conn.execute('DELETE FROM dataset_sources WHERE dataset = ?', (dataset,))
+        else:
+            self.conn.execute('INSERT OR REPLACE INTO dataset_sources VALUES (?, ?)',
+                              (dataset, source))
+
+    @_synchronized
+    def set_source(self, dataset, source):
+        """Record that the dataset now holds the snapshot identified by source"""
+        with self.conn:
+            self._set_source(dataset, source)
+
+    @_synchronized
+    def version(self, dataset):
+        """Return the time the dataset was last written, or None"""
+        row = self.conn.execute('SELECT updated_at FROM datasets WHERE dataset = ?',
+                                (dataset,)).fetchone()
+        return row[0] if row else None
+
+    def _select(self, dataset, where='', params=()):
+        columns = self.columns(dataset)
+        if columns is None:
+            return None
+        sql_columns = ['id'] + self._field_columns(columns)
+        query = (f'SELECT {", ".join(sql_columns)} FROM candidates '
+                 f'WHERE dataset = ? {where} ORDER BY id')
+        rows = self.conn.execute(query, (dataset,) + tuple(params)).fetchall()
+        df = pd.DataFrame.from_records(rows, columns=['id'] + columns)
+        df = df.set_index('id').rename_axis(None).infer_objects()
+        # Missing values come back as None; use NaN like read_csv does
+        return df.where(df.notna(), np.nan)
+
+    @_synchronized
+    def load(self, dataset):
+        """Load a whole dataset indexed by record id, or None if it does not exist"""
+        return self._select(dataset)
+
+    @_synchronized
+    def get_records(self, dataset, record_ids):
+        """Load the given records of a dataset, indexed by record id"""
+        record_ids = [int(i) for i in record_ids]
+        if not record_ids:
+            return self._select(dataset, 'AND 0')
+        placeholders = ', '.join(['?'] * len(record_ids))
+        return self._select(dataset, f'AND id IN ({placeholders})', record_ids)
+
+    @_synchronized
+    def find(self, dataset, name=None, email=None, phone=None):
+        """Return records exactly matching any given normalized name, email or phone"""
+        conditions, params = [], []
+        for column, value in [('name_norm', _normalize_value(name)),
+                              ('email_norm', _normalize_value(email)),
+                              ('phone_norm', _normalize_value(phone, digits=True))]:
+            if value is not None:
+                conditions.append(f'{column} = ?')
+                params.append(value)
+        if not conditions:
+            return self._select(dataset, 'AND 0')
+        return self._select(dataset, f'AND ({" OR ".join(conditions)})', params)
+
+    @_synchronized
+    def save(self, dataset, df, source=None):
+        """Replace a dataset with df and return the frame indexed by the new record ids.
+
+        source is the key of the snapshot df was read from; without one the dataset's
+        snapshot is unknown, so the next synced load imports the latest snapshot again.
+        """
+        columns = list(df.columns)
+        with self.conn:
+            sql_columns = self._field_columns(columns)
+            self.conn.execute('DELETE FROM candidates WHERE dataset = ?', (dataset,))
+            self._set_columns(dataset, columns)
+            self._set_source(dataset, source)
+            placeholders = ', '.join(['?'] * (len(sql_columns) + 4))
+            self.conn.executemany(
+                f'INSERT INTO candidates (dataset, name_norm, email_norm, phone_norm'
+                f'{"".join(", " + c for c in sql_columns)}) VALUES ({placeholders})',
+                ((dataset,) + row for row in self._rows(df, columns)))
+            ids = [row[0] for row in self.conn.execute(
+                'SELECT id FROM candidates WHERE dataset = ? ORDER BY id', (dataset,))]
+        saved = df.copy()
+        saved.index = ids
+        return saved
+
+    @_synchronized
+    def update_records(self, dataset, df):
+        """Write complete rows of df (indexed by record id) back to the store"""
+        columns = self.columns(dataset) or []
+        new_columns = [c for c in df.columns if c not in columns]
+        with self.conn:
+            if new_columns:
+                self._set_columns(dataset, columns + new_columns)
+            sql_columns = self._field_columns(list(df.columns))
+            assignments = ', '.join(
+                f'{c} = ?' for c in ['name_norm', 'email_norm', 'phone_norm'] + sql_columns)
+            self.conn.executemany(
+                f'UPDATE candidates SET {assignments} WHERE id = ? AND dataset = ?',
+                (row + (int(record_id), dataset)
+                 for row, record_id in zip(self._rows(df, list(df.columns)), df.index)))
+            self.conn.execute('UPDATE datasets SET updated_at = ? WHERE dataset = ?',
+                              (datetime.now().isoformat(), dataset))
+
+    @_synchronized
+    def delete_records(self, dataset, record_ids):
+        with self.conn:
+            self.conn.executemany('DELETE FROM candidates WHERE id = ? AND dataset = ?',
+                                  ((int(i), dataset) for i in record_ids))
+            self.conn.execute('UPDATE datasets SET updated_at = ? WHERE dataset = ?',
+                              (datetime.now().isoformat(), dataset))
+
+
+def import_csv(store, dataset, file_path):
+    """Seed a dataset from a CSV snapshot and return it, or None if the file is missing"""
+    if not os.path.exists(file_path):
+        return None
+    return store.save(dataset, pd.read_csv(file_path))
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def get_store(path=DEFAULT_DB_PATH):
+    """Return the shared store for path, opening it on first use"""
+    with _stores_lock:
+        if path not in _stores:
+            _stores[path] = CandidateStore(path)
+        return _stores[path]
@@ -0,0 +1,206 @@
+import os
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+from utils.candidate_store import DEFAULT_DB_PATH, _synchronized, _to_sql_value
+from utils.dtypes import apply_schema
+
+# Field name recorded when a whole record is deleted
+DELETED = '_deleted'
+
+
+def _same(old, new):
+    """Compare two cell values, treating NaN, None and '' as equal"""
+    old_missing = old is None or (not isinstance(old, str) and pd.isna(old)) or old == ''
+    new_missing = new is None or (not isinstance(new, str) and pd.isna(new)) or new == ''
+    if old_missing or new_missing:
+        return old_missing and new_missing
+    return old == new or str(old) == str(new)
+
+
+def diff_record(old_row, new_row):
+    """Return the (field, old value, new value) changes between two versions of a record"""
+    changes = []
+    for field in new_row.index:
+        old = old_row.get(field) if old_row is not None else None
+        if not _same(old, new_row[field]):
+            changes.append((field, _to_sql_value(old), _to_sql_value(new_row[field])))
+    return changes
+
+
+def apply_changes(df, changes):
+    """Replay logged changes onto df (indexed by record id) in the order they were made"""
+    df = df.copy()
+    deleted = []
+    for record_id, field, value in changes[['record_id', 'field', 'new_value']].itertuples(
+            index=False):
+        if field == DELETED:
+            deleted.append(record_id)
+            continue
+        if field not in df.columns:
+            df[field] = None
+        if df[field].dtype != object:
+            df[field] = df[field].astype(object)
+        df.loc[record_id, field] = value
+    return df.drop(index=[i for i in deleted if i in df.index])
+
+
+class ChangeLog:
+    """Append-only log of field-level candidate edits.
+
+    Each entry records the dataset and snapshot it applies to, the record id, field,
+    old and new value, time and the screen that made the edit. Record ids are row
+    numbers of that snapshot, so entries only apply to the snapshot they were logged
+    against: every screen that writes a new snapshot writes it from a frame loaded with
+    load_snapshot, i.e. with the changes already applied. Old entries are kept as
+    history, so any point in time can be rebuilt from a snapshot and the changes made
+    on it.
+    """
+
+    def __init__(self, path=DEFAULT_DB_PATH):
+        self.path = path
+        self._lock = threading.RLock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.executescript('''
+            CREATE TABLE IF NOT EXISTS change_log (
+                id INTEGER PRIMARY KEY,
+                dataset TEXT NOT NULL,
+                snapshot TEXT NOT NULL,
+                record_id INTEGER NOT NULL,
+                field TEXT NOT NULL,
+                old_value,
+                new_value,
+                changed_at TEXT NOT NULL,
+                source TEXT
+            );
+            CREATE INDEX IF NOT EXISTS idx_change_log_snapshot
+                ON change_log (dataset, snapshot, id);
+            CREATE INDEX IF NOT EXISTS idx_change_log_record
+                ON change_log (dataset, record_id);
+        ''')
+
+    @_synchronized
+    def close(self):
+        self.conn.close()
+
+    @_synchronized
+    def record(self, dataset, snapshot, record_id, changes, source=None):
+        """Append (field, old value, new value) changes of one record; returns the count"""
+        changed_at = datetime.now().isoformat()
+        with self.conn:
+            self.conn.executemany(
+                'INSERT INTO change_log (dataset, snapshot, record_id, field, old_value, '
+                'new_value, changed_at, source) VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                ((dataset, snapshot, int(record_id), field, old, new, changed_at, source)
+                 for field, old, new in changes))
+        return len(changes)
+
+    def record_edit(self, dataset, snapshot, record_id, old_row, new_row, source=None):
+        """Log the fields that differ between two versions of a record"""
+        return self.record(dataset, snapshot, record_id,
+                           diff_record(old_row, new_row), source)
+
+    @_synchronized
+    def record_delete(self, dataset, snapshot, record_ids, source=None):
+        for record_id in record_ids:
+            self.record(dataset, snapshot, record_id, [(DELETED, None, 1)], source)
+
+    @_synchronized
+    def changes(self, dataset, snapshot, until=None):
+        """Return the changes made on a snapshot, optionally only those up to a time"""
+        query = ('SELECT record_id, field, old_value, new_value, changed_at, source '
+                 'FROM change_log WHERE dataset = ? AND snapshot = ?')
+        params = [dataset, snapshot]
+        if until is not None:
+            query += ' AND changed_at <= ?'
+            params.append(pd.Timestamp(until).isoformat())
+        rows = self.conn.execute(query + ' ORDER BY id', params).fetchall()
+        return pd.DataFrame(rows, columns=['record_id', 'field', 'old_value',
+                                           'new_value', 'changed_at', 'source'])
+
+    @_synchronized
+    def version(self, dataset, snapshot):
+        """Return the id of the last change logged against a snapshot, or 0"""
+        return self.conn.execute(
+            'SELECT COALESCE(MAX(id), 0) FROM change_log WHERE dataset = ? AND snapshot = ?',
+            (dataset, snapshot)).fetchone()[0]
+
+    @_synchronized
+    def pending_count(self, dataset, snapshot):
+        return self.conn.execute(
+            'SELECT COUNT(*) FROM change_log WHERE dataset = ? AND snapshot = ?',
+            (dataset, snapshot)).fetchone()[0]
+
+    @_synchronized
+    def history(self, dataset, record_id):
+        """Return every logged change of one record, oldest first"""
+        rows = self.conn.execute(
+            'SELECT snapshot, field, old_value, new_value, changed_at, source '
+            'FROM change_log WHERE dataset = ? AND record_id = ? ORDER BY id',
+            (dataset, int(record_id))).fetchall()
+        return pd.DataFrame(rows, columns=['snapshot', 'field', 'old_value',
+                                           'new_value', 'changed_at', 'source'])
+
+
+_change_logs = {}
+_change_logs_lock = threading.Lock()
+
+
+def get_change_log(path=DEFAULT_DB_PATH):
+    """Return the shared change log for path, opening it on first use"""
+    with _change_logs_lock:
+        if path not in _change_logs:
+            _change_logs[path] = ChangeLog(path)
+        return _change_logs[path]
+
+
+def load_snapshot(change_log, dataset, snapshot_file, until=None):
+    """Read a CSV snapshot and replay the changes logged against it.
+
+    Parameters:
+        change_log (ChangeLog): Log holding the changes
+        dataset (str): Dataset name the changes were logged under
+        snapshot_file (str): Path of the CSV snapshot
+        until: Optional time; only changes made up to then are applied
+
+    Returns:
+        pd.DataFrame: Current records indexed by their row number in the snapshot
+    """
+    df = pd.read_csv(snapshot_file)
+    changes = change_log.changes(dataset, os.path.basename(snapshot_file), until)
+    if len(changes):
+        df = apply_changes(df, changes)
+    return apply_schema(df)
+
+
+def write_snapshot(change_log, dataset, df, snapshot_dir):
+    """Write df, loaded with load_snapshot and edited since, as a new snapshot.
+
+    Parameters:
+        change_log (ChangeLog): Log the edits were recorded in
+        dataset (str): Dataset name, used in the file name
+        df (pd.DataFrame): Current records
+        snapshot_dir (str): Directory of the dataset's snapshots
+
+    Returns:
+        str: Path of the new snapshot
+    """
+    os.makedirs(snapshot_dir, exist_ok=True)
+    # Held so two sessions cannot write the same file; a name already in use (two
+    # saves within a second) would let its logged changes apply to the wrong rows
+    with change_log._lock:
+        written_at = datetime.now()
+        while True:
+            new_file = os.path.join(
+                snapshot_dir,
+                f'modified_{dataset}_data_{written_at.strftime("%Y%m%d_%H%M%S")}.csv')
+            if not os.path.exists(new_file):
+                break
+            written_at += timedelta(seconds=1)
+        df.to_csv(new_file, index=False)
+    print(f"Saved {dataset} snapshot {new_file}")
+    return new_file
@@ -0,0 +1,205 @@
+import numpy as np
+import pandas as pd
+
+from utils.standardization import normalize_text, phone_digits
+
+
+MATCH_KEYS = ['key1', 'key2', 'key3']
+
+# Normalized values that carry no identity, e.g. str(None) or str(np.nan)
+PLACEHOLDER_VALUES = ['', 'nan', 'none', 'null', 'nat', '<na>', 'n/a', '_']
+
+# Shorter digit strings are extensions, country codes or typos, not phone numbers
+MIN_PHONE_DIGITS = 7
+
+
+def _is_valid_part(values):
+    """Return a mask of normalized key parts that are neither null nor placeholders"""
+    return values.notna() & ~values.isin(PLACEHOLDER_VALUES)
+
+
+def add_match_keys(df):
+    """Add normalized name/email/phone columns and the three matching keys to df.
+
+    - key1: name + email
+    - key2: name + phone
+    - key3: email + phone
+
+    A key is left null when either part is empty, a placeholder such as 'nan', or a
+    phone shorter than MIN_PHONE_DIGITS, so those rows are never grouped on it.
+
+    Returns:
+        dict: Number of rows excluded from matching for each key
+    """
+    # Normalize phone numbers (remove non-digit characters)
+    df['phone_norm'] = phone_digits(df['phone'])
+
+    # Normalize name and email (lowercase and strip extra spaces)
+    df['name_norm'] = normalize_text(df['name'])
+    df['email_norm'] = normalize_text(df['email'])
+
+    valid_name = _is_valid_part(df['name_norm'])
+    valid_email = _is_valid_part(df['email_norm'])
+    valid_phone = (_is_valid_part(df['phone_norm']) &
+                   (df['phone_norm'].str.len() >= MIN_PHONE_DIGITS))
+
+    # Create matching keys for grouping, masking the invalid ones
+    df['key1'] = (df['name_norm'] + '_' + df['email_norm']).where(valid_name & valid_email)
+    df['key2'] = (df['name_norm'] + '_' + df['phone_norm']).where(valid_name & valid_phone)
+    df['key3'] = (df['email_norm'] + '_' + df['phone_norm']).where(valid_email & valid_phone)
+
+    return {key: int(df[key].isna().sum()) for key in MATCH_KEYS}
+
+
+class DisjointSet:
+    """Union-find over row positions 0..n-1 with path halving and union by size"""
+
+    def __init__(self, n):
+        self.parent = np.arange(n)
+        self.size = np.ones(n, dtype=np.int64)
+
+    def find(self, i):
+        parent = self.parent
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    def union(self, a, b):
+        root_a = self.find(a)
+        root_b = self.find(b)
+        if root_a == root_b:
+            return root_a
+        if self.size[root_a] < self.size[root_b]:
+            root_a, root_b = root_b, root_a
+        self.parent[root_b] = root_a
+        self.size[root_a] += self.size[root_b]
+        return root_a
+
+    def roots(self):
+        """Return the root of every element"""
+        return np.array([self.find(i) for i in range(len(self.parent))],
+                        dtype=np.int64)
+
+
+def key_links(values):
+    """Link every row to the first row sharing the same key value.
+
+    Rows whose key is null are left unlinked, matching groupby's default
+    of dropping NaN keys. Returns two position arrays (row, first_row).
+    """
+    codes, _ = pd.factorize(values)
+    positions = np.arange(len(codes))
+    valid = codes >= 0
+    if not valid.any():
+        return positions[:0], positions[:0]
+
+    # factorize numbers groups in order of first appearance, so the first
+    # occurrence of each code is the group's first member
+    _, first_idx = np.unique(codes[valid], return_index=True)
+    first_pos = positions[valid][first_idx]
+
+    rows = positions[valid]
+    firsts = first_pos[codes[valid]]
+    linked = rows != firsts
+    return rows[linked], firsts[linked]
+
+
+def cluster_by_keys(df, keys):
+    """Assign a cluster id to every row of df so that rows sharing any key share a cluster.
+
+    Each row is linked only to the first member of its key group, so the cost is
+    linear in the number of rows rather than quadratic in the group size.
+
+    Parameters:
+        df (pd.DataFrame): Frame containing the key columns
+        keys (list): Names of the key columns
+
+    Returns:
+        np.ndarray: Cluster ids numbered 0..k-1 in order of each cluster's first row
+    """
+    ds = DisjointSet(len(df))
+    for key in keys:
+        rows, firsts = key_links(df[key].to_numpy())
+        for row, first in zip(rows.tolist(), firsts.tolist()):
+            ds.union(row, first)
+
+    cluster_ids, _ = pd.factorize(ds.roots())
+    return cluster_ids
+
+
+# Merge policies for collapse_clusters
+FIRST = 'first'                    # value from the cluster's first row
+FIRST_NON_NULL = 'first_non_null'  # first non-null value in row order
+LATEST = 'latest'                  # value from the row with the latest date
+CONCAT = 'concat'                  # unique non-empty values joined by newlines
+
+MERGE_POLICIES = (FIRST, FIRST_NON_NULL, LATEST, CONCAT)
+
+
+def _join_unique(values, cluster_ids, sep, skip_blank=True):
+    """Join the unique non-null values of each cluster in row order"""
+    tmp = pd.DataFrame({'cluster': cluster_ids, 'value': values})
+    tmp = tmp[tmp['value'].notna()]
+    tmp['value'] = tmp['value'].astype(str)
+    if skip_blank:
+        tmp = tmp[tmp['value'].str.strip() != '']
+    tmp = tmp.drop_duplicates()
+    return tmp.groupby('cluster', sort=False)['value'].agg(sep.join)
+
+
+def collapse_clusters(df, cluster_col, policies=None, date_col='Date'):
+    """Collapse every cluster of rows into a single row in one vectorized pass.
+
+    The first row of each cluster is the base row. 'source' becomes the comma-joined
+    unique sources of the cluster, and any column listed in policies is merged with
+    one of MERGE_POLICIES instead of being taken from the base row.
+
+    Parameters:
+        df (pd.DataFrame): Frame with a cluster id column
+        cluster_col (str): Name of the cluster id column
+        policies (dict): Optional column -> merge policy mapping
+        date_col (str): Column used to order rows for the 'latest' policy
+
+    Returns:
+        pd.DataFrame: One row per cluster, in order of each cluster's first row
+    """
+    policies = policies or {}
+    for col, policy in policies.items():
+        if policy not in MERGE_POLICIES:
+            raise ValueError(f"Unknown merge policy '{policy}' for column '{col}'")
+
+    cluster_ids = df[cluster_col].to_numpy()
+    merged_df = df[~df[cluster_col].duplicated()].copy()
+    base_ids = merged_df[cluster_col]
+
+    if 'source' in df.columns:
+        sources = _join_unique(df['source'].to_numpy(), cluster_ids, ',',
+                               skip_blank=False)
+        merged_df['source'] = base_ids.map(sources).fillna('').to_numpy()
+
+    latest_rows = None
+    for col, policy in policies.items():
+        if col not in df.columns or policy == FIRST:
+            continue
+
+        if policy == FIRST_NON_NULL:
+            values = df[col].groupby(cluster_ids, sort=False).first()
+        elif policy == CONCAT:
+            values = _join_unique(df[col].to_numpy(), cluster_ids, '\n')
+        else:  # LATEST
+            if latest_rows is None:
+                if date_col in df.columns:
+                    dates = pd.to_datetime(df[date_col], errors='coerce')
+                else:
+                    dates = pd.Series(pd.NaT, index=df.index)
+                # Stable sort keeps row order among equal dates; undated rows sort first
+                order = np.argsort(dates.fillna(pd.Timestamp.min).to_numpy(),
+                                   kind='stable')
+                latest_rows = df.iloc[order].drop_duplicates(cluster_col,
+                                                             keep='last')
+            values = latest_rows.set_index(cluster_col)[col]
+
+        merged_df[col] = base_ids.map(values).to_numpy()
+
+    return merged_df
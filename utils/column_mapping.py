@@ -0,0 +1,120 @@
+import hashlib
+
+# Mapping plans keyed by (plan kind, mapping, header tuple). Exports share a handful of
+# header layouts, so files with an identical header reuse the plan built for the first.
+_plans = {}
+
+
+def header_fingerprint(columns):
+    """Return a short, stable hash of a header row, used to identify cached plans"""
+    header = '\x1f'.join(str(col) for col in columns)
+    return hashlib.sha1(header.encode('utf-8')).hexdigest()[:16]
+
+
+def _mapping_key(mapping):
+    """Freeze a {name: [synonyms or keywords]} mapping so it can be part of a cache key"""
+    return tuple((name, tuple(values)) for name, values in mapping.items())
+
+
+def _plan_rename(columns, mapping, first_match):
+    """Build the {column: standard name} rename map for a header.
+
+    first_match='mapping' walks the mapping and renames the first column matching each
+    standard name (a column matched by several names keeps the last one);
+    first_match='column' walks the columns and uses the first standard name listing
+    the column as a synonym.
+    """
+    normalized = [str(col).strip().lower() for col in columns]
+    synonyms = {std_col: {s.strip().lower() for s in values} for std_col, values in mapping.items()}
+    rename = {}
+    if first_match == 'mapping':
+        for std_col, names in synonyms.items():
+            for col, col_norm in zip(columns, normalized):
+                if col_norm in names:
+                    rename[col] = std_col
+                    break
+    else:
+        for col, col_norm in zip(columns, normalized):
+            for std_col, names in synonyms.items():
+                if col_norm in names:
+                    rename[col] = std_col
+                    break
+    return rename
+
+
+def _plan_projection(columns, tags):
+    """Build the {category: column} projection of process_columns: the first column
+    containing the first matching keyword of each category (None when nothing matches)"""
+    lowered = [str(col).lower() for col in columns]
+    projection = {}
+    for category, keywords in tags.items():
+        projection[category] = None
+        for keyword in keywords:
+            matching_cols = [col for col in lowered if keyword in col]
+            if matching_cols:
+                projection[category] = matching_cols[0]
+                break
+    return projection
+
+
+def _get_plan(kind, columns, mapping, build):
+    columns = tuple(columns)
+    key = (kind, _mapping_key(mapping), columns)
+    plan = _plans.get(key)
+    if plan is None:
+        plan = {
+            'kind': kind,
+            'fingerprint': header_fingerprint(columns),
+            'columns': columns,
+            'plan': build(columns),
+            'hits': 0
+        }
+        _plans[key] = plan
+    else:
+        plan['hits'] += 1
+    return plan
+
+
+def get_rename_plan(columns, mapping, first_match='mapping'):
+    """Return the cached rename plan for a header, building it on first use.
+
+    Parameters:
+        columns (iterable): Column names of the DataFrame
+        mapping (dict): Standard column name -> list of synonyms
+        first_match (str): 'mapping' or 'column', see _plan_rename
+
+    Returns:
+        dict: Plan with 'fingerprint', 'columns', 'plan' (the rename map) and 'hits'
+    """
+    return _get_plan(f'rename:{first_match}', columns, mapping,
+                     lambda cols: _plan_rename(cols, mapping, first_match))
+
+
+def get_projection_plan(columns, tags):
+    """Return the cached {category: column} projection plan of a header for the given
+    column tags (category -> list of keywords matched as substrings)"""
+    return _get_plan('projection', columns, tags, lambda cols: _plan_projection(cols, tags))
+
+
+def standardize_columns(df, mapping, first_match='mapping', inplace=False):
+    """Rename df's columns to their standard names using the cached plan for its header.
+
+    Returns:
+        pd.DataFrame: The renamed DataFrame (df itself when inplace is True)
+    """
+    rename = get_rename_plan(df.columns, mapping, first_match)['plan']
+    if inplace:
+        df.rename(columns=rename, inplace=True)
+        return df
+    return df.rename(columns=rename)
+
+
+def cached_plans():
+    """Return copies of all cached plans, most used first, for debugging"""
+    plans = [dict(plan) for plan in _plans.values()]
+    return sorted(plans, key=lambda plan: plan['hits'], reverse=True)
+
+
+def clear_plans():
+    """Drop all cached plans"""
+    _plans.clear()
@@ -0,0 +1,103 @@
+import json
+import os
+
+import streamlit as st
+
+from utils.candidate_store import get_store
+from utils.change_log import get_change_log, load_snapshot
+from utils.dtypes import apply_schema
+
+# Streamlit reruns the whole script on every widget interaction. The loaders below
+# keep parsed frames in st.cache_data (shared by all sessions of the server) keyed by
+# what identifies the underlying data, so a rerun only re-reads a file or dataset
+# after it has changed. Each call returns a fresh copy, so callers may modify it.
+
+# Cached frames kept per loader; older entries are dropped first
+MAX_ENTRIES = 16
+
+
+def file_signature(file_path):
+    """Return (mtime_ns, size) of a file, which changes whenever it is rewritten"""
+    stat = os.stat(file_path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+@st.cache_data(show_spinner=False, max_entries=MAX_ENTRIES)
+def _list_csv_files(directory, mtime_ns):
+    return sorted([f for f in os.listdir(directory) if f.endswith('.csv')], reverse=True)
+
+
+def list_csv_files(directory):
+    """Return the CSV file names of a directory, newest (largest timestamp) first.
+
+    The listing is cached until files are added to or removed from the directory.
+    Missing directories give an empty list.
+    """
+    if not os.path.isdir(directory):
+        return []
+    return _list_csv_files(directory, os.stat(directory).st_mtime_ns)
+
+
+@st.cache_data(show_spinner=False, max_entries=MAX_ENTRIES)
+def _load_snapshot(_change_log, log_path, dataset, snapshot_file, signature, version):
+    return load_snapshot(_change_log, dataset, snapshot_file)
+
+
+def snapshot_version(change_log, dataset, snapshot_file):
+    """Return a key that changes whenever the snapshot file is rewritten or a change is
+    logged against it"""
+    return (change_log.path, dataset, snapshot_file, file_signature(snapshot_file),
+            change_log.version(dataset, os.path.basename(snapshot_file)))
+
+
+def load_snapshot_cached(change_log, dataset, snapshot_file):
+    """utils.change_log.load_snapshot, reloaded only when the snapshot file changes or a
+    change is logged against it"""
+    return _load_snapshot(change_log, *snapshot_version(change_log, dataset, snapshot_file))
+
+
+@st.cache_data(show_spinner=False, max_entries=MAX_ENTRIES)
+def _load_dataset(store_path, dataset, version):
+    df = get_store(store_path).load(dataset)
+    return apply_schema(df) if df is not None else None
+
+
+def load_dataset_cached(dataset, store=None):
+    """Load a candidate store dataset with the typed schema applied, reloaded only when
+    its store version changes.
+
+    Returns:
+        pd.DataFrame: The dataset indexed by record id, or None if it does not exist
+    """
+    store = store or get_store()
+    version = store.version(dataset)
+    if version is None:
+        return None
+    return _load_dataset(store.path, dataset, version)
+
+
+def snapshot_source(change_log, dataset, snapshot_file):
+    """Return the key a candidate store records for the snapshot it holds"""
+    return json.dumps(snapshot_version(change_log, dataset, snapshot_file))
+
+
+def load_synced_dataset(dataset, snapshot_file, store=None, change_log=None):
+    """Load a candidate store dataset, importing snapshot_file into it first unless the
+    store already holds that snapshot with every change logged against it.
+
+    Screens that write CSV snapshots never touch the store, so this keeps the store and
+    the latest snapshot the same data; writers of the store record the snapshot they
+    wrote with it (CandidateStore.set_source).
+
+    Returns:
+        tuple: (the dataset indexed by record id, whether it was imported)
+    """
+    store = store or get_store()
+    change_log = change_log or get_change_log()
+    source = snapshot_source(change_log, dataset, snapshot_file)
+    if store.source(dataset) == source:
+        df = load_dataset_cached(dataset, store)
+        if df is not None:
+            return df, False
+    df = load_snapshot_cached(change_log, dataset, snapshot_file)
+    return store.save(dataset, df, source=source), True
@@ -0,0 +1,77 @@
+import pandas as pd
+
+# (signature regex, formats) pairs for the date layouts seen in Calendly exports. Each
+# row is matched against the signatures once and every group is read with a single
+# format: the first one parsing all of its rows, so a column holding a day above 12
+# is read day-first throughout rather than partly month-first.
+DATE_SIGNATURES = [
+    (r'^\d{4}-\d{1,2}-\d{1,2} \d{1,2}:\d{2} ?[AaPp][Mm]$', ['%Y-%m-%d %I:%M %p']),
+    (r'^\d{4}-\d{1,2}-\d{1,2} \d{1,2}:\d{2}:\d{2}$', ['%Y-%m-%d %H:%M:%S']),
+    (r'^\d{4}-\d{1,2}-\d{1,2} \d{1,2}:\d{2}$', ['%Y-%m-%d %H:%M']),
+    (r'^\d{4}-\d{1,2}-\d{1,2}$', ['%Y-%m-%d']),
+    (r'^\d{1,2}/\d{1,2}/\d{4} \d{1,2}:\d{2}$', ['%m/%d/%Y %H:%M', '%d/%m/%Y %H:%M']),
+    (r'^\d{1,2}/\d{1,2}/\d{2} \d{1,2}:\d{2}$', ['%m/%d/%y %H:%M', '%d/%m/%y %H:%M']),
+    (r'^\d{1,2}/\d{1,2}/\d{4}$', ['%m/%d/%Y', '%d/%m/%Y']),
+    (r'^[A-Za-z]{3} \d{1,2}, \d{4}$', ['%b %d, %Y']),
+    (r'^[A-Za-z]{4,} \d{1,2}, \d{4}$', ['%B %d, %Y']),
+]
+
+
+def parse_dates(values):
+    """Parse a column of dates written in mixed formats in one pass per format.
+
+    Every value is classified once by the regex signatures in DATE_SIGNATURES, then each
+    group is parsed with vectorized pd.to_datetime calls and read with one format: the
+    first that parses every row of the group, else the one parsing the most rows.
+    Values matching no signature fall back to pandas' per-value parser.
+
+    Parameters:
+        values (pd.Series): Date strings (datetimes are returned unchanged)
+
+    Returns:
+        pd.Series: datetime64 values aligned with values; NaT where unparseable
+    """
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return values
+
+    text = values.astype(object).where(values.notna()).astype('string').str.strip()
+    parsed = pd.Series(pd.NaT, index=values.index, dtype='datetime64[ns]')
+    pending = text.notna() & text.ne('')
+
+    for pattern, formats in DATE_SIGNATURES:
+        group = pending & text.str.match(pattern).fillna(False)
+        if not group.any():
+            continue
+        pending &= ~group
+        best = None
+        for date_format in formats:
+            result = pd.to_datetime(text[group], format=date_format, errors='coerce')
+            if best is None or result.notna().sum() > best.notna().sum():
+                best = result
+            if best.notna().all():
+                break
+        parsed[group] = best
+
+    if pending.any():
+        parsed[pending] = pd.to_datetime(text[pending], format='mixed', errors='coerce')
+    return parsed
+
+
+def parse_date_column(df, column):
+    """Replace df[column] with parsed dates, reporting rows that could not be parsed.
+
+    The column is left untouched when no value at all can be parsed.
+
+    Returns:
+        bool: True if the column was converted
+    """
+    parsed = parse_dates(df[column])
+    if parsed.notna().sum() == 0:
+        print(f"  Warning: Could not parse any value of '{column}'")
+        return False
+    unparsed = int((parsed.isna() & df[column].notna()).sum())
+    if unparsed:
+        print(f"  Warning: {unparsed} values of '{column}' could not be parsed")
+    df[column] = parsed
+    print(f"  Parsed '{column}' dates")
+    return True
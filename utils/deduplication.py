@@ -1,8 +1,12 @@
 
 import pandas as pd
 
-def create_deduplication_identifiers(df):
-    """Create name+email and name+phone identifiers for deduplication"""
+def create_deduplication_identifiers(df, identity_index=None):
+    """Create name+email and name+phone identifiers for deduplication.
+
+    When an IdentityIndex is given, rows are instead tagged with their stable
+    'candidate_id', which also links them to candidates seen in earlier uploads.
+    """
     identifiers = []
     
     # Check if required columns exist
@@ -12,6 +16,10 @@ def create_deduplication_identifiers(df):
     
     if not has_name:
         return []
+
+    if identity_index is not None:
+        df['candidate_id'] = identity_index.assign_ids(df)
+        return ['candidate_id']
         
     # Create identifier based on name+email
     if has_name and has_email:
@@ -27,12 +35,12 @@ def create_deduplication_identifiers(df):
         
     return identifiers
 
-def remove_duplicates_from_dataframe(df):
+def remove_duplicates_from_dataframe(df, identity_index=None):
     """Remove duplicates from a dataframe using name+email and name+phone identifiers"""
     original_count = len(df)
     
     # Create identifiers
-    identifiers = create_deduplication_identifiers(df)
+    identifiers = create_deduplication_identifiers(df, identity_index)
     
     if not identifiers:
         return df, 0
@@ -48,25 +56,35 @@ def remove_duplicates_from_dataframe(df):
     removed_count = original_count - len(df)
     return df, removed_count
 
-def find_duplicates_by_criteria(df, name, email=None, phone=None, position=None):
-    """Find potential duplicate records based on name, email, or phone"""
+def find_duplicates_by_criteria(df, name, email=None, phone=None, position=None,
+                                search_index=None):
+    """Find potential duplicate records based on name, email, or phone
+
+    When a utils.search_index.CandidateSearchIndex of df is given, the name, email and
+    phone conditions are answered from it instead of scanning every row.
+    """
     # Create query conditions
     conditions = []
 
-    # Always search by name (case-insensitive partial match)
-    if name:
-        conditions.append(df['name'].str.contains(name, case=False, na=False))
+    if search_index is not None:
+        for column, term in [('name', name), ('email', email), ('phone', phone)]:
+            if term and column in df.columns:
+                conditions.append(df.index.isin(search_index.search(column, term)))
+    else:
+        # Always search by name (case-insensitive partial match)
+        if name:
+            conditions.append(df['name'].str.contains(name, case=False, na=False))
 
-    # Add email condition if provided
-    if email and 'email' in df.columns:
-        conditions.append(df['email'].str.contains(email, case=False, na=False))
+        # Add email condition if provided
+        if email and 'email' in df.columns:
+            conditions.append(df['email'].str.contains(email, case=False, na=False))
 
-    # Add phone condition if provided
-    if phone and 'phone' in df.columns:
-        conditions.append(df['phone'].astype(str).str.contains(phone, na=False))
+        # Add phone condition if provided
+        if phone and 'phone' in df.columns:
+            conditions.append(df['phone'].astype(str).str.contains(phone, na=False))
 
     # Add position if provided
-    if 'position' in df.columns:
+    if position and 'position' in df.columns:
         conditions.append(df['position'].str.contains(position, case=False, na=False))
 
     # Combine conditions with AND logic for more precise matching
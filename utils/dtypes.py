@@ -0,0 +1,90 @@
+import numpy as np
+import pandas as pd
+
+from utils.candidate_schema import CATEGORY_COLUMNS, IDENTIFIER_COLUMNS
+
+try:
+    import pyarrow  # noqa: F401
+    STRING_STORAGE = 'pyarrow'
+except ImportError:
+    STRING_STORAGE = 'python'
+
+
+def _identifier_dtype():
+    try:
+        return pd.StringDtype(STRING_STORAGE, na_value=np.nan)
+    except TypeError:
+        # pandas < 2.3 only offers NaN as the missing value of pyarrow-backed strings
+        return pd.StringDtype('pyarrow_numpy') if STRING_STORAGE == 'pyarrow' else None
+
+
+# Identifier columns are held as strings (pyarrow-backed when available); NaN stays
+# the missing value so existing pd.isna / == '' checks keep working. None (pandas < 2.3
+# without pyarrow) leaves them as object columns.
+IDENTIFIER_DTYPE = _identifier_dtype()
+
+# A column only becomes categorical when its distinct values are at most this share
+# of its rows; above that the category table would cost more than it saves
+MAX_CATEGORY_RATIO = 0.5
+
+
+def _is_text(values):
+    return values.dtype == object or pd.api.types.is_string_dtype(values.dtype)
+
+
+def apply_schema(df, report=True):
+    """Convert the low-cardinality candidate columns of df to categoricals and its
+    identifier columns to strings.
+
+    Only text columns are converted, so numeric values (e.g. phone numbers read as
+    floats) are never reformatted.
+
+    Parameters:
+        df (pd.DataFrame): Candidate records
+        report (bool): Print the memory used before and after the conversion
+
+    Returns:
+        pd.DataFrame: A typed copy of df
+    """
+    before = memory_usage(df) if report else 0
+    converted = {}
+    for column in CATEGORY_COLUMNS:
+        if column in df.columns and _is_text(df[column]):
+            values = df[column]
+            if values.nunique() <= MAX_CATEGORY_RATIO * max(len(values), 1):
+                converted[column] = values.astype('category')
+    for column in IDENTIFIER_COLUMNS:
+        if IDENTIFIER_DTYPE is not None and column in df.columns and _is_text(df[column]) and df[column].dtype != IDENTIFIER_DTYPE:
+            converted[column] = df[column].astype(IDENTIFIER_DTYPE)
+    df = df.assign(**converted) if converted else df.copy()
+
+    if report:
+        after = memory_usage(df)
+        print(f"Typed schema: {before / 1e6:.1f} MB -> {after / 1e6:.1f} MB "
+              f"(saved {(before - after) / 1e6:.1f} MB)")
+    return df
+
+
+def memory_usage(df):
+    """Return the deep memory usage of df in bytes"""
+    return int(df.memory_usage(deep=True).sum())
+
+
+def add_categories(df, column, values):
+    """Add the values missing from the categories of df[column], when it is
+    categorical, so they can be assigned to it (a plain .loc assignment would raise)"""
+    if column not in df.columns or not isinstance(df[column].dtype, pd.CategoricalDtype):
+        return
+    categories = df[column].cat.categories
+    missing = [value for value in pd.unique(pd.Series(values, dtype=object).dropna())
+               if value not in categories]
+    if missing:
+        df[column] = df[column].cat.add_categories(missing)
+
+
+def set_fields(df, index, fields):
+    """Assign {column: value} to the rows at index, adding a value missing from a
+    categorical column's categories first"""
+    for column, value in fields.items():
+        add_categories(df, column, [value])
+        df.loc[index, column] = value
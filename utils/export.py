@@ -0,0 +1,186 @@
+import hashlib
+import os
+import tempfile
+import threading
+import zipfile
+from collections import OrderedDict
+
+import pandas as pd
+import streamlit as st
+from openpyxl import Workbook
+
+# Download formats offered by download_section
+EXPORT_FORMATS = {
+    'xlsx': {
+        'label': 'Excel (.xlsx)',
+        'mime': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+    },
+    'csv': {'label': 'CSV', 'mime': 'text/csv'},
+    'csv.gz': {'label': 'CSV, gzip compressed', 'mime': 'application/gzip'},
+}
+
+# Exported files kept on disk, one per (data version, format); the least recently used
+# is deleted first
+MAX_ARTIFACTS = 8
+
+# ZIP archives of selected files kept on disk, one per (directory, files, mtimes and
+# sizes); the least recently used is deleted first
+MAX_ARCHIVES = 4
+
+# Files in these formats are already compressed and are stored in archives as they are
+COMPRESSED_EXTENSIONS = {'.zip', '.gz', '.bz2', '.xz', '.7z', '.xlsx', '.parquet',
+                         '.png', '.jpg', '.jpeg', '.pdf'}
+
+_artifacts = OrderedDict()
+_export_dir = None
+_export_lock = threading.Lock()
+_archives = OrderedDict()
+_archive_lock = threading.Lock()
+
+
+def frame_version(df):
+    """Return a hash of df's columns, dtypes and values, used as its data version"""
+    digest = hashlib.sha1()
+    digest.update(repr([(str(col), str(dtype)) for col, dtype in df.dtypes.items()]).encode('utf-8'))
+    digest.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def write_xlsx(df, path):
+    """Write df to an Excel file with openpyxl's write-only workbook, which streams
+    rows to disk instead of holding a cell object for every value in memory"""
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet()
+    sheet.append([str(col) for col in df.columns])
+    values = df.astype(object).where(df.notna(), None)
+    for row in values.itertuples(index=False, name=None):
+        sheet.append(row)
+    workbook.save(path)
+
+
+def write_export(df, path, fmt):
+    """Write df to path in one of EXPORT_FORMATS"""
+    if fmt == 'xlsx':
+        write_xlsx(df, path)
+    elif fmt == 'csv':
+        df.to_csv(path, index=False)
+    elif fmt == 'csv.gz':
+        df.to_csv(path, index=False, compression='gzip')
+    else:
+        raise ValueError(f"Unknown export format: {fmt}")
+
+
+def get_export(df, fmt, version=None):
+    """Return the path of df exported as fmt, writing it only once per data version.
+
+    Parameters:
+        df (pd.DataFrame): Records to export
+        fmt (str): A key of EXPORT_FORMATS
+        version (hashable): Identifies the data in df (e.g. a file signature or store
+            version); defaults to a hash of df's contents
+
+    Returns:
+        str: Path of the exported file
+    """
+    global _export_dir
+    if version is None:
+        version = frame_version(df)
+    key = (version, fmt)
+    with _export_lock:
+        path = _artifacts.get(key)
+        if path is None or not os.path.exists(path):
+            if _export_dir is None:
+                _export_dir = tempfile.mkdtemp(prefix='candidate_exports_')
+            name = hashlib.sha1(repr(key).encode('utf-8')).hexdigest()[:16]
+            path = os.path.join(_export_dir, f"{name}.{fmt}")
+            write_export(df, path, fmt)
+            _artifacts[key] = path
+            while len(_artifacts) > MAX_ARTIFACTS:
+                _, old_path = _artifacts.popitem(last=False)
+                if os.path.exists(old_path):
+                    os.remove(old_path)
+        _artifacts.move_to_end(key)
+        return path
+
+
+def download_section(df, file_name, key, label="Download Current Data", version=None):
+    """Offer df for download as Excel, CSV or gzip-compressed CSV.
+
+    Nothing is exported until the user asks for a file; the exported file is then
+    reused for as long as the data is unchanged. Only the export itself is streamed
+    to disk: st.download_button reads the file it is given into Streamlit's in-memory
+    media store, where it stays for the session.
+
+    Parameters:
+        df (pd.DataFrame): Records to export
+        file_name (str): Download file name without extension
+        key (str): Prefix of the widget keys, unique on the page
+        label (str): Text of the button preparing the download
+        version (hashable): Data version passed to get_export
+    """
+    fmt = st.selectbox(f"{label} as", list(EXPORT_FORMATS),
+                       format_func=lambda f: EXPORT_FORMATS[f]['label'],
+                       key=f"{key}_format")
+    if st.button(label, key=f"{key}_prepare"):
+        with st.spinner(f"Exporting {len(df)} records..."):
+            path = get_export(df, fmt, version)
+        with open(path, 'rb') as f:
+            st.download_button(
+                label=f"Save {file_name}.{fmt}",
+                data=f,
+                file_name=f"{file_name}.{fmt}",
+                mime=EXPORT_FORMATS[fmt]['mime'],
+                key=f"{key}_download")
+
+
+def _archive_key(dir_path, files):
+    signature = []
+    for file in sorted(files):
+        stat = os.stat(os.path.join(dir_path, file))
+        signature.append((file, stat.st_mtime_ns, stat.st_size))
+    return os.path.abspath(dir_path), tuple(signature)
+
+
+def build_archive(dir_path, files):
+    """Return the path of a ZIP archive of files in dir_path, building it only once
+    per set of files and their modification times and sizes.
+
+    The archive is written straight to a temporary file, so building it does not
+    hold it in memory. Already-compressed files are stored rather than compressed
+    again.
+    """
+    key = _archive_key(dir_path, files)
+    with _archive_lock:
+        path = _archives.get(key)
+        if path is None or not os.path.exists(path):
+            handle, path = tempfile.mkstemp(prefix='candidate_archive_', suffix='.zip')
+            with os.fdopen(handle, 'wb') as archive, zipfile.ZipFile(archive, 'w') as zip_file:
+                for file in files:
+                    extension = os.path.splitext(file)[1].lower()
+                    compression = (zipfile.ZIP_STORED if extension in COMPRESSED_EXTENSIONS
+                                   else zipfile.ZIP_DEFLATED)
+                    zip_file.write(os.path.join(dir_path, file), arcname=file,
+                                   compress_type=compression)
+            _archives[key] = path
+            while len(_archives) > MAX_ARCHIVES:
+                _, old_path = _archives.popitem(last=False)
+                if os.path.exists(old_path):
+                    os.remove(old_path)
+        _archives.move_to_end(key)
+        return path
+
+
+def download_archive_section(dir_path, files, file_name, key, label):
+    """Offer files of dir_path for download as one ZIP archive, built only when the
+    user asks for it (see build_archive). st.download_button still reads the archive
+    into Streamlit's in-memory media store for the session."""
+    if st.button(label, key=f"{key}_prepare"):
+        with st.spinner(f"Archiving {len(files)} files..."):
+            path = build_archive(dir_path, files)
+        with open(path, 'rb') as f:
+            st.download_button(
+                label=f"Save {file_name}",
+                data=f,
+                file_name=file_name,
+                mime="application/zip",
+                key=key)
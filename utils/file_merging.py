@@ -1,7 +1,7 @@
 
 import os
 import pandas as pd
-from main import identify_source_type, process_columns, define_column_tags, read_file
+from main import identify_source_type, process_columns, define_column_tags, read_file, SOURCE_COLUMNS, SOURCE_DTYPES
 
 def find_files_by_type(directory='uploads'):
     """Find all data files in the uploads directory by type"""
@@ -54,7 +54,8 @@ def preprocess_file(file_path, source_type):
     keep_first_row = is_naukri
     
     # Read the file with appropriate settings
-    df = read_file(file_path, keep_first_row=keep_first_row, is_naukri=is_naukri, is_linkedin=is_linkedin)
+    df = read_file(file_path, keep_first_row=keep_first_row, is_naukri=is_naukri, is_linkedin=is_linkedin,
+                   usecols=SOURCE_COLUMNS.get(source_type), dtype=SOURCE_DTYPES.get(source_type))
     
     if df is None:
         print(f"Error: Failed to read {os.path.basename(file_path)}")
@@ -0,0 +1,180 @@
+import itertools
+import re
+from difflib import SequenceMatcher
+
+import pandas as pd
+
+from utils.clustering import PLACEHOLDER_VALUES, MIN_PHONE_DIGITS
+
+# Number of trailing phone digits used as a block; ignores country code differences
+PHONE_SUFFIX_DIGITS = 7
+
+# Country codes removed before two phones are compared, with the length of a full number
+# carrying them (US and India, as in utils.standardization.standardize_phones)
+COUNTRY_PREFIXES = {'1': 11, '91': 12}
+
+# Name q-gram length for the q-gram signature
+QGRAM_SIZE = 3
+
+# Blocks larger than this are skipped (and reported) so no block ever degrades to
+# a full pairwise comparison
+MAX_BLOCK_SIZE = 200
+
+# Field weights used to score a pair; fields missing on either side are ignored
+FIELD_WEIGHTS = {'name': 0.5, 'email': 0.25, 'phone': 0.25}
+
+SOUNDEX_CODES = {
+    **dict.fromkeys('bfpv', '1'), **dict.fromkeys('cgjkqsxz', '2'),
+    **dict.fromkeys('dt', '3'), 'l': '4', **dict.fromkeys('mn', '5'), 'r': '6'
+}
+
+
+def soundex(word):
+    """Return the 4-character Soundex code of a word, e.g. 'Jon' and 'John' -> 'J500'"""
+    word = re.sub(r'[^a-z]', '', str(word).lower())
+    if not word:
+        return ''
+    code = word[0].upper()
+    previous = SOUNDEX_CODES.get(word[0], '')
+    for char in word[1:]:
+        digit = SOUNDEX_CODES.get(char, '')
+        if digit and digit != previous:
+            code += digit
+        if char not in 'hw':
+            previous = digit
+    return (code + '000')[:4]
+
+
+def _clean(values):
+    """Lowercase and strip values, turning placeholders into None"""
+    values = values.astype(str).str.lower().str.strip()
+    return values.astype(object).where(~values.isin(PLACEHOLDER_VALUES) & values.notna())
+
+
+def national_digits(digits):
+    """Strip a recognised country code from phone digits, e.g. '15551234567' ->
+    '5551234567'; other numbers are returned whole"""
+    national = digits
+    for prefix, length in COUNTRY_PREFIXES.items():
+        has_prefix = (digits.str.len() == length) & digits.str.startswith(prefix)
+        national = national.where(~has_prefix, digits.str[len(prefix):])
+    return national
+
+
+def build_blocking_keys(df):
+    """Compute the blocking signatures of every row.
+
+    - phone: last PHONE_SUFFIX_DIGITS digits of the phone
+    - email_local: local part of the email address
+    - name_sound: Soundex of the first and last name tokens
+    - name_qgram: leading q-gram of the first and last name tokens
+
+    Returns:
+        pd.DataFrame: One column per signature, aligned with df; null where unavailable
+    """
+    name = _clean(df['name']) if 'name' in df.columns else pd.Series(None, index=df.index)
+    email = _clean(df['email']) if 'email' in df.columns else pd.Series(None, index=df.index)
+    phone = (df['phone'].astype(str).str.replace(r'\D', '', regex=True)
+             if 'phone' in df.columns else pd.Series('', index=df.index))
+
+    tokens = name.str.replace(r'[^a-z ]', '', regex=True).str.split()
+    first = tokens.str[0]
+    last = tokens.str[-1]
+
+    blocks = pd.DataFrame(index=df.index)
+    blocks['phone'] = phone.str[-PHONE_SUFFIX_DIGITS:].where(
+        phone.str.len() >= MIN_PHONE_DIGITS)
+    blocks['email_local'] = email.str.split('@').str[0].where(email.str.contains('@', na=False))
+    blocks['name_sound'] = (first.map(soundex, na_action='ignore') + '_' +
+                            last.map(soundex, na_action='ignore'))
+    blocks['name_qgram'] = (first.str[:QGRAM_SIZE] + '_' + last.str[:QGRAM_SIZE])
+    return blocks
+
+
+def candidate_pairs(blocks, max_block_size=MAX_BLOCK_SIZE):
+    """Return the unique (i, j) row position pairs that share at least one block"""
+    pairs = set()
+    skipped = {}
+    for column in blocks.columns:
+        codes, _ = pd.factorize(blocks[column])
+        groups = pd.Series(range(len(codes)))[codes >= 0].groupby(codes[codes >= 0])
+        for _, members in groups:
+            if len(members) < 2:
+                continue
+            if len(members) > max_block_size:
+                skipped[column] = skipped.get(column, 0) + 1
+                continue
+            pairs.update(itertools.combinations(members.tolist(), 2))
+    if skipped:
+        print(f"Skipped oversized blocks (> {max_block_size} rows): {skipped}")
+    return sorted(pairs)
+
+
+def _similarity(a, b):
+    if pd.isna(a) or pd.isna(b):
+        return None
+    return SequenceMatcher(None, a, b).ratio()
+
+
+def score_pair(row_a, row_b):
+    """Score two rows between 0 and 1 using the weighted field similarities"""
+    scores = {
+        'name': _similarity(row_a['name'], row_b['name']),
+        'email': _similarity(row_a['email'], row_b['email']),
+        'phone': (None if pd.isna(row_a['phone']) or pd.isna(row_b['phone'])
+                  else float(row_a['phone'] == row_b['phone'])),
+    }
+    total = sum(FIELD_WEIGHTS[f] for f, s in scores.items() if s is not None)
+    if not total:
+        return 0.0
+    return sum(FIELD_WEIGHTS[f] * s for f, s in scores.items() if s is not None) / total
+
+
+def find_fuzzy_duplicates(df, threshold=0.85, max_block_size=MAX_BLOCK_SIZE):
+    """Find likely duplicate candidates that exact keys miss, e.g. 'Jon Smith' and
+    'John Smith' with the same phone.
+
+    Rows are only compared inside blocks sharing a phone suffix, email local part or
+    name signature, so the number of comparisons is bounded by the block sizes rather
+    than by the square of the row count.
+
+    Parameters:
+        df (pd.DataFrame): Frame with 'name', 'email' and/or 'phone' columns
+        threshold (float): Minimum score (0-1) for a pair to be reported
+        max_block_size (int): Blocks with more rows than this are skipped
+
+    Returns:
+        pd.DataFrame: Candidate pairs for review with index_a, index_b, name_a, name_b,
+            score and the blocks they matched on, sorted by descending score
+    """
+    columns = ['index_a', 'index_b', 'name_a', 'name_b', 'score', 'matched_on']
+    blocks = build_blocking_keys(df)
+    pairs = candidate_pairs(blocks, max_block_size)
+    if not pairs:
+        return pd.DataFrame(columns=columns)
+
+    # Phones are compared on all their digits, so numbers that only share the block
+    # suffix (another area or country code) do not count as a match
+    phone = (national_digits(df['phone'].astype(str).str.replace(r'\D', '', regex=True))
+             if 'phone' in df.columns else pd.Series('', index=df.index))
+    fields = pd.DataFrame({
+        'name': (_clean(df['name']) if 'name' in df.columns else None),
+        'email': (_clean(df['email']) if 'email' in df.columns else None),
+        'phone': phone.where(phone.str.len() >= MIN_PHONE_DIGITS),
+    }, index=df.index).reset_index(drop=True)
+    records = fields.to_dict('records')
+    block_values = blocks.reset_index(drop=True).to_dict('records')
+
+    results = []
+    for i, j in pairs:
+        score = score_pair(records[i], records[j])
+        if score < threshold:
+            continue
+        matched_on = [col for col in blocks.columns
+                      if pd.notna(block_values[i][col])
+                      and block_values[i][col] == block_values[j][col]]
+        results.append((df.index[i], df.index[j], records[i]['name'],
+                        records[j]['name'], round(score, 3), ','.join(matched_on)))
+
+    return (pd.DataFrame(results, columns=columns)
+            .sort_values('score', ascending=False, ignore_index=True))
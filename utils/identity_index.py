@@ -0,0 +1,149 @@
+import os
+import sqlite3
+
+import numpy as np
+import pandas as pd
+
+from utils.clustering import MATCH_KEYS, DisjointSet, add_match_keys, cluster_by_keys
+
+# Stored key type for each matching key built by add_match_keys
+KEY_TYPES = {'key1': 'name_email', 'key2': 'name_phone', 'key3': 'email_phone'}
+
+# Key type of rows without any valid matching key: their normalized name, email and
+# phone plus their occurrence number among identical rows of the batch, so the same
+# row keeps its ID across runs without being merged with other rows
+ROW_KEY_TYPE = 'row'
+
+
+class IdentityIndex:
+    """On-disk index mapping normalized name+email, name+phone and email+phone keys
+    (and, for rows with none of them, the row's own contact values) to stable
+    candidate IDs.
+
+    Assigning IDs to a batch only looks up and inserts that batch's own keys, so the
+    cost of an upload scales with the batch size rather than with the database size.
+    """
+
+    def __init__(self, path):
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript('''
+            CREATE TABLE IF NOT EXISTS identity_keys (
+                key_type TEXT NOT NULL,
+                key TEXT NOT NULL,
+                candidate_id INTEGER NOT NULL,
+                PRIMARY KEY (key_type, key)
+            );
+            CREATE INDEX IF NOT EXISTS idx_identity_candidate
+                ON identity_keys (candidate_id);
+            CREATE TABLE IF NOT EXISTS id_sequence (next_id INTEGER NOT NULL);
+            INSERT INTO id_sequence (next_id)
+                SELECT 1 WHERE NOT EXISTS (SELECT 1 FROM id_sequence);
+        ''')
+
+    def close(self):
+        self.conn.close()
+
+    def _batch_keys(self, df):
+        """Return one row per distinct (key_type, key) in df with its batch cluster"""
+        keyed = pd.DataFrame({
+            col: (df[col].to_numpy() if col in df.columns else None)
+            for col in ['name', 'email', 'phone']
+        })
+        add_match_keys(keyed)
+        clusters = cluster_by_keys(keyed, MATCH_KEYS)
+
+        frames = []
+        for key in MATCH_KEYS:
+            frames.append(pd.DataFrame({
+                'cluster': clusters,
+                'key_type': KEY_TYPES[key],
+                'key': keyed[key].to_numpy()
+            }))
+
+        keyless = keyed[MATCH_KEYS].isna().all(axis=1).to_numpy()
+        if keyless.any():
+            parts = keyed.loc[keyless, ['name_norm', 'email_norm', 'phone_norm']].astype(object)
+            content = parts.fillna('').astype(str).agg('|'.join, axis=1)
+            occurrence = content.groupby(content).cumcount().astype(str)
+            frames.append(pd.DataFrame({
+                'cluster': clusters[keyless],
+                'key_type': ROW_KEY_TYPE,
+                'key': (content + '#' + occurrence).to_numpy()
+            }))
+        keys = pd.concat(frames, ignore_index=True).dropna(subset=['key'])
+        return clusters, keys.drop_duplicates(['key_type', 'key'])
+
+    def lookup(self, keys):
+        """Return the stored candidate_id of every (key_type, key) pair that exists"""
+        cur = self.conn.cursor()
+        cur.execute('CREATE TEMP TABLE IF NOT EXISTS batch_keys '
+                    '(key_type TEXT, key TEXT)')
+        cur.execute('DELETE FROM batch_keys')
+        cur.executemany('INSERT INTO batch_keys VALUES (?, ?)',
+                        keys[['key_type', 'key']].itertuples(index=False))
+        rows = cur.execute('''
+            SELECT b.key_type, b.key, i.candidate_id
+            FROM batch_keys b
+            JOIN identity_keys i ON i.key_type = b.key_type AND i.key = b.key
+        ''').fetchall()
+        return pd.DataFrame(rows, columns=['key_type', 'key', 'candidate_id'])
+
+    def assign_ids(self, df):
+        """Assign a stable candidate ID to every row of df and record its keys.
+
+        Rows that share a key with each other or with a stored key get the same ID.
+        When a batch links candidates that were previously separate, they are merged
+        into the lowest existing ID.
+
+        Parameters:
+            df (pd.DataFrame): Frame with 'name', 'email' and/or 'phone' columns
+
+        Returns:
+            pd.Series: Candidate IDs aligned with df.index
+        """
+        clusters, keys = self._batch_keys(df)
+        n_clusters = int(clusters.max()) + 1 if len(clusters) else 0
+
+        hits = keys.merge(self.lookup(keys), on=['key_type', 'key'])
+        hits = hits[['cluster', 'candidate_id']].drop_duplicates()
+        existing_ids = np.sort(hits['candidate_id'].unique())
+
+        # Batch clusters and stored IDs are nodes of one disjoint set, so two clusters
+        # that reach the same stored ID (or one cluster reaching two IDs) are joined.
+        ds = DisjointSet(n_clusters + len(existing_ids))
+        id_nodes = n_clusters + np.searchsorted(existing_ids, hits['candidate_id'])
+        for cluster, node in zip(hits['cluster'].tolist(), id_nodes.tolist()):
+            ds.union(cluster, node)
+        roots = ds.roots()
+
+        # Each component keeps its lowest stored ID, or gets a fresh one
+        cur = self.conn.cursor()
+        next_id = cur.execute('SELECT next_id FROM id_sequence').fetchone()[0]
+        id_roots = pd.Series(existing_ids, index=roots[n_clusters:])
+        component_ids = id_roots.groupby(level=0).min().to_dict()
+        for root in pd.unique(roots[:n_clusters]):
+            if root not in component_ids:
+                component_ids[root] = next_id
+                next_id += 1
+
+        remaps = [(int(component_ids[root]), int(old_id))
+                  for root, old_id in id_roots.items()
+                  if component_ids[root] != old_id]
+        keys = keys.assign(candidate_id=[
+            int(component_ids[root]) for root in roots[keys['cluster'].to_numpy()]
+        ])
+
+        with self.conn:
+            cur.execute('UPDATE id_sequence SET next_id = ?', (next_id,))
+            cur.executemany('UPDATE identity_keys SET candidate_id = ? '
+                            'WHERE candidate_id = ?', remaps)
+            cur.executemany(
+                'INSERT OR REPLACE INTO identity_keys VALUES (?, ?, ?)',
+                keys[['key_type', 'key', 'candidate_id']].itertuples(index=False))
+
+        row_ids = [int(component_ids[root]) for root in roots[clusters]]
+        return pd.Series(row_ids, index=df.index, name='candidate_id')
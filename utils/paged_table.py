@@ -0,0 +1,126 @@
+import pandas as pd
+import streamlit as st
+
+from utils.export import download_section
+
+# Streamlit sends every row given to st.dataframe to the browser. show_table filters,
+# sorts and slices the frame on the server instead, so a rerun only sends the rows of
+# the page being looked at.
+
+# Rows per page offered by show_table; the first is the default
+PAGE_SIZES = [50, 100, 250, 500]
+
+# Columns with at most this many distinct values are filtered by picking values;
+# other columns are filtered by the text they contain
+MAX_FILTER_OPTIONS = 100
+
+
+def filter_frame(df, filters):
+    """Keep the rows of df matching every filter.
+
+    Parameters:
+        df (pd.DataFrame): Records to filter
+        filters (dict): {column: values} keeping rows whose value is one of values
+            (a list), or {column: text} keeping rows whose value contains text
+            (ignoring case). Empty filters are skipped.
+
+    Returns:
+        pd.DataFrame: The matching rows (df itself when no filter applies)
+    """
+    mask = None
+    for column, value in filters.items():
+        if column not in df.columns or value is None or len(value) == 0:
+            continue
+        if isinstance(value, str):
+            condition = df[column].astype(str).str.contains(value, case=False,
+                                                            regex=False, na=False)
+        else:
+            condition = df[column].isin(value)
+        mask = condition if mask is None else mask & condition
+    return df if mask is None else df[mask]
+
+
+def sort_frame(df, column, ascending=True):
+    """Sort df by column, missing values last; mixed-type columns sort as text"""
+    if column not in df.columns:
+        return df
+    try:
+        return df.sort_values(column, ascending=ascending, kind='stable', na_position='last')
+    except TypeError:
+        return df.sort_values(column, ascending=ascending, kind='stable', na_position='last',
+                              key=lambda values: values.astype(str))
+
+
+def page_count(total, page_size):
+    """Return the number of pages needed for total rows (at least 1)"""
+    return max(1, -(-total // page_size))
+
+
+def get_window(df, page, page_size):
+    """Return the rows of df on a 1-based page"""
+    start = (page - 1) * page_size
+    return df.iloc[start:start + page_size]
+
+
+def _filter_widget(df, column, key):
+    values = df[column]
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        options = values.cat.categories
+    else:
+        options = values.dropna().unique()
+    if len(options) <= MAX_FILTER_OPTIONS:
+        return st.multiselect(f"{column} is one of", list(options), key=f"{key}_filter_{column}")
+    return st.text_input(f"{column} contains", key=f"{key}_filter_{column}")
+
+
+def show_table(df, key, page_sizes=PAGE_SIZES):
+    """Display df as a paginated table with sort and column filters.
+
+    Filtering, sorting and slicing happen on the server and only the current page
+    is sent to the browser, together with the row counts. The rows matching the
+    filters can be downloaded through utils.export, which only builds the file on
+    request.
+
+    Parameters:
+        df (pd.DataFrame): Records to display
+        key (str): Prefix of the widget keys, unique among the tables of a page
+        page_sizes (list): Rows per page to choose from
+    """
+    columns = list(df.columns)
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        page_size = st.selectbox("Rows per page", page_sizes, key=f"{key}_page_size")
+    with col2:
+        sort_column = st.selectbox("Sort by", ['(original order)'] + columns,
+                                   key=f"{key}_sort")
+    with col3:
+        descending = st.checkbox("Descending", key=f"{key}_descending")
+
+    filter_columns = st.multiselect("Filter columns", columns, key=f"{key}_filter_columns")
+    filters = {column: _filter_widget(df, column, key) for column in filter_columns}
+
+    view = filter_frame(df, filters)
+    if sort_column in df.columns:
+        view = sort_frame(view, sort_column, ascending=not descending)
+
+    pages = page_count(len(view), page_size)
+    page_key = f"{key}_page"
+    # Keep the selected page in range after the filters or page size change
+    if st.session_state.get(page_key, 1) > pages:
+        st.session_state[page_key] = pages
+    page = st.number_input(f"Page (of {pages})", min_value=1, max_value=pages,
+                           key=page_key) if pages > 1 else 1
+
+    window = get_window(view, page, page_size)
+    st.dataframe(window, use_container_width=True)
+
+    start = (page - 1) * page_size
+    caption = (f"Showing rows {start + 1 if len(window) else 0}-{start + len(window)} "
+               f"of {len(view)}")
+    if len(view) != len(df):
+        caption += f" (filtered from {len(df)})"
+    st.caption(caption)
+
+    if len(view):
+        download_section(view, file_name=key, key=f"{key}_export",
+                         label=f"Download all {len(view)} rows")
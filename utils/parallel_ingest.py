@@ -0,0 +1,83 @@
+import os
+import threading
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import pandas as pd
+
+MAX_WORKERS = os.cpu_count() or 1
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    """Return the process pool shared by all sources, starting it on first use"""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(max_workers=MAX_WORKERS)
+        return _executor
+
+
+def _discard_executor(executor):
+    """Drop a broken pool so the next get_executor starts a new one; a pool another
+    source has already replaced is left alone"""
+    global _executor
+    with _executor_lock:
+        if _executor is executor:
+            _executor = None
+    executor.shutdown(wait=False)
+
+
+def _safe_load(load_file, file_path):
+    """Run load_file in a worker, returning (frame, error) instead of raising"""
+    try:
+        return load_file(file_path), None
+    except Exception as e:
+        return None, f"{e}\n{traceback.format_exc()}"
+
+
+def ingest_files(files, load_file):
+    """Read and preprocess files concurrently in the shared process pool, then merge them.
+
+    A file that fails (or whose load_file returns None) is reported and skipped without
+    affecting the others, and the frames are merged in the order of files whatever order
+    the workers finish in.
+
+    Parameters:
+        files (list): Paths of the uploaded files
+        load_file (callable): Module-level function turning one path into a DataFrame
+
+    Returns:
+        pd.DataFrame: Rows of the files that loaded successfully, in input order; an
+            empty frame when none did
+    """
+    if len(files) <= 1:
+        results = [_safe_load(load_file, f) for f in files]
+    else:
+        executor = get_executor()
+        try:
+            futures = [executor.submit(_safe_load, load_file, f) for f in files]
+            results = [future.result() for future in futures]
+        except BrokenProcessPool as e:
+            print(f"Process pool failed ({e}); loading files one at a time")
+            _discard_executor(executor)
+            results = [_safe_load(load_file, f) for f in files]
+
+    frames = []
+    failed = []
+    for file_path, (df, error) in zip(files, results):
+        if error is None and df is None:
+            error = "no data returned"
+        if error is not None:
+            print(f"Skipping {file_path}: {error}")
+            failed.append(file_path)
+        else:
+            frames.append(df)
+    if not frames:
+        if failed:
+            print(f"None of the {len(failed)} files could be loaded: {', '.join(failed)}")
+        return pd.DataFrame()
+    return pd.concat(frames, ignore_index=True)
@@ -0,0 +1,116 @@
+import hashlib
+import json
+import os
+
+import pandas as pd
+
+try:
+    import pyarrow  # noqa: F401
+    CACHE_FORMAT = 'feather'
+except ImportError:
+    CACHE_FORMAT = 'pkl'
+
+CACHE_DIR = os.path.join('database', 'parse_cache')
+
+# Oldest unused entries are evicted once the cache grows past this size
+MAX_CACHE_BYTES = 512 * 1024 * 1024
+
+# Bump when a reader or preprocessing step changes so stale entries are not reused
+CACHE_VERSION = 2
+
+
+def file_hash(file_path, chunk_size=1024 * 1024):
+    """Return the SHA-256 hex digest of a file's content"""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def cache_key(file_path, options):
+    """Build the cache key of a file from its content hash and the reader options"""
+    options = json.dumps({'version': CACHE_VERSION, **options}, sort_keys=True)
+    options_hash = hashlib.sha256(options.encode()).hexdigest()[:16]
+    return f'{file_hash(file_path)}_{options_hash}'
+
+
+def _read(path):
+    if path.endswith('.feather'):
+        return pd.read_feather(path, memory_map=True)
+    return pd.read_pickle(path)
+
+
+def _write(df, path):
+    if path.endswith('.feather'):
+        df.reset_index(drop=True).to_feather(path)
+    else:
+        df.to_pickle(path)
+
+
+def evict(cache_dir=CACHE_DIR, max_bytes=MAX_CACHE_BYTES):
+    """Remove the least recently used entries until the cache fits in max_bytes"""
+    if not os.path.exists(cache_dir):
+        return
+    entries = []
+    for name in os.listdir(cache_dir):
+        path = os.path.join(cache_dir, name)
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:  # Evicted by another worker
+            continue
+        entries.append((stat.st_mtime, stat.st_size, path))
+
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+            print(f"Evicted parse cache entry {os.path.basename(path)}")
+        except FileNotFoundError:
+            pass
+        total -= size
+
+
+def cached_parse(file_path, options, parse, cache_dir=CACHE_DIR):
+    """Return parse(file_path), reusing the cached frame when the same file content was
+    already parsed with the same options.
+
+    Parameters:
+        file_path (str): Uploaded file
+        options (dict): Reader options that affect the result (source type, header row,
+            skiprows, ...); part of the cache key
+        parse (callable): Function reading and preprocessing the file into a DataFrame
+        cache_dir (str): Directory holding the cached frames
+
+    Returns:
+        pd.DataFrame: Parsed frame
+    """
+    key = cache_key(file_path, options)
+    for ext in ('feather', 'pkl'):
+        path = os.path.join(cache_dir, f'{key}.{ext}')
+        if os.path.exists(path):
+            try:
+                df = _read(path)
+            except Exception as e:
+                print(f"Ignoring unreadable parse cache entry {path}: {e}")
+                os.remove(path)
+                continue
+            os.utime(path)  # Mark as recently used
+            print(f"Loaded {os.path.basename(file_path)} from parse cache")
+            return df
+
+    df = parse(file_path)
+
+    os.makedirs(cache_dir, exist_ok=True)
+    path = os.path.join(cache_dir, f'{key}.{CACHE_FORMAT}')
+    try:
+        _write(df, path)
+    except Exception as e:
+        # e.g. mixed-type columns that Arrow cannot store; just parse again next time
+        print(f"Could not cache {os.path.basename(file_path)}: {e}")
+        if os.path.exists(path):
+            os.remove(path)
+    evict(cache_dir)
+    return df
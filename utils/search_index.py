@@ -0,0 +1,211 @@
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from utils.standardization import phone_digits
+
+# Sidebar "Search by" choices and the column each one searches
+SEARCH_COLUMNS = {'Name': 'name', 'Email': 'email', 'Phone': 'phone'}
+
+# Length of the substrings indexed in the n-gram postings; shorter queries scan the
+# distinct values of the column instead
+NGRAM = 3
+
+# Keys encoded at a time while building the postings
+POSTINGS_CHUNK = 10000
+
+# Matches shown per page of search results
+PAGE_SIZE = 50
+
+# Indexes kept in memory, one per data version; the least recently used is dropped first
+MAX_INDEXES = 8
+
+_indexes = OrderedDict()
+
+
+def _normalize_name(values):
+    return values.str.lower().str.split().str.join(' ')
+
+
+def _normalize_email(values):
+    return values.str.lower().str.strip()
+
+
+def _normalize_phone(values):
+    return phone_digits(values)
+
+
+# Search key of each indexed column: names are compared by their lowercased words,
+# emails lowercased and phone numbers by their digits only
+NORMALIZERS = {
+    'name': _normalize_name,
+    'email': _normalize_email,
+    'phone': _normalize_phone,
+}
+
+
+def _ngram_codes(values):
+    """Return (codes, rows): the integer code of every NGRAM-character substring of
+    values (an array of str) and the position of the value it was taken from.
+
+    Each substring is packed into one int64 from its code points (21 bits apiece), so
+    the postings can be built with array sorts instead of per-string operations.
+    """
+    values = np.asarray(values, dtype=str)
+    width = values.dtype.itemsize // 4
+    if width < NGRAM:
+        return np.array([], dtype=np.int64), np.array([], dtype=np.intp)
+    chars = values.view(np.uint32).reshape(len(values), width).astype(np.int64)
+    count = width - NGRAM + 1
+    codes = np.zeros((len(values), count), dtype=np.int64)
+    for k in range(NGRAM):
+        codes |= chars[:, k:k + count] << (21 * (NGRAM - 1 - k))
+    lengths = np.char.str_len(values)
+    valid = np.arange(count) < (lengths - NGRAM + 1)[:, None]
+    rows = np.broadcast_to(np.arange(len(values))[:, None], codes.shape)
+    return codes[valid], rows[valid]
+
+
+def _ngram_postings(keys):
+    """Map each n-gram code to the sorted positions of the keys containing it"""
+    # Keys are encoded in chunks of similar length, so one long value does not widen
+    # the character matrix of every other key
+    order = np.argsort(keys.str.len().to_numpy(), kind='stable')
+    values = keys.to_numpy(dtype=object)
+    codes, rows = [], []
+    for start in range(0, len(order), POSTINGS_CHUNK):
+        chunk = order[start:start + POSTINGS_CHUNK]
+        chunk_codes, chunk_rows = _ngram_codes(values[chunk].astype(str))
+        codes.append(chunk_codes)
+        rows.append(chunk[chunk_rows])
+    if not codes:
+        return {}
+    codes = np.concatenate(codes)
+    rows = np.concatenate(rows)
+
+    ordering = np.lexsort((rows, codes))
+    codes, rows = codes[ordering], rows[ordering]
+    first = np.ones(len(codes), dtype=bool)
+    first[1:] = (codes[1:] != codes[:-1]) | (rows[1:] != rows[:-1])
+    codes, rows = codes[first], rows[first]
+    bounds = np.flatnonzero(codes[1:] != codes[:-1]) + 1
+    return dict(zip(codes[np.r_[0, bounds]].tolist(), np.split(rows, bounds))) if len(codes) else {}
+
+
+class CandidateSearchIndex:
+    """In-memory search index over the name, email and phone columns of a frame.
+
+    Each column is reduced to its distinct values, normalized as in NORMALIZERS, and
+    every NGRAM-character substring of those values is mapped to the values that
+    contain it. A query intersects the postings of its own n-grams and confirms the
+    few remaining values, so its cost depends on the number of matches rather than
+    on the number of rows. Prefix queries are answered the same way, a prefix being a
+    substring.
+    """
+
+    def __init__(self, df):
+        self.index = df.index
+        self.fields = {}
+        for column, normalize in NORMALIZERS.items():
+            if column not in df.columns:
+                continue
+            codes, uniques = pd.factorize(df[column])
+            values = pd.Series(uniques, dtype=object)
+            if pd.api.types.is_float_dtype(df[column].dtype):
+                # Whole numbers read as floats (e.g. phone numbers) print as "9876543210.0"
+                values = values.map('{:.0f}'.format)
+            keys = normalize(values.astype(str)).fillna('')
+            self.fields[column] = {
+                'codes': codes,
+                'keys': keys,
+                'postings': _ngram_postings(keys),
+            }
+
+    def _matching_keys(self, field, term):
+        keys = field['keys']
+        if len(term) < NGRAM:
+            return np.flatnonzero(keys.str.contains(term, regex=False).to_numpy())
+
+        grams = set(_ngram_codes([term])[0].tolist())
+        postings = [field['postings'].get(gram) for gram in grams]
+        if any(p is None for p in postings):
+            return np.array([], dtype=np.intp)
+        postings.sort(key=len)
+        candidates = postings[0]
+        for p in postings[1:]:
+            candidates = np.intersect1d(candidates, p, assume_unique=True)
+            if len(candidates) == 0:
+                return candidates
+        if len(term) == NGRAM:
+            return candidates
+        found = keys.iloc[candidates].str.contains(term, regex=False).to_numpy()
+        return candidates[found]
+
+    def search(self, column, term):
+        """Find the rows whose column contains term (ignoring case; phone numbers by
+        their digits).
+
+        Parameters:
+            column (str): 'name', 'email' or 'phone'
+            term (str): Text typed by the user
+
+        Returns:
+            pd.Index: Labels of the matching rows, in frame order
+        """
+        field = self.fields.get(column)
+        if field is None:
+            return self.index[:0]
+        term = NORMALIZERS[column](pd.Series([str(term)], dtype=object)).iloc[0]
+        if not term:
+            return self.index[:0]
+        # One extra slot for code -1 (missing values), which never matches
+        hit = np.zeros(len(field['keys']) + 1, dtype=bool)
+        hit[self._matching_keys(field, term)] = True
+        rows = np.flatnonzero(hit[field['codes']])
+        return self.index[rows]
+
+
+def get_search_index(df, version):
+    """Return the search index of df, building it only once per data version.
+
+    Parameters:
+        df (pd.DataFrame): Candidate records
+        version (hashable): Identifies the data df was loaded from (e.g. a file
+            signature or store version); a new version builds a new index
+
+    Returns:
+        CandidateSearchIndex: Index over df's name, email and phone columns
+    """
+    key = (version, tuple(col for col in NORMALIZERS if col in df.columns))
+    index = _indexes.get(key)
+    # Rows added or removed since the index was built invalidate it as well
+    if index is None or not index.index.equals(df.index):
+        index = CandidateSearchIndex(df)
+        _indexes[key] = index
+        while len(_indexes) > MAX_INDEXES:
+            _indexes.popitem(last=False)
+    _indexes.move_to_end(key)
+    return index
+
+
+def page_count(total, page_size=PAGE_SIZE):
+    """Return the number of result pages for total matches (at least 1)"""
+    return max(1, -(-total // page_size))
+
+
+def get_page(labels, page, page_size=PAGE_SIZE):
+    """Return the labels on a 1-based result page"""
+    start = (page - 1) * page_size
+    return labels[start:start + page_size]
+
+
+def describe_candidates(df, labels):
+    """Return {label: "name - email - phone"} for the given rows, used as the options
+    of a candidate selectbox"""
+    rows = df.loc[labels]
+    names = rows['name'] if 'name' in rows.columns else pd.Series('', index=rows.index)
+    emails = rows['email'] if 'email' in rows.columns else pd.Series('No email', index=rows.index)
+    phones = rows['phone'] if 'phone' in rows.columns else pd.Series('No phone', index=rows.index)
+    return {label: f"{name} - {email} - {phone}"
+            for label, name, email, phone in zip(labels, names, emails, phones)}
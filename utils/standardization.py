@@ -0,0 +1,100 @@
+import pandas as pd
+
+
+def _is_blank(values):
+    """Return a mask of missing or empty-string values, which are left untouched"""
+    return values.isna() | values.astype(object).eq('')
+
+
+def standardize_names(values):
+    """Standardize names to "First Last": single spaces between words, each word
+    lowercased with its first letter capitalized. Missing and empty names are kept.
+
+    Parameters:
+        values (pd.Series): Names
+
+    Returns:
+        pd.Series: Standardized names aligned with values
+    """
+    blank = _is_blank(values)
+    names = (values[~blank].astype(str)
+             .str.split().str.join(' ')
+             .str.lower()
+             .str.replace(r'(?:^| )(\S)', lambda m: m.group(0).upper(), regex=True))
+    return values.astype(object).where(blank, names)
+
+
+def title_names(values):
+    """Title-case names exactly as str.title() does, so every letter after a
+    non-letter is capitalized (e.g. "o'neil" -> "O'Neil", "mary-jane" -> "Mary-Jane").
+    Missing and empty names are kept.
+
+    Parameters:
+        values (pd.Series): Names
+
+    Returns:
+        pd.Series: Title-cased names aligned with values
+    """
+    blank = _is_blank(values)
+    return values.astype(object).where(blank, values[~blank].astype(str).str.title())
+
+
+def normalize_text(values):
+    """Lowercase and strip values for matching (missing values stay missing)"""
+    return values.str.lower().str.strip()
+
+
+def phone_digits(values):
+    """Return the digits of each phone value, as str(value) with non-digits removed"""
+    return values.astype(str).str.replace(r'\D', '', regex=True)
+
+
+def standardize_phones(values):
+    """Standardize phone numbers to their digits, keeping a country code only where it
+    is recognised:
+
+    - 10 digits: kept (no country code)
+    - 11 digits starting with 1: kept (US country code)
+    - 12 digits starting with 91: kept (India country code)
+    - any other length above 10: the last 10 digits
+    - fewer than 10 digits: kept as they are
+
+    Missing and empty values are kept.
+
+    Parameters:
+        values (pd.Series): Phone numbers
+
+    Returns:
+        pd.Series: Standardized phone numbers aligned with values
+    """
+    blank = _is_blank(values)
+    digits = phone_digits(values[~blank])
+    length = digits.str.len()
+    keep = ((length <= 10) |
+            ((length == 11) & digits.str.startswith('1')) |
+            ((length == 12) & digits.str.startswith('91')))
+    phones = digits.where(keep, digits.str[-10:])
+    return values.astype(object).where(blank, phones)
+
+
+def _count_changes(before, after):
+    """Count values that differ, treating two missing values as equal"""
+    changed = ~(before.astype(object).eq(after) | (before.isna() & after.isna()))
+    return int(changed.sum())
+
+
+def standardize_contacts(df, name_column='name', phone_column='phone'):
+    """Standardize the name and phone columns of df in place: names are title-cased
+    (see title_names) and phone numbers reduced to their digits (see standardize_phones).
+
+    Returns:
+        dict: Number of changed values per standardized column
+    """
+    changes = {}
+    for column, standardize in [(name_column, title_names),
+                                (phone_column, standardize_phones)]:
+        if column in df.columns:
+            original = df[column]
+            df[column] = standardize(original)
+            changes[column] = _count_changes(original, df[column])
+    return changes
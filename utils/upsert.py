@@ -0,0 +1,133 @@
+import bisect
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from utils.dtypes import add_categories
+
+
+def _position_index(values):
+    """Map each non-null value to the sorted list of positions holding it"""
+    index = {}
+    for position, value in enumerate(values):
+        if not pd.isna(value):
+            index.setdefault(value, []).append(position)
+    return index
+
+
+def _clean_notes(notes):
+    """Turn missing notes (NaN or the string 'nan') into empty strings"""
+    notes = notes.fillna('').astype(str)
+    return notes.where(notes.str.lower() != 'nan', '')
+
+
+def classify_records(df, new_df, key_cols=('email', 'phone')):
+    """Work out which row of the combined frame every template row writes to.
+
+    Template rows are taken in order, as if each were applied before the next is
+    matched: a row updates the first record sharing any key value with it, where a
+    record's key values include those written by earlier template rows, and otherwise
+    inserts a new record. Only the key columns are tracked, through lookup indexes
+    updated as rows are classified, so no frame is scanned per row.
+
+    Returns:
+        tuple: (targets, is_insert) arrays aligned with new_df; targets are positions in
+            df followed by the inserted records
+    """
+    key_cols = [key for key in key_cols if key in df.columns and key in new_df.columns]
+    current = {key: df[key].tolist() for key in key_cols}
+    indexes = {key: _position_index(current[key]) for key in key_cols}
+    size = len(df)
+
+    targets = np.empty(len(new_df), dtype=int)
+    is_insert = np.zeros(len(new_df), dtype=bool)
+    template = zip(*(new_df[key].tolist() for key in key_cols)) if key_cols \
+        else ((),) * len(new_df)
+    for i, values in enumerate(template):
+        matches = [indexes[key][value][0] for key, value in zip(key_cols, values)
+                   if not pd.isna(value) and indexes[key].get(value)]
+        if matches:
+            target = min(matches)
+        else:
+            target = size
+            size += 1
+            is_insert[i] = True
+            for key in key_cols:
+                current[key].append(np.nan)
+        targets[i] = target
+
+        # Non-null template values overwrite the record's keys
+        for key, value in zip(key_cols, values):
+            old = current[key][target]
+            if pd.isna(value) or (not pd.isna(old) and old == value):
+                continue
+            if not pd.isna(old):
+                indexes[key][old].remove(target)
+            bisect.insort(indexes[key].setdefault(value, []), target)
+            current[key][target] = value
+    return targets, is_insert
+
+
+def upsert_records(df, new_df, notes_col=None, key_cols=('email', 'phone')):
+    """Apply an uploaded template to df as one batch of updates and inserts.
+
+    Rows are matched by email or phone through lookup indexes (see classify_records),
+    then non-null template values overwrite the matched record column by column (the
+    last template row wins). When notes_col is given, its values are appended to the
+    existing notes with a timestamp instead of overwriting them.
+
+    Parameters:
+        df (pd.DataFrame): Current records
+        new_df (pd.DataFrame): Uploaded template containing at least df's columns
+        notes_col (str): Optional column whose values are appended rather than replaced
+        key_cols (tuple): Columns used to match template rows to records
+
+    Returns:
+        tuple: (updated DataFrame, number of updated rows, number of added rows)
+    """
+    df = df.reset_index(drop=True)
+    new_df = new_df.reset_index(drop=True)
+    targets, is_insert = classify_records(df, new_df, key_cols)
+    additions = int(is_insert.sum())
+    updates = len(new_df) - additions
+
+    columns = list(df.columns)
+    rows = new_df.reindex(columns=columns)
+    inserted = rows[is_insert].copy()
+    current_time = datetime.now().strftime('%Y-%m-%d %H:%M')
+
+    if notes_col is not None and notes_col in columns:
+        notes = rows[notes_col]
+        has_note = notes[is_insert].notna()
+        inserted.loc[has_note, notes_col] = (
+            f"[{current_time}]: " + notes[is_insert][has_note].astype(str))
+
+    combined = pd.concat([df, inserted], ignore_index=True) if len(inserted) else df.copy()
+
+    # Column updates: last non-null template value per record wins
+    update_cols = [c for c in columns if c != notes_col]
+    grouped = rows.loc[~is_insert, update_cols].groupby(targets[~is_insert]).last()
+    for col in update_cols:
+        values = grouped[col].dropna()
+        if len(values):
+            add_categories(combined, col, values)
+            combined.loc[values.index, col] = values.to_numpy()
+
+    if notes_col is not None and notes_col in columns:
+        # Updated records keep their notes and get each new note appended in order
+        updated_targets = np.unique(targets[~is_insert])
+        new_notes = _clean_notes(notes[~is_insert])
+        valid = new_notes.str.strip().ne('')
+        appended = (f"[{current_time}]: " + new_notes[valid]).groupby(
+            targets[~is_insert][valid.to_numpy()]).agg('\n'.join)
+
+        existing = _clean_notes(combined.loc[updated_targets, notes_col])
+        text = appended.reindex(updated_targets)
+        merged = ((existing + '\n' + text)
+                  .where(existing.str.strip().ne(''), text)
+                  .where(text.notna(), existing))
+        combined[notes_col] = combined[notes_col].astype(object)
+        combined.loc[updated_targets, notes_col] = merged.to_numpy()
+
+    return combined, updates, additions